@@ -0,0 +1,75 @@
+from constants import *
+from sprite_sheet import SpriteSheet
+
+# ---------------------------------------------------------------------------------------------------------
+# ASSET CACHE: every sprite sheet is decoded once per process and every sprite is cut out and scaled once.
+# The same Surfaces are handed to every card, cell and button, including after the game is reset. Sprites
+# are only read when blitted, so sharing them is safe. Sheets use convert_alpha, so the cache must only be
+# used once the display mode has been set.
+# ---------------------------------------------------------------------------------------------------------
+
+CARDS_SHEET = "images/cards.png"
+RESET_BUTTON_SHEET = "images/reset_button.png"
+
+_sheets = {}     # path -> SpriteSheet
+_sprites = {}    # (path, x, y, width, height, scale) -> Surface
+
+
+def get_sheet(path):
+    """Returns the SpriteSheet for the image file, decoding it the first time it is asked for."""
+
+    if path not in _sheets:
+        _sheets[path] = SpriteSheet(path)
+
+    return _sheets[path]
+
+
+def get_sprite(path, x_coord, y_coord, width, height, scale):
+    """Returns the scaled section of a sprite sheet, cutting it out the first time it is asked for."""
+
+    key = (path, x_coord, y_coord, width, height, scale)
+
+    if key not in _sprites:
+        _sprites[key] = get_sheet(path).get_sprite(x_coord, y_coord, width, height, scale)
+
+    return _sprites[key]
+
+
+def card_face(suit, value):
+    """Returns the sprite for a card. Each suit is a row on the sheet (clubs, spades, diamonds, hearts) and
+    each value is a column (Ace, 2, 3, ... , Queen, King)."""
+
+    return get_sprite(CARDS_SHEET, CARD_WIDTH * (value - 1), CARD_HEIGHT * (suit - 1), CARD_WIDTH, CARD_HEIGHT, SCALE)
+
+
+def cell_image():
+    """Returns the sprite shared by all card areas, a solid bordered box."""
+
+    return get_sprite(CARDS_SHEET, 96, 256, CARD_WIDTH, CARD_HEIGHT, SCALE)
+
+
+def reset_button_images(width, height, scale):
+    """Returns a dictionary with the 'up' and 'down' sprites of the reset button."""
+
+    return {
+        "up": get_sprite(RESET_BUTTON_SHEET, 48, 0, width, height, scale),
+        "down": get_sprite(RESET_BUTTON_SHEET, 0, 0, width, height, scale)
+    }
+
+
+def preload():
+    """Decodes the sheets and scales all 52 card faces and the cell sprite up front, so the first game and every
+    reset after it only hand out Surfaces that already exist."""
+
+    for suit in range(1, 5):
+        for value in range(1, 14):
+            card_face(suit, value)
+
+    cell_image()
+
+
+def clear():
+    """Drops every cached sheet and sprite, e.g. after pygame has been shut down and started again."""
+
+    _sheets.clear()
+    _sprites.clear()
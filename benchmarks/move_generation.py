@@ -0,0 +1,73 @@
+# Run this file to time legal move generation, e.g. python benchmarks/move_generation.py --positions 2000
+import argparse
+import os
+import random
+import sys
+import time
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from game import Game
+
+
+def sample_positions(count, seed=1):
+    """Returns a list of count States reached by playing random legal moves from numbered deals. The same seed
+    always gives the same positions."""
+
+    rng = random.Random(seed)
+    positions = []
+    deal_number = 1
+
+    while len(positions) < count:
+        state = Game(deal_number).get_state()
+
+        for _ in range(60):
+            positions.append(state.copy())
+            moves = state.legal_moves()
+            if not moves or len(positions) == count: break
+            state.apply_move(rng.choice(moves))
+
+        deal_number += 1
+
+    return positions
+
+
+def brute_force_moves(state):
+    """Returns every legal move found by trying valid_move on every (source, depth, destination) triple, the
+    way moves had to be found before the generator existed."""
+
+    return [(src, depth, dst) for src in range(16) for depth in range(1, 14) for dst in range(16)
+            if state.valid_move((src, depth, dst))]
+
+
+def time_per_position(function, positions, repeat):
+    """Returns the best time, in microseconds per position, of calling function on every position."""
+
+    best = float("inf")
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for state in positions:
+            function(state)
+        best = min(best, time.perf_counter() - start)
+
+    return best / len(positions) * 1e6
+
+
+def main():
+    """Parses the command line and prints the time each way of finding moves takes per position."""
+
+    parser = argparse.ArgumentParser(description="Time legal move generation against brute force.")
+    parser.add_argument("--positions", type=int, default=1000, help="positions to generate moves for")
+    parser.add_argument("--repeat", type=int, default=5, help="runs to take the best time of")
+    args = parser.parse_args()
+
+    positions = sample_positions(args.positions)
+    generator = time_per_position(lambda state: state.legal_moves(), positions, args.repeat)
+    brute_force = time_per_position(brute_force_moves, positions, max(1, args.repeat // 5))
+
+    print(f"{len(positions)} positions")
+    print(f"move generator: {generator:8.1f} us/position")
+    print(f"brute force:    {brute_force:8.1f} us/position ({brute_force / generator:.0f}x slower)")
+
+
+if __name__ == "__main__":
+    main()
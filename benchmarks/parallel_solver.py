@@ -0,0 +1,69 @@
+# Run this file to measure how the parallel solver scales, e.g. python benchmarks/parallel_solver.py --workers 1 2 4 8 16
+# Speed-ups are only meaningful up to the number of cores of the machine.
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+from deal_cache import initial_state
+from parallel_solver import ParallelSolver
+from solver import Solver
+
+# solvable deals that take the single process solver the most nodes among deals 1-300
+HARD_DEALS = [117, 273, 106, 92, 285, 27, 9, 267]
+
+
+def time_corpus(make_solver, deals):
+    """Takes a function making a solver for a State and a list of deals. Solves every deal and returns the
+    seconds taken, the nodes expanded and how many deals were won."""
+
+    elapsed, nodes, won = 0.0, 0, 0
+
+    for deal_number in deals:
+        solver = make_solver(initial_state(deal_number))
+        start = time.perf_counter()
+        result = solver.solve()
+        elapsed += time.perf_counter() - start
+        nodes += result.stats.nodes_expanded
+        won += bool(result.solvable)
+
+    return elapsed, nodes, won
+
+
+def main():
+    """Parses the command line, times the corpus with the single process solver and with every number of
+    workers, and prints the speed-ups."""
+
+    parser = argparse.ArgumentParser(description="Time the parallel solver on a fixed corpus of hard deals.")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8, 16], help="numbers of workers to time")
+    parser.add_argument("--deals", type=int, nargs="+", default=HARD_DEALS, help="deal numbers to solve")
+    parser.add_argument("--max-nodes", type=int, default=200000, help="node limit per deal")
+    parser.add_argument("--out", default=None, help="write the results to this JSON file")
+    args = parser.parse_args()
+
+    print(f"{len(args.deals)} deals, {os.cpu_count()} cores")
+    print(f"{'solver':>12} {'seconds':>9} {'nodes':>9} {'won':>4} {'speed-up':>9}")
+
+    elapsed, nodes, won = time_corpus(lambda state: Solver(state, max_nodes=args.max_nodes), args.deals)
+    print(f"{'sequential':>12} {elapsed:9.2f} {nodes:9} {won:4}")
+    results = {"sequential": {"seconds": elapsed, "nodes": nodes, "won": won}}
+    baseline = None
+
+    for workers in args.workers:
+        elapsed, nodes, won = time_corpus(
+            lambda state: ParallelSolver(state, workers, max_nodes=args.max_nodes), args.deals)
+        baseline = baseline or elapsed
+        print(f"{f'{workers} workers':>12} {elapsed:9.2f} {nodes:9} {won:4} {baseline / elapsed:9.2f}")
+        results[f"{workers}"] = {"seconds": elapsed, "nodes": nodes, "won": won, "speed_up": baseline / elapsed}
+
+    if args.out:
+        with open(args.out, "w") as file:
+            json.dump({"cores": os.cpu_count(), "python": platform.python_version(), "deals": args.deals,
+                       "results": results}, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+# Run this file to time the engine, display and solver, e.g. python benchmarks/run.py --out before.json
+# and later python benchmarks/run.py --compare before.json to see what a change did.
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")  # Display benchmarks run without a window
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+from card import Card
+from column_cell import ColumnCell
+from deck import Deck
+from game import Game
+from solver import Solver
+from move_generation import sample_positions
+
+# every benchmark uses fixed deals, so runs on different commits time the same work
+DEAL_NUMBER = 1
+SOLVER_DEALS = [1, 2, 3, 5, 6, 7, 8, 9]
+
+BENCHMARKS = {}  # name -> (setup function, calls per round, unit)
+
+
+def benchmark(name, number, unit=None):
+    """Registers a benchmark. The decorated setup function takes the total number of calls that will be timed and
+    returns the function to time. With a unit (e.g. "nodes"), that function returns how many of those one call
+    processed, which is reported as a rate."""
+
+    def register(setup):
+        BENCHMARKS[name] = (setup, number, unit)
+        return setup
+
+    return register
+
+
+@benchmark("game.new_game", 200)
+def bench_new_game(calls):
+    game = Game(DEAL_NUMBER)
+    return lambda: game.new_game(DEAL_NUMBER)
+
+
+@benchmark("deck.init_cards", 2000)
+def bench_init_cards(calls):
+    return Deck
+
+
+@benchmark("game.fill_columns", 2000)
+def bench_fill_columns(calls):
+    # fill_columns draws from the Game's deck, so every call gets a fresh game with an arranged deck
+    games = []
+    for _ in range(calls):
+        game = Game(DEAL_NUMBER)
+        game._deck = Deck()
+        game._deck.arrange_deal(DEAL_NUMBER)
+        game.init_card_areas()
+        games.append(game)
+
+    games = iter(games)
+    return lambda: next(games).fill_columns()
+
+
+@benchmark("column_cell.valid_selection", 100000)
+def bench_valid_selection(calls):
+    # a King-to-Ace run under a few unordered cards, selected from the top of the run
+    column = ColumnCell()
+    column.set_cards([Card(1, 4), Card(3, 9), Card(2, 2)] +
+                     [Card(1 if value % 2 else 3, value) for value in range(13, 0, -1)])
+    king = column.get_cards()[3]
+    return lambda: column.valid_selection(king)
+
+
+@benchmark("state.legal_moves", 500)
+def bench_legal_moves(calls):
+    positions = sample_positions(500)
+    index = iter(range(calls))
+    return lambda: positions[next(index) % len(positions)].legal_moves()
+
+
+@benchmark("game.apply_move", 2000)
+def bench_apply_move(calls):
+    # plays a fixed winning line over and over, starting the deal again when it runs out
+    game = Game(DEAL_NUMBER)
+    moves = Solver(game.get_state()).solve().moves
+    state = {"game": game, "idx": 0}
+
+    def play():
+        if state["idx"] == len(moves):
+            state["game"], state["idx"] = Game(DEAL_NUMBER), 0
+        state["game"].apply_move(moves[state["idx"]])
+        state["idx"] += 1
+
+    return play
+
+
+@benchmark("solver.solve", len(SOLVER_DEALS), unit="nodes")
+def bench_solve(calls):
+    deals = iter(SOLVER_DEALS * (calls // len(SOLVER_DEALS) + 1))
+
+    def solve_next():
+        solver = Solver(Game(next(deals)).get_state())
+        solver.solve()
+        return solver.get_stats().nodes_expanded
+
+    return solve_next
+
+
+def display_setup():
+    """Returns a Display for the fixed deal, starting pygame if needed, or None when pygame is not installed."""
+
+    try:
+        import pygame as pg
+    except ImportError:
+        return None
+
+    from display import Display
+    pg.init()
+    return Display(Game(DEAL_NUMBER))
+
+
+@benchmark("display.render_full", 100)
+def bench_render_full(calls):
+    display = display_setup()
+    if display is None: return None
+
+    def render():
+        display.mark_dirty()
+        display.render()
+
+    return render
+
+
+@benchmark("display.render_drag", 1000)
+def bench_render_drag(calls):
+    display = display_setup()
+    if display is None: return None
+
+    # pick up the bottom card of the first column and drag it back and forth
+    import pygame as pg
+    card = display.get_game().get_card_areas()["column-cells"][1].get_cards()[-1]
+    x, y = card.get_x() + 5, card.get_y() + 5
+    display.check_event(pg.event.Event(pg.MOUSEBUTTONDOWN, pos=(x, y), button=1))
+    display.render()
+    step = {"dx": 0}
+
+    def drag():
+        step["dx"] = (step["dx"] + 7) % 400
+        display.check_event(pg.event.Event(pg.MOUSEMOTION, pos=(x + step["dx"], y + 40), rel=(7, 0),
+                                           buttons=(1, 0, 0)))
+        display.render()
+
+    return drag
+
+
+@benchmark("hit_index.card_at", 20000)
+def bench_hit_test(calls):
+    display = display_setup()
+    if display is None: return None
+
+    hit_index = display.get_hit_index()
+    points = [(x, y) for x in range(0, 1280, 37) for y in range(0, 720, 29)]
+    index = iter(range(calls))
+    return lambda: hit_index.card_at(points[next(index) % len(points)])
+
+
+def run_benchmark(setup, number, rounds, unit=None):
+    """Times rounds of 'number' calls of the function made by setup. Returns a result dictionary with times in
+    microseconds per call (and the rate of the unit, if there is one), or None if the benchmark cannot run here."""
+
+    function = setup(number * rounds)
+    if function is None: return None
+
+    times = []
+    items = 0
+
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(number):
+            if unit:
+                items += function()
+            else:
+                function()
+        times.append((time.perf_counter() - start) / number * 1e6)
+
+    result = {
+        "calls": number * rounds,
+        "best_us": round(min(times), 3),
+        "median_us": round(statistics.median(times), 3),
+        "mean_us": round(statistics.mean(times), 3)
+    }
+
+    if unit:
+        result[f"{unit}_per_second"] = round(items / (sum(times) * number / 1e6), 1)
+
+    return result
+
+
+def git_commit():
+    """Returns the current commit hash, or None outside of a git checkout."""
+
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline):
+    """Prints how each benchmark's median time moved from the baseline results."""
+
+    print(f"\n{'benchmark':32} {'baseline us':>12} {'now us':>12} {'change':>8}")
+
+    for name, result in results.items():
+        before = baseline.get("results", {}).get(name)
+        if result is None or before is None: continue
+
+        change = result["median_us"] / before["median_us"] - 1 if before["median_us"] else 0
+        print(f"{name:32} {before['median_us']:12.2f} {result['median_us']:12.2f} {change:+8.1%}")
+
+
+def main():
+    """Parses the command line, runs the benchmarks and writes or compares the JSON results."""
+
+    parser = argparse.ArgumentParser(description="Time the engine, display and solver on fixed deals.")
+    parser.add_argument("--rounds", type=int, default=5, help="rounds to time each benchmark for")
+    parser.add_argument("--filter", default="", help="only run benchmarks whose name contains this")
+    parser.add_argument("--out", default=None, help="write the results to this JSON file")
+    parser.add_argument("--compare", default=None, help="JSON results of an earlier run to compare with")
+    args = parser.parse_args()
+
+    results = {}
+
+    for name, (setup, number, unit) in BENCHMARKS.items():
+        if args.filter not in name: continue
+
+        result = results[name] = run_benchmark(setup, number, args.rounds, unit)
+        if result is None:
+            print(f"{name:32} skipped (pygame is not installed)")
+            continue
+
+        rate = f"  {result[f'{unit}_per_second']:.0f} {unit}/s" if unit else ""
+        print(f"{name:32} {result['median_us']:12.2f} us/call{rate}")
+
+    report = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results
+    }
+
+    if args.out:
+        with open(args.out, "w") as file:
+            json.dump(report, file, indent=2)
+
+    if args.compare:
+        with open(args.compare) as file:
+            compare(results, json.load(file))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+# Run this file to load test the game server, e.g. python benchmarks/server_load.py --sessions 1000 5000 10000
+# It starts server.py in a process of its own unless --port points at a server that is already running.
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+from server import *
+from state import State, FREE_CELLS, SUIT_CELLS
+
+CONNECT_AT_ONCE = 256  # connections being opened at the same time, so the listen backlog never overflows
+
+
+def move_requests(move, state):
+    """Takes a move (source index, depth, destination index) and the State it is made in, and returns the
+    selection and move requests that make it."""
+
+    src, depth, dst = move
+
+    if src in FREE_CELLS:
+        select = encode_request(SELECT_FREE_CELL, src + 1)
+    else:
+        select = encode_request(SELECT_COLUMN, src - 7, len(state.columns[src - 8]) - depth)
+
+    area_type = 0 if dst in FREE_CELLS else 1 if dst in SUIT_CELLS else 2
+    return select, encode_request(MOVE, area_type, dst - AREA_TYPE_STARTS[area_type] + 1)
+
+
+async def request(reader, writer, data, latencies):
+    """Sends a request, waits for its status byte and records the round trip in milliseconds. Returns the
+    status."""
+
+    start = time.perf_counter()
+    writer.write(data)
+    status = (await reader.readexactly(1))[0]
+    latencies.append((time.perf_counter() - start) * 1000)
+    return status
+
+
+async def read_state(reader):
+    """Reads the packed State that follows a NEW_GAME or GET_STATE status and returns it."""
+
+    length = (await reader.readexactly(1))[0]
+    return State.unpack(await reader.readexactly(length))
+
+
+async def play_session(connection, deal_number, requests, start, latencies):
+    """Waits for the start signal, then plays a deal over the connection, sending 'requests' requests one at a
+    time: a new game, then the first legal move of every position as a selection and a move."""
+
+    reader, writer = connection
+    await start.wait()
+
+    await request(reader, writer, encode_request(NEW_GAME, deal_number), latencies)
+    state = await read_state(reader)
+    sent = 1
+
+    while sent < requests:
+        move = next(state.moves(), None)
+        if move is None:  # stuck: deal again
+            await request(reader, writer, encode_request(NEW_GAME, deal_number), latencies)
+            state = await read_state(reader)
+            sent += 1
+            continue
+
+        for data in move_requests(move, state):
+            await request(reader, writer, data, latencies)
+        state.apply_move(move)
+        sent += 2
+
+
+async def open_connections(host, port, count):
+    """Opens 'count' connections, a few at a time, and returns their (reader, writer) pairs."""
+
+    limit = asyncio.Semaphore(CONNECT_AT_ONCE)
+
+    async def connect():
+        async with limit:
+            return await asyncio.open_connection(host, port)
+
+    return await asyncio.gather(*(connect() for _ in range(count)))
+
+
+def server_memory(pid):
+    """Returns the resident memory in bytes of a process, or None where /proc cannot tell."""
+
+    try:
+        with open(f"/proc/{pid}/status") as file:
+            for line in file:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        return None
+
+
+async def run_level(host, port, sessions, requests, pid=None):
+    """Connects 'sessions' sessions, plays them all at once and returns the result dictionary for this level
+    of concurrency."""
+
+    memory_before = server_memory(pid) if pid else None
+    connections = await open_connections(host, port, sessions)
+
+    start, latencies = asyncio.Event(), []
+    players = [asyncio.ensure_future(play_session(connection, idx + 1, requests, start, latencies))
+               for idx, connection in enumerate(connections)]
+
+    began = time.perf_counter()
+    start.set()
+    await asyncio.gather(*players)
+    elapsed = time.perf_counter() - began
+
+    memory_after = server_memory(pid) if pid else None
+
+    for _, writer in connections:
+        writer.close()
+
+    latencies.sort()
+    result = {
+        "sessions": sessions,
+        "requests": len(latencies),
+        "requests_per_second": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies),
+        "p99_ms": latencies[int(len(latencies) * 0.99)],
+        "max_ms": latencies[-1]
+    }
+
+    if memory_before is not None and memory_after is not None:
+        result["server_bytes_per_session"] = (memory_after - memory_before) / sessions
+
+    return result
+
+
+def free_port():
+    """Returns a TCP port that is free on this machine."""
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(port, max_sessions):
+    """Starts server.py on the port in a process of its own and returns the process once it is listening."""
+
+    process = subprocess.Popen([sys.executable, os.path.join(ROOT, "server.py"), "--port", str(port),
+                                "--max-sessions", str(max_sessions)], stdout=subprocess.PIPE, text=True)
+    process.stdout.readline()  # "serving on ..."
+    return process
+
+
+async def run_levels(host, port, levels, requests, pid):
+    """Runs every level of concurrency in turn and prints its results."""
+
+    print(f"{'sessions':>8} {'requests':>9} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8} {'B/session':>10}")
+
+    for sessions in levels:
+        result = await run_level(host, port, sessions, requests, pid)
+        per_session = result.get("server_bytes_per_session")
+        print(f"{result['sessions']:8} {result['requests']:9} {result['requests_per_second']:9.0f} "
+              f"{result['p50_ms']:8.2f} {result['p99_ms']:8.2f} {result['max_ms']:8.2f} "
+              f"{per_session if per_session is not None else float('nan'):10.0f}")
+        await asyncio.sleep(0.5)  # let the server drop the sessions before the next level
+
+
+def main():
+    """Parses the command line, starts the server if needed and runs the load test."""
+
+    parser = argparse.ArgumentParser(description="Measure the game server's latency under many sessions.")
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1000, 5000, 10000],
+                        help="numbers of concurrent sessions to test, in turn")
+    parser.add_argument("--requests", type=int, default=20, help="requests sent by every session")
+    parser.add_argument("--host", default="127.0.0.1", help="server address")
+    parser.add_argument("--port", type=int, default=None, help="port of a running server (default: start one)")
+    args = parser.parse_args()
+
+    raise_open_files_limit()
+
+    process = None
+    port = args.port
+    if port is None:
+        port = free_port()
+        process = start_server(port, max(args.sessions))
+
+    try:
+        asyncio.run(run_levels(args.host, port, args.sessions, args.requests, process.pid if process else None))
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+
+if __name__ == "__main__":
+    main()
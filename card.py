@@ -5,7 +5,7 @@ from constants import *
 class Card(MappableSprite):
     """Represents a standard playing card."""
 
-    def __init__(self, suit, value, image):
+    def __init__(self, suit, value, image=None):
         super().__init__(image)
 
         self._width = CARD_WIDTH
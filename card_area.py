@@ -1,6 +1,5 @@
 from constants import *
 from mappable_sprite import *
-from sprite_sheet import SpriteSheet
 
 
 class CardArea(MappableSprite):
@@ -13,20 +12,8 @@ class CardArea(MappableSprite):
         self._scale = SCALE
         self._cards = []
 
-        # image can either be set on init by passing in a sprite
-        # or will default to a black bordered box
-        if image:
-            super().__init__(image)
-        else:
-            self.set_default_image()
-
-    def set_default_image(self):
-        """Called on initialization, sets up the card area's sprite."""
-
-        # set sprite to a solid bordered box
-        sprites = SpriteSheet("images/cards.png")
-        image = sprites.get_sprite(96, 256, self._width, self._height, self._scale)
-
+        # image can be set on init by passing in a sprite, otherwise the Display sets it
+        # when the area is drawn
         super().__init__(image)
 
     def __repr__(self):
@@ -70,12 +57,17 @@ class CardArea(MappableSprite):
     def is_empty(self):
         """Returns True if there are no cards, otherwise returns False."""
 
-        if self.cards_count() == 0: return True
-
-        return False
+        return not self._cards
     
     def place_cards(self, cards):
         """Takes a list of Cards and appends them to the cards data attribute. The ordering of the newly added
         cards remains the same."""
 
         self._cards += cards
+
+    def pop_cards(self, count):
+        """Removes the last 'count' cards and returns them as a list, in the same order."""
+
+        cards = self._cards[-count:]
+        del self._cards[-count:]
+        return cards
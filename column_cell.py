@@ -6,33 +6,83 @@ class ColumnCell(CardArea):
     are added to a column by the player, the bottom card in the column and the new cards must:
     1.) alternate colors
     2.) be in a strictly descending order (each card value decrements by 1)
-    If the column is empty, then only the cards being added to the column need to follow these rules."""
+    If the column is empty, then only the cards being added to the column need to follow these rules.
+
+    The column keeps the length of the ordered run at its bottom (the cards that alternate in color and
+    decrement by one) up to date as cards are added and removed, so selections are checked in constant time.
+    Code that changes the cards list directly must call count_run afterwards."""
 
     def __init__(self):
         super().__init__()
+        self._run = 0
 
-    def valid_selection(self, card):
-        """Returns True if the card is considered a valid selection, otherwise False."""
+    def run_length(self):
+        """Returns how many cards at the bottom of the column alternate in color and decrement by one."""
+
+        return self._run
+
+    def is_ordered(self):
+        """Returns True if the whole column is one ordered run."""
+
+        return self._run == len(self._cards)
+
+    def count_run(self):
+        """Recomputes the length of the ordered run from scratch."""
+
+        self._run = ordered_length(self._cards)
+
+    def set_cards(self, cards=None):
+        """Takes in a list of card objects and sets cards data attribute to the list."""
+
+        super().set_cards(cards)
+        self.count_run()
+
+    def add_card(self, card):
+        """Appends a card to the cards list."""
+
+        self._run = self._run + 1 if self._cards and stacks_on(card, self._cards[-1]) else 1
+        self._cards.append(card)
+
+    def place_cards(self, cards):
+        """Takes a list of Cards and appends them to the cards data attribute. The ordering of the newly added
+        cards remains the same."""
+
+        run = ordered_length(cards)
+        if run == len(cards) and self._cards and stacks_on(cards[0], self._cards[-1]):
+            run += self._run
+
+        self._cards += cards
+        self._run = run
+
+    def pop_cards(self, count):
+        """Removes the last 'count' cards and returns them as a list, in the same order."""
 
-        # guards against an attempt to select a card that isn't in the column
-        if card not in self._cards: return False
+        cards = super().pop_cards(count)
 
-        color = card.get_color()
-        value = card.get_value()
-        # comparisons start one card after the selected card; if the selected card is the last card, method returns True
-        card_idx = self._cards.index(card) + 1  
+        # what is left of the run is still ordered; only a run taken whole needs counting again
+        if count < self._run:
+            self._run -= count
+        else:
+            self.count_run()
 
-        # card color must alternate and value of current card must be one less than the previous card
-        while card_idx < len(self._cards):
-            current = self._cards[card_idx]
-            if current.get_color() == color or current.get_value() != (value - 1):
-                return False
-            
-            color = current.get_color()
-            value = current.get_value()
-            card_idx += 1
+        return cards
 
-        return True
+    def selection_depth(self, card):
+        """Takes a card and returns how many cards would be selected with it (the card and every card below it),
+        or 0 if it cannot be selected. A card can be selected if it is part of the ordered run, and its place
+        in the run follows from its value, so no search is needed."""
+
+        if not self._cards: return 0
+
+        depth = card.get_value() - self._cards[-1].get_value() + 1
+        if depth < 1 or depth > self._run or self._cards[-depth] is not card: return 0
+
+        return depth
+
+    def valid_selection(self, card):
+        """Returns True if the card is considered a valid selection, otherwise False."""
+
+        return self.selection_depth(card) > 0
 
     def valid_move(self, cards):
         """Takes in a list of cards. Returns True if moving the card(s) to the column would be a valid move,
@@ -52,3 +102,21 @@ class ColumnCell(CardArea):
             return True
         
         return False
+
+
+def stacks_on(card, onto):
+    """Returns True if the card can rest on the card 'onto' in an ordered run: one value lower and the
+    opposite color."""
+
+    return onto.get_value() == card.get_value() + 1 and onto.get_color() != card.get_color()
+
+
+def ordered_length(cards):
+    """Takes a list of cards and returns how many cards at its end alternate in color and decrement by one."""
+
+    length = 1 if cards else 0
+
+    while length < len(cards) and stacks_on(cards[-length], cards[-length - 1]):
+        length += 1
+
+    return length
@@ -2,4 +2,23 @@
 
 CARD_WIDTH = 48
 CARD_HEIGHT = 64
-SCALE = 2
\ No newline at end of file
+SCALE = 2
+
+# Constants used for hints
+
+HINT_TIME_BUDGET = 0.05  # seconds the hint search may take
+HINT_COLOR = (255, 215, 0)
+
+# Constants used for the stats overlay
+
+STATS_PANEL_COLOR = (0, 0, 0, 190)
+STATS_TEXT_COLOR = (255, 255, 255)
+STATS_RECENT_GAMES = 100  # games the recent win rate is taken over
+
+# Constants used for the debug overlay
+
+DEBUG_PANEL_COLOR = (0, 0, 0, 200)
+DEBUG_TEXT_COLOR = (200, 255, 200)
+DEBUG_REFRESH_MS = 500  # how often the overlay's numbers are redrawn
+DEBUG_COUNTERS = 8      # busiest instrumented methods listed
+
@@ -0,0 +1,152 @@
+# Run this file to pre-generate a deal cache, e.g. python deal_cache.py 1 1000000 deals.bin
+import argparse
+import os
+import struct
+from deck import ms_deal, MS_SUITS
+from state import State
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is only needed for dealing many games at once and for the on-disk cache
+    np = None
+
+# card code for each card of the Microsoft deck numbering (Ace of clubs, Ace of diamonds, ... , King of spades)
+MS_CODES = [(card // 4 + 1) << 2 | (MS_SUITS[card % 4] - 1) for card in range(52)]
+
+CACHE_MAGIC = b"FCDEALS1"
+CACHE_HEADER = struct.Struct("<8sQQ")  # magic, first deal number, number of deals
+
+
+def require_numpy():
+    """Raises an ImportError explaining that NumPy is needed, if it is not installed."""
+
+    if np is None:
+        raise ImportError("NumPy is required for batch dealing and the deal cache (pip install numpy)")
+
+
+def state_from_codes(codes):
+    """Takes the 52 card codes of a deal in dealt order and returns the State at the start of that game. The
+    card at position n of the deal goes to column n % 8."""
+
+    return State(None, None, [bytes(codes[column::8]) for column in range(8)])
+
+
+def initial_state(deal_number):
+    """Takes a deal number and returns the State at the start of that deal without building a Deck or Cards."""
+
+    codes = [value << 2 | (suit - 1) for suit, value in ms_deal(deal_number)]
+    return state_from_codes(codes)
+
+
+def deal_codes(deal_numbers):
+    """Takes a sequence of deal numbers and returns a NumPy uint8 array of shape [number of deals, 52] holding
+    the card codes of each deal in dealt order. The Microsoft shuffle is run for all deals at once: each of
+    the 52 steps advances every deal's random generator and swaps one card per row."""
+
+    require_numpy()
+
+    seeds = np.asarray(deal_numbers, dtype=np.uint64)
+    rows = np.arange(len(seeds))
+    cards = np.tile(np.arange(51, -1, -1, dtype=np.int64), (len(seeds), 1))
+
+    for i in range(52):
+        seeds = (seeds * np.uint64(214013) + np.uint64(2531011)) & np.uint64(0x7fffffff)
+        j = 51 - ((seeds >> np.uint64(16)) % np.uint64(52 - i)).astype(np.int64)
+        swapped = cards[rows, j]
+        cards[rows, j] = cards[:, i]
+        cards[:, i] = swapped
+
+    return np.asarray(MS_CODES, dtype=np.uint8)[cards]
+
+
+class DealCache:
+    """A file of pre-generated deals, memory-mapped so that opening it is instant and only the pages that are
+    used get read. The file is a small header (magic, first deal number, number of deals) followed by 52 card
+    codes per deal."""
+
+    def __init__(self, path):
+        require_numpy()
+
+        with open(path, "rb") as file:
+            magic, first, count = CACHE_HEADER.unpack(file.read(CACHE_HEADER.size))
+
+        if magic != CACHE_MAGIC:
+            raise ValueError(f"{path} is not a deal cache")
+
+        self._first = first
+        self._count = count
+        self._codes = np.memmap(path, dtype=np.uint8, mode="r", offset=CACHE_HEADER.size, shape=(count, 52))
+
+    @classmethod
+    def build(cls, path, first, count, batch_size=65536):
+        """Generates deals first to first + count - 1 into a new cache file at path and returns it opened."""
+
+        require_numpy()
+
+        with open(path, "wb") as file:
+            file.write(CACHE_HEADER.pack(CACHE_MAGIC, first, count))
+
+            for start in range(first, first + count, batch_size):
+                stop = min(start + batch_size, first + count)
+                file.write(deal_codes(np.arange(start, stop)).tobytes())
+
+        return cls(path)
+
+    def __contains__(self, deal_number):
+        return self._first <= deal_number < self._first + self._count
+
+    def __len__(self):
+        return self._count
+
+    def get_codes(self, deal_number):
+        """Returns the 52 card codes of the deal as bytes, in dealt order."""
+
+        if deal_number not in self:
+            raise KeyError(deal_number)
+
+        return self._codes[deal_number - self._first].tobytes()
+
+    def get_state(self, deal_number):
+        """Returns the State at the start of the deal, falling back to dealing it when it is not in the cache."""
+
+        if deal_number not in self: return initial_state(deal_number)
+
+        return state_from_codes(self.get_codes(deal_number))
+
+
+_open_caches = {}
+
+
+def open_cache(path):
+    """Returns the DealCache for path, opening it only once per process."""
+
+    if path not in _open_caches:
+        _open_caches[path] = DealCache(path)
+
+    return _open_caches[path]
+
+
+def get_initial_state(deal_number, cache_path=None):
+    """Returns the State at the start of the deal, from the cache file at cache_path if one is given and exists."""
+
+    if cache_path and os.path.exists(cache_path):
+        return open_cache(cache_path).get_state(deal_number)
+
+    return initial_state(deal_number)
+
+
+def main():
+    """Builds a deal cache file from the command line: python deal_cache.py FIRST COUNT PATH"""
+
+    parser = argparse.ArgumentParser(description="Pre-generate numbered deals into a memory-mapped cache file.")
+    parser.add_argument("first", type=int, help="first deal number")
+    parser.add_argument("count", type=int, help="number of deals")
+    parser.add_argument("path", help="cache file to write")
+    args = parser.parse_args()
+
+    DealCache.build(args.path, args.first, args.count)
+    print(f"wrote deals {args.first}-{args.first + args.count - 1} to {args.path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,26 @@
 import random
-from constants import *
 from card import Card
-from sprite_sheet import SpriteSheet
+
+
+# suits in the order the Microsoft deal numbers its cards (clubs, diamonds, hearts, spades) mapped to Card suits
+MS_SUITS = [1, 3, 4, 2]
+
+
+def ms_deal(deal_number):
+    """Takes a deal number and returns the 52 cards of the classic Microsoft FreeCell deal with that number, as
+    (suit, value) tuples in the order they are dealt. Cards are dealt one per column from left to right, so
+    the card at position n goes to column n % 8."""
+
+    # the MS deck is numbered 0-51 as Ace of clubs, Ace of diamonds, Ace of hearts, Ace of spades, Two of clubs, ...
+    cards = list(range(51, -1, -1))
+    seed = deal_number
+
+    for i in range(52):
+        seed = (seed * 214013 + 2531011) & 0x7fffffff  # the Microsoft C runtime rand()
+        j = 51 - (seed >> 16) % (52 - i)
+        cards[i], cards[j] = cards[j], cards[i]
+
+    return [(MS_SUITS[card % 4], card // 4 + 1) for card in cards]
 
 
 class Deck:
@@ -14,22 +33,15 @@ class Deck:
         self.init_cards()
 
     def init_cards(self):
-        """Fills the deck with 52 cards."""
-
-        sprites = SpriteSheet("images/cards.png")
+        """Fills the deck with 52 cards. Cards are created without images; the Display attaches
+        sprites to them when the game is drawn."""
 
         # clubs, spades, diamonds, hearts
         for suit in range(1, 5):
-            x_coord = 0
-            y_coord = CARD_HEIGHT * (suit - 1)
 
             # Ace, 2, 3, ... , Queen, King
             for value in range(1, 14):
-                sprite = sprites.get_sprite(x_coord, y_coord, CARD_WIDTH, CARD_HEIGHT, SCALE)
-                card = Card(suit, value, sprite)
-
-                self.add_card(card)
-                x_coord += CARD_WIDTH
+                self.add_card(Card(suit, value))
 
     def add_card(self, card):
         """Adds a card to the top of the deck."""
@@ -45,3 +57,18 @@ class Deck:
         """Shuffles the cards list."""
 
         random.shuffle(self._cards)
+
+    def arrange_deal(self, deal_number):
+        """Orders the cards into the Microsoft deal with the given number. Cards are drawn from the top of the
+        deck and Game.fill_columns fills one column at a time (7 cards for columns 1-4, 6 for columns 5-8),
+        so the cards are stacked in reverse column by column order."""
+
+        by_face = {(card.get_suit(), card.get_value()): card for card in self._cards}
+        dealt = ms_deal(deal_number)
+        order = []
+
+        for column in range(8):
+            order += [by_face[face] for face in dealt[column::8]]
+
+        order.reverse()
+        self._cards = order
@@ -1,22 +1,68 @@
 import pygame as pg
+from constants import *
 from suit_cell import SuitCell
+from reset_button import ResetButton
+from hit_index import HitIndex
+import assets
 
 
 class Display:
     """A class for linking up the display to the Game logic. Handles mouse movements
-     and button clicks by the player."""
+     and button clicks by the player. The Game itself is headless, so the Display is
+     responsible for giving cards and card areas their images and screen positions.
+     Finished games are appended to the optional ReplayWriter when they are won or reset, and the game is
+     handed to the optional Autosaver after every move. Games are recorded in the optional StatsStore when they are
+     won or given up by resetting, and the store's numbers are shown in an overlay toggled with S. The numbers
+     of the optional Profiler are shown in a debug overlay toggled with F3."""
         
-    def __init__(self, game):
+    def __init__(self, game, replays=None, autosaver=None, stats=None, profiler=None):
         
         self._game = game
+        self._replays = replays
+        self._autosaver = autosaver
+        self._stats = stats
+        self._profiler = profiler
         self._surface = pg.display.set_mode((1280, 720))
         self._background_color = (75, 105, 47, 255)
         pg.display.set_caption("Free Cell")
 
+        self._font = pg.font.Font(None, 48)
+        self._small_font = pg.font.Font(None, 32)
+        self._debug_font = pg.font.Font(None, 22)
+        assets.preload()
+        self._reset_button = self.create_reset_button()
+
+        # the table (background, button, cells and the cards resting in them) is drawn onto this layer, which is
+        # only redrawn when the board changes; dragged cards are drawn over it straight onto the screen
+        self._board = pg.Surface(self._surface.get_size())
+        self._board_dirty = True
+        self._selection_rect = None  # screen area covered by the dragged cards in the last frame
+
+        # finds the card or area under the mouse, kept up to date by position_card_areas and update_card_positions
+        self._hit_index = HitIndex()
+
+        # (card, card area) of the last hint shown, highlighted until the next click or key press
+        self._hint = None
+
+        # whether the game being played is in the replay file yet; a game closed before it ends is resumed
+        # from the autosave, so it is only recorded once it is won or reset
+        self._replay_recorded = False
+
+        # whether the game being played is in the statistics yet, and the overlay's lines while it is shown
+        self._stats_recorded = False
+        self._stats_lines = None
+
+        # the debug overlay, drawn straight onto the screen over everything else while shown, and when it was
+        # last redrawn (in pygame ticks)
+        self._debug_panel = None
+        self._debug_updated = 0
+
         # for card dragging
         self._mouse_drag_x_offset = None
         self._mouse_drag_y_offset = None
 
+        self.init_board()
+
     def get_width(self):
         """Returns the width of the screen."""
 
@@ -27,6 +73,109 @@ class Display:
 
         return self._surface.get_size()[1]
     
+    def get_reset_button(self):
+        """Returns the reset button."""
+
+        return self._reset_button
+
+    def get_game(self):
+        """Returns the Game being displayed."""
+
+        return self._game
+
+    def get_hit_index(self):
+        """Returns the HitIndex used to find what is under the mouse."""
+
+        return self._hit_index
+
+    def get_stats_lines(self):
+        """Returns the lines of text in the stats overlay, or None when it is hidden."""
+
+        return self._stats_lines
+
+    def get_debug_panel(self):
+        """Returns the debug overlay Surface, or None when it is hidden."""
+
+        return self._debug_panel
+
+    def get_hint(self):
+        """Returns the (card, card area) of the hint being shown, or None."""
+
+        return self._hint
+
+    def create_reset_button(self):
+        """Initializes the reset button and returns it."""
+
+        reset_button = ResetButton()
+        y = self.get_height() - (reset_button.get_scaled_height() + 20)
+        reset_button.set_pos(20, y)  #  set position at bottom left corner
+        return reset_button
+
+    def init_board(self):
+        """Gives the current game's cards and card areas their images and positions. Called whenever
+         the game is (re)started."""
+
+        # a game saved during a drag comes back with its cards selected, but no mouse button is held down now,
+        # so they are dropped back where they came from
+        if self._game.get_selected_cards():
+            self._game.move_selection_to_previous_area()
+
+        pg.display.set_caption(f"Free Cell #{self._game.get_deal_number()}")
+        self.skin_card_areas()
+        self.position_card_areas()
+        self.update_all_card_positions()
+
+    def update_all_card_positions(self):
+        """Updates the coordinates of the cards in every card area."""
+
+        for card_area_type in self._game.get_card_areas().values():
+            for card_area in card_area_type.values():
+                self.update_card_positions(card_area)
+
+    def skin_card_areas(self):
+        """Sets the sprites for every card area and every card in the game. The sprites come from the asset
+         cache, so this only hands out Surfaces that were decoded and scaled once."""
+
+        cell_image = assets.cell_image()
+
+        for card_area_type in self._game.get_card_areas().values():
+            for card_area in card_area_type.values():
+                card_area.set_image(cell_image)
+
+                for card in card_area.get_cards():
+                    card.set_image(assets.card_face(card.get_suit(), card.get_value()))
+
+    def position_card_areas(self):
+        """Sets the screen positions of the 4 free cells, 4 suit cells, and 8 column cells."""
+
+        card_areas = self._game.get_card_areas()
+        cell_width, cell_height = CARD_WIDTH * SCALE, CARD_HEIGHT * SCALE
+
+        # free cells at the top left
+        x, y = 10, 10
+
+        for id in range(1, 5):
+            card_areas["free-cells"][id].set_pos(x, y)
+            x += (cell_width + 10)
+
+        # suit cells at the top right
+        x = self.get_width() - (cell_width + 10)
+
+        for id in range(4, 0, -1):
+            card_areas["suit-cells"][id].set_pos(x, y)
+            x -= (cell_width + 10)
+
+        # columns centered below the cells
+        x = (self.get_width() - (240 + 8 * cell_width)) / 2
+        y = 40 + cell_height
+
+        for id in range(1, 9):
+            card_areas["column-cells"][id].set_pos(x, y)
+            x += (cell_width + 30)
+
+        self._hit_index.build([card_area for card_area_type in card_areas.values()
+                               for card_area in card_area_type.values()], self.get_width())
+
     def get_stagger_value(self, array):
         """Returns an integer value based on how many elements are in the array.
          The more elements the smaller the value will be."""
@@ -41,6 +190,9 @@ class Display:
     def check_event(self, event):
         """Checks the type of the event and calls the related event handlers."""
 
+        if event.type in (pg.MOUSEBUTTONDOWN, pg.KEYDOWN):
+            self.clear_hint()
+
         if event.type == pg.MOUSEBUTTONDOWN:
             mouse_pos = event.pos
             self.check_card_click(mouse_pos)
@@ -53,66 +205,249 @@ class Display:
             mouse_pos = event.pos
             self.check_card_placement(mouse_pos)
             self.check_reset_button_release(mouse_pos)
+        elif event.type == pg.KEYDOWN:
+            self.check_key_press(event)
+        elif event.type == pg.WINDOWEXPOSED:
+            self.mark_dirty()  # the window system lost what was on screen
+
+    def check_key_press(self, event):
+        """Takes a KEYDOWN event. Ctrl+Z undoes the last move, Ctrl+Y (or Ctrl+Shift+Z) redoes it, H shows
+        a hint, S shows or hides the statistics and F3 the debug overlay."""
+
+        if event.key == pg.K_h and not event.mod & pg.KMOD_CTRL:
+            self.show_hint()
+            return
+
+        if event.key == pg.K_s and not event.mod & pg.KMOD_CTRL:
+            self.toggle_stats()
+            return
+
+        if event.key == pg.K_F3:
+            self.toggle_debug()
+            return
+
+        if not event.mod & pg.KMOD_CTRL: return
+
+        if event.key == pg.K_z and not event.mod & pg.KMOD_SHIFT:
+            changed = self._game.undo()
+        elif event.key == pg.K_y or event.key == pg.K_z:
+            changed = self._game.redo()
+        else:
+            return
+
+        if changed:
+            self.update_all_card_positions()
+            self.check_won()
+            self.autosave()
+
+    def show_hint(self):
+        """Asks the Game for the best move and highlights the card to move and the area to move it to."""
+
+        moves = self._game.hint(HINT_TIME_BUDGET)
+        if not moves: return
+
+        src, depth, dst = moves[0]
+        card = self._game.get_area(src).get_cards()[-depth]
+        self._hint = (card, self._game.get_area(dst))
+        self.mark_dirty()
+
+    def clear_hint(self):
+        """Removes the hint highlight, if one is shown."""
+
+        if self._hint is not None:
+            self._hint = None
+            self.mark_dirty()
+
+    def toggle_stats(self):
+        """Shows the statistics overlay, or hides it if it is shown."""
+
+        if self._stats_lines is None:
+            self.update_stats_lines()
+        else:
+            self._stats_lines = None
+
+        self.mark_dirty()
+
+    def toggle_debug(self):
+        """Shows the debug overlay, or hides it if it is shown."""
+
+        if self._debug_panel is None:
+            self.update_debug_panel(force=True)
+        else:
+            self._debug_panel = None
+
+        self.mark_dirty()
+
+    def debug_lines(self):
+        """Returns the lines of text in the debug overlay: frame times, their histogram and the busiest
+        instrumented methods."""
+
+        profiler = self._profiler
+        if profiler is None: return ["Profiling is off (start with --profile)"]
+
+        lines = [f"Frames {profiler.frames_count()}   p50 {profiler.frame_percentile(50):.2f} ms   "
+                 f"p99 {profiler.frame_percentile(99):.2f} ms   max {profiler.slowest_frame():.2f} ms"]
+
+        histogram = profiler.get_histogram()
+        most = max(frames for _, frames in histogram) or 1
+        for label, frames in histogram:
+            lines.append(f"{label:>8} {'|' * round(frames / most * 30):30} {frames}")
+
+        for name, (calls, total, own) in list(profiler.get_counters().items())[:DEBUG_COUNTERS]:
+            lines.append(f"{name}  {calls} calls  {total * 1000:.1f} ms  (own {own * 1000:.1f} ms)")
+
+        return lines
+
+    def update_debug_panel(self, force=False):
+        """Redraws the debug overlay if it is shown and its numbers are due to be refreshed (or force is set).
+        Returns True if it was redrawn."""
+
+        if self._debug_panel is None and not force: return False
+
+        now = pg.time.get_ticks()
+        if not force and now - self._debug_updated < DEBUG_REFRESH_MS: return False
+
+        texts = [self._debug_font.render(line, True, DEBUG_TEXT_COLOR) for line in self.debug_lines()]
+        width = max(text.get_width() for text in texts) + 20
+        height = sum(text.get_height() + 2 for text in texts) + 16
+
+        panel = pg.Surface((width, height), pg.SRCALPHA)
+        panel.fill(DEBUG_PANEL_COLOR)
+        y = 8
+        for text in texts:
+            panel.blit(text, (10, y))
+            y += text.get_height() + 2
+
+        if self._debug_panel is not None and panel.get_size() != self._debug_panel.get_size():
+            self.mark_dirty()  # a smaller panel would leave the old one's edges behind
+
+        self._debug_panel = panel
+        self._debug_updated = now
+        return True
+
+    def get_debug_rect(self):
+        """Returns the screen Rect covered by the debug overlay, in the bottom right corner."""
+
+        rect = self._debug_panel.get_rect()
+        rect.bottomright = (self.get_width() - 10, self.get_height() - 10)
+        return rect
+
+    def update_stats_lines(self):
+        """Queries the statistics store for the overlay's lines. The recorded games are written first, so
+        the game just finished is counted."""
+
+        if self._stats is None:
+            self._stats_lines = ["No statistics are being kept"]
+            return
+
+        self._stats.flush()
+        totals = self._stats.totals()
+        recent = self._stats.recent_win_rate(STATS_RECENT_GAMES)
+        deal = self._stats.deal_stats(self._game.get_deal_number())
+
+        lines = ["Statistics",
+                 f"Played {totals.played}   Won {totals.wins} ({totals.win_rate():.0%})",
+                 f"Last {STATS_RECENT_GAMES} games: {recent or 0:.0%} won",
+                 f"Winning streak {totals.winning_streak()}   Best {totals.best_streak}",
+                 f"Deal #{deal.deal_number}: played {deal.played}, won {deal.wins}"]
+
+        if deal.fewest_moves is not None:
+            minutes, seconds = divmod(int(deal.fastest), 60)
+            lines.append(f"Best win: {deal.fewest_moves} moves, fastest {minutes}:{seconds:02}")
+
+        self._stats_lines = lines
+
+    def record_stats(self):
+        """Records the game being played in the statistics store, once per game. A game without any moves played
+        is not recorded, so starting a new deal straight away does not count as a loss."""
+
+        if self._stats is None or self._stats_recorded or not self._game.moves_played(): return
+
+        self._stats.record(self._game)
+        self._stats_recorded = True
+
+        if self._stats_lines is not None:
+            self.update_stats_lines()
+
+    def check_won(self):
+        """Records the game in the replay file and the statistics as soon as it is won."""
+
+        if self._game.is_won():
+            self.record_game()
+            self.record_stats()
+
+    def mark_dirty(self):
+        """Flags the board layer to be redrawn and the whole screen to be updated on the next render. Anything
+         that changes the board outside of the Display's own handlers must call this."""
+
+        self._board_dirty = True
 
     def check_reset_button_click(self, mouse_pos):
         """Takes a mouse position coordinate. Checks if the reset button has been pressed and changes its sprite if it has been."""
 
-        reset_button = self._game.get_reset_button()
-        if reset_button.get_rect().collidepoint(mouse_pos):
+        reset_button = self._reset_button
+        if reset_button.collidepoint(mouse_pos):
             reset_button.set_image_down()
+            self.mark_dirty()
 
     def check_reset_button_dragged_away(self, mouse_pos):
         """Takes a mouse position coordinate. Checks if the mouse has been dragged away from the reset button. If so, then set the reset button
          image to unpressed."""
         
-        reset_button = self._game.get_reset_button()
-        if not reset_button.get_rect().collidepoint(mouse_pos):
+        reset_button = self._reset_button
+        if not reset_button.collidepoint(mouse_pos) and reset_button.is_down():
             reset_button.set_image_up()
+            self.mark_dirty()
 
     def check_reset_button_release(self, mouse_pos):
         """Takes a mouse position coordinate. Checks if the reset button has been released and changes its sprite if it has been. Also resets the game
          by calling the Game's new_game method."""
 
-        reset_button = self._game.get_reset_button()
-        if reset_button.get_rect().collidepoint(mouse_pos):
+        reset_button = self._reset_button
+        if reset_button.collidepoint(mouse_pos):
             reset_button.set_image_up()
+            self.record_game()
+            self.record_stats()  # a game given up after moving counts as lost
             self._game.new_game()
+            self._replay_recorded = False
+            self._stats_recorded = False
+            self.init_board()
+            self.autosave()
+            if self._stats_lines is not None: self.update_stats_lines()
 
-    def check_card_click(self, mouse_pos):
-        """Takes a mouse position coordinate. Checks if a card has been clicked and updates any game information related
-         to a card click."""
+    def autosave(self):
+        """Hands the game to the autosaver, if there is one. Only a snapshot is taken here; the file is written
+        in the background."""
 
-        # add free cells and columns to the list of areas to check
-        card_areas = []
-        free_cells = self._game.get_card_areas()["free-cells"]
-        columns = self._game.get_card_areas()["column-cells"]
+        if self._autosaver is not None:
+            self._autosaver.request(self._game)
 
-        for free_cell in free_cells.values():
-            card_areas.append(free_cell)
-        for column in columns.values():
-            card_areas.append(column)
+    def record_game(self):
+        """Appends the game being played to the replay file, if there is one, once per game."""
 
-        # check cards in free-cells/columns, starting at the bottom for each area and moving upward
-        columns = self._game.get_card_areas()["column-cells"]
+        if self._replays is None or self._replay_recorded: return
 
-        for card_area in card_areas:
-            if card_area.is_empty(): continue
+        self._replays.record(self._game)
+        self._replay_recorded = True
 
-            # from bottom to top, check if mouse clicked the card in the card_area
-            for card in reversed(card_area.get_cards()):
+    def check_card_click(self, mouse_pos):
+        """Takes a mouse position coordinate. Checks if a card has been clicked and updates any game information related
+         to a card click."""
 
-                if card.get_rect().collidepoint(mouse_pos):
-                    self._game.select_card(card, card_area)
+        # look up the topmost card in a free cell or column under the mouse
+        hit = self._hit_index.card_at(mouse_pos)
+        if hit is None: return
 
-                    # update mouse movement offsets
-                    mouse_x, mouse_y = mouse_pos
-                    self._mouse_drag_x_offset = card.get_x() - mouse_x
-                    self._mouse_drag_y_offset = card.get_y() - mouse_y
+        card, card_area = hit
+        self._game.select_card(card, card_area)
 
-                    # update card positions in the cell the cards were just chosen from
-                    self.update_card_positions(card_area)
+        # update mouse movement offsets
+        mouse_x, mouse_y = mouse_pos
+        self._mouse_drag_x_offset = card.get_x() - mouse_x
+        self._mouse_drag_y_offset = card.get_y() - mouse_y
 
-                    return  # once card has been clicked, stop searching
+        # update card positions in the cell the cards were just chosen from
+        self.update_card_positions(card_area)
 
     def check_card_dragging(self, mouse_pos):
         """Takes a mouse position coordinate. Checks if any cards are currently being dragged by the player and updates
@@ -143,15 +478,10 @@ class Display:
             # get horizontal and vertical mid points for the top selected card
             card_mid_x, card_mid_y = self.calculate_mid_points(selected_cards[0])
 
-            # add all card areas to the list of areas to check
-            card_areas = []
-            for card_area_type in self._game.get_card_areas().values():
-                for card_area in card_area_type.values():
-                    card_areas.append(card_area)
-
-            for card_area in card_areas:
-                if self.check_move_to_cell(card_area, card_mid_x, card_mid_y):
-                    return  #  return early if the player dragged the selection to the area, whether or not it was a valid move
+            # look up the area the top selected card is over
+            card_area = self._hit_index.drop_target(card_mid_x, card_mid_y)
+            if card_area is not None and self.check_move_to_cell(card_area, card_mid_x, card_mid_y):
+                return  #  return early if the player dragged the selection to the area, whether or not it was a valid move
 
             # after checking all areas, if selected cards were not placed on any valid location, move them back
             previous_area = self._game.get_previous_cards_area()
@@ -185,6 +515,9 @@ class Display:
             if self._game.valid_move(card_area):
                 self._game.move_selection_to_area(card_area)
                 self.update_card_positions(card_area)
+                self.update_auto_moved_cards()
+                self.check_won()
+                self.autosave()
             # card(s) moved back to their previous location
             else:
                 previous_area = self._game.get_previous_cards_area()
@@ -195,6 +528,13 @@ class Display:
         # returns False if cards were not placed on the area
         return False
 
+    def update_auto_moved_cards(self):
+        """Updates the card positions of every area the Game's last autoplay took cards from or put cards on."""
+
+        for src, _, dst in self._game.get_auto_moves():
+            self.update_card_positions(self._game.get_area(src))
+            self.update_card_positions(self._game.get_area(dst))
+
     def calculate_mid_points(self, card):
         """Returns a tuple in the form (mid_x, mid_y) which contains horizontal and vertical mid points for a card."""
 
@@ -209,14 +549,17 @@ class Display:
 
     def update_card_positions(self, card_area):
         """Takes a CardArea as a parameter and updates the coordinates (x and y values)
-         for all cards in the area."""
+         for all cards in the area. Cards only come to rest in an area when the board changes, so this
+         also flags the board layer for redrawing."""
         
+        self.mark_dirty()
         x, y = card_area.get_x(), card_area.get_y()
         
         # cards in a suit cell are all stacked on top of each other
         if isinstance(card_area, SuitCell):
             for card in card_area.get_cards():
                 card.set_pos(x, y)
+            self._hit_index.update_area(card_area, 0)
         # cards in a column are staggered (free cells only contain one card so this doesn't need to
         # check for the free cell type)
         else:
@@ -225,19 +568,55 @@ class Display:
             for card in card_area.get_cards():
                 card.set_pos(x, y)
                 y += y_offset
+            self._hit_index.update_area(card_area, y_offset)
 
     def fill_background(self):
         """Makes background green."""
 
-        self._surface.fill(self._background_color)
+        self._board.fill(self._background_color)
 
-    def draw_image(self, image, position):
-        """Takes in an image and a position and draws the image onto the screen at that position."""
+    def draw_image(self, image, position, surface=None):
+        """Takes in an image and a position and draws the image at that position, onto the board layer
+         unless another surface is given."""
 
-        self._surface.blit(image, position)
+        (surface or self._board).blit(image, position)
 
     def render(self):
-        """Wipes the display and blits all drawable game objects."""
+        """Draws a frame. When the board has changed, the board layer is redrawn and the whole screen is updated.
+         Otherwise only the dragged cards can have moved, so the board layer is copied back over the area they
+         covered last frame, they are drawn at their new position and just those two rectangles are updated.
+         The debug overlay, when shown, is drawn last and updated with them, or on its own when its numbers are
+         refreshed. Returns the list of rectangles that were updated (empty when nothing changed)."""
+
+        debug_refreshed = self.update_debug_panel()
+
+        if self._board_dirty:
+            self.render_board()
+            self._surface.blit(self._board, (0, 0))
+            self._selection_rect = self.render_selected_cards()
+            self.render_debug()
+            pg.display.flip()
+            self._board_dirty = False
+            return [self._surface.get_rect()]
+
+        selection_rect = self.get_selection_rect()
+        if selection_rect == self._selection_rect and not debug_refreshed: return []
+
+        dirty_rects = [rect for rect in (self._selection_rect, selection_rect) if rect]
+        if self._debug_panel is not None:
+            dirty_rects.append(self.get_debug_rect())  # the overlay is see-through, so it goes over the board
+
+        for rect in dirty_rects:
+            self._surface.blit(self._board, rect, rect)
+
+        self.render_selected_cards()
+        self.render_debug()
+        pg.display.update(dirty_rects)
+        self._selection_rect = selection_rect
+        return dirty_rects
+
+    def render_board(self):
+        """Redraws the board layer: background, reset button, card areas with their cards and the status text."""
 
         # fill background with green
         self.fill_background()
@@ -248,16 +627,30 @@ class Display:
         # draw all card areas as well as the cards within them
         self.render_card_areas()
 
-        # wipe and update the screen
-        pg.display.flip()
+        # outline the card and area of the hint being shown
+        self.render_hint()
+
+        # tell the player when the game can no longer be played
+        self.render_status()
+
+        # the statistics go over everything else
+        self.render_stats()
 
     def render_card_areas(self):
-        """Draws card areas to the screen."""
+        """Draws card areas to the board layer."""
 
         self.render_cells("free-cells")
         self.render_cells("suit-cells")
         self.render_cells("column-cells")
-        self.render_selected_cards()
+
+    def get_selection_rect(self):
+        """Returns a pygame Rect covering every selected card, or None if nothing is selected."""
+
+        selected = self._game.get_selected_cards()
+        if not selected: return None
+
+        rects = [pg.Rect(card.get_pos(), card.get_image().get_size()) for card in selected]
+        return rects[0].unionall(rects[1:])
 
     def render_cells(self, area_type):
         """Takes in an area type string, which can be 'suit-cells', 'column-cells', or 'free-cells'.
@@ -275,16 +668,65 @@ class Display:
                 self.draw_image(card.get_image(), card.get_pos())
 
     def render_selected_cards(self):
-        """Draws any cards currently being dragged to the screen."""
+        """Draws any cards currently being dragged straight to the screen and returns the Rect they cover."""
         
         selected = self._game.get_selected_cards()
 
         for card in selected:
-            self.draw_image(card.get_image(), card.get_pos())
+            self.draw_image(card.get_image(), card.get_pos(), self._surface)
+
+        return self.get_selection_rect()
+
+    def render_hint(self):
+        """Draws an outline around the hinted card and around the card or empty area it should be moved to."""
+
+        if self._hint is None: return
+
+        card, card_area = self._hint
+        target = card_area if card_area.is_empty() else card_area.get_cards()[-1]
+
+        for sprite in (card, target):
+            rect = pg.Rect(sprite.get_pos(), (sprite.get_scaled_width(), sprite.get_scaled_height()))
+            pg.draw.rect(self._board, HINT_COLOR, rect, 4, border_radius=6)
+
+    def render_status(self):
+        """Draws a 'No moves left' message at the bottom of the screen when no productive move remains."""
+
+        if self._game.get_selected_cards() or self._game.is_won() or self._game.has_legal_moves(): return
+
+        text = self._font.render("No moves left", True, (255, 255, 255))
+        x = (self.get_width() - text.get_width()) / 2
+        y = self.get_height() - (text.get_height() + 40)
+        self.draw_image(text, (x, y))
+
+    def render_stats(self):
+        """Draws the statistics overlay in the middle of the board layer, if it is shown."""
+
+        if self._stats_lines is None: return
+
+        texts = [self._small_font.render(line, True, STATS_TEXT_COLOR) for line in self._stats_lines]
+        width = max(text.get_width() for text in texts) + 60
+        height = sum(text.get_height() + 10 for text in texts) + 40
+
+        panel = pg.Surface((width, height), pg.SRCALPHA)
+        panel.fill(STATS_PANEL_COLOR)
+        x, y = (self.get_width() - width) // 2, (self.get_height() - height) // 2
+        self.draw_image(panel, (x, y))
+
+        y += 20
+        for text in texts:
+            self.draw_image(text, (x + 30, y))
+            y += text.get_height() + 10
+
+    def render_debug(self):
+        """Draws the debug overlay straight to the screen, if it is shown."""
+
+        if self._debug_panel is not None:
+            self._surface.blit(self._debug_panel, self.get_debug_rect())
 
     def render_reset_button(self):
         """Draws the reset button to the screen."""
 
-        reset_button = self._game.get_reset_button()
+        reset_button = self._reset_button
 
         self.draw_image(reset_button.get_image(), reset_button.get_pos())
\ No newline at end of file
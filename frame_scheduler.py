@@ -0,0 +1,81 @@
+import pygame as pg
+
+
+def coalesce_events(events):
+    """Takes a list of pygame events and returns it with every run of back-to-back MOUSEMOTION events cut down
+    to the last one. Only the latest mouse position of a run matters, and motion that happens before a button
+    event is kept so cards are dropped where they were last dragged to."""
+
+    coalesced = []
+
+    for event in events:
+        if event.type == pg.MOUSEMOTION and coalesced and coalesced[-1].type == pg.MOUSEMOTION:
+            coalesced[-1] = event
+        else:
+            coalesced.append(event)
+
+    return coalesced
+
+
+class FrameScheduler:
+    """Paces the main loop so that each frame drains all waiting events, renders at most once and then sleeps
+    for the rest of its time budget. With adaptive pacing the target frame rate is lowered when frames take
+    longer than their budget and raised back towards the target when there is time to spare. When a frame
+    draws nothing the scheduler goes idle and blocks until the next event instead of redrawing."""
+
+    def __init__(self, target_fps=144, min_fps=30, adaptive=True, idle_timeout=1000):
+        self._target_fps = target_fps    # None runs uncapped, e.g. when the display is vsync limited
+        self._min_fps = min_fps
+        self._adaptive = adaptive
+        self._idle_timeout = idle_timeout  # longest an idle wait blocks, in milliseconds
+        self._fps = target_fps
+        self._idle = False
+        self._clock = pg.time.Clock()
+
+    def get_fps(self):
+        """Returns the frame rate currently aimed for (None when uncapped)."""
+
+        return self._fps
+
+    def is_idle(self):
+        """Returns True if the last frame drew nothing."""
+
+        return self._idle
+
+    def get_events(self):
+        """Returns the coalesced list of every event waiting. When idle and nothing is waiting, sleeps until an
+        event arrives or the idle timeout passes."""
+
+        events = pg.event.get()
+
+        if not events and self._idle:
+            event = pg.event.wait(self._idle_timeout)
+            if event.type != pg.NOEVENT:
+                events = [event] + pg.event.get()
+
+        return coalesce_events(events)
+
+    def end_frame(self, dirty_rects):
+        """Takes the rectangles the frame updated (as returned by Display.render) and waits out the rest of the
+        frame's time budget. An empty list puts the scheduler into idle mode."""
+
+        self._idle = not dirty_rects
+
+        if self._fps is None:
+            self._clock.tick()
+            return
+
+        self._clock.tick(self._fps)
+        if self._adaptive and not self._idle:
+            self.adjust(self._clock.get_rawtime())
+
+    def adjust(self, work_ms):
+        """Takes how many milliseconds the last frame's work took and moves the frame rate: down by 10% when the
+        work overran the frame budget, up by 10% (never past the target) when it used less than half of it."""
+
+        budget_ms = 1000 / self._fps
+
+        if work_ms > budget_ms:
+            self._fps = max(self._min_fps, int(self._fps * 0.9))
+        elif work_ms < budget_ms / 2:
+            self._fps = min(self._target_fps, int(self._fps * 1.1) + 1)
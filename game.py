@@ -1,26 +1,49 @@
+import random
+import time
 from deck import Deck
 from free_cell import FreeCell
 from column_cell import ColumnCell
 from suit_cell import SuitCell
-from display import Display
-from reset_button import ResetButton
+from state import State, area_key, encode_card, FREE_CELLS, COLUMNS, SUIT_CELLS, is_safe_to_found, \
+                  supermove_capacity, expand_supermove
+import zobrist
+from move_tracker import MoveTracker
+from solver import Solver
+from journal import MoveJournal
+
+
+# cards are auto played from the free cells and the columns, never from another suit cell
+AUTO_PLAY_SOURCES = list(FREE_CELLS) + list(COLUMNS)
+
+
+# most positions whose hints are kept before the hint cache is emptied
+HINT_CACHE_SIZE = 4096
 
 
 class Game:
     """Represents a game of free cell solitaire. The Game checks for all game logic, such as
     if a card selection or placement is valid, as well as checking when the game is won. A Game
-    has a deck and various card areas for cards to be placed."""
+    has a deck and various card areas for cards to be placed.
+
+    The Game is headless: it does not know about pygame or the screen. A Display wraps a Game
+    to draw it and to turn mouse events into Game calls, so the rules can also be run on their
+    own (simulations, solving, tests) without initializing SDL."""
 
-    def __init__(self):
-        self._display = Display(self)
-        self._reset_button = self.create_reset_button()
-        self.new_game()
+    def __init__(self, deal_number=None, autoplay=False):
+        self._autoplay = autoplay  # when True, safe cards are moved to the suit cells after every move
+        self.new_game(deal_number)
 
-    def new_game(self):
-        """Sets up a game with a new Deck of shuffled cards and fills the columns with cards."""
+    def new_game(self, deal_number=None):
+        """Sets up a game with the numbered deal and fills the columns with cards. Deal numbers follow the
+        classic Microsoft FreeCell deals, so the same number always gives the same game. Without a deal
+        number a random one in range [1, 1000000] is picked."""
 
+        if deal_number is None:
+            deal_number = random.randint(1, 1000000)
+
+        self._deal_number = deal_number
         self._deck = Deck()
-        self._deck.shuffle()
+        self._deck.arrange_deal(deal_number)
         self._card_areas = {     # format example: card_areas["free-cells"][1] would return the first FreeCell object
             "free-cells": {},
             "column-cells": {},
@@ -34,18 +57,76 @@ class Game:
         self._selected_cards = []
         self._previous_cards_area = None
 
-        # a new game starts with 5 moves (4 free cells + 1)
-        self._moves = 5
+        # a new game starts with 5 moves (4 free cells + 1); the empty areas are then counted as they change
+        self.count_empty_areas()
 
-    def get_display(self):
-        """Returns the display."""
+        # Zobrist hash of the position, kept up to date by select_card and the move_selection methods
+        self.rehash()
 
-        return self._display
-    
-    def get_reset_button(self):
-        """Returns the reset button."""
+        self.index_card_areas()
+
+        # available moves between areas, updated after every move for the two areas it touched
+        self._move_tracker = MoveTracker(self)
+
+        # history of moves for undo/redo and replays
+        self._journal = MoveJournal()
+
+        # value on top of each suit's foundation, indexed by suit - 1, how many cards the suit cells hold in
+        # all (52 when the game is won) and the cards the last autoplay moved
+        self._foundation_heights = [0] * 4
+        self._foundation_count = 0
+        self._auto_moves = []
+
+        # wall clock time the game started, for the statistics
+        self._start_time = time.time()
+
+        # ranked hints already worked out, by position hash (see hint)
+        self._hints = {}
+
+    def get_deal_number(self):
+        """Returns the number of the deal being played."""
+
+        return self._deal_number
+
+    def get_autoplay(self):
+        """Returns True if safe cards are moved to the suit cells automatically after every move."""
+
+        return self._autoplay
+
+    def set_autoplay(self, autoplay):
+        """Takes a boolean and turns automatic moves to the suit cells on or off."""
 
-        return self._reset_button
+        self._autoplay = autoplay
+
+    def get_foundation_heights(self):
+        """Returns the list of values on top of each suit's foundation, indexed by suit - 1."""
+
+        return self._foundation_heights
+
+    def get_foundation_count(self):
+        """Returns how many cards the suit cells hold in all."""
+
+        return self._foundation_count
+
+    def get_start_time(self):
+        """Returns the wall clock time (seconds since the epoch) the game was started."""
+
+        return self._start_time
+
+    def set_start_time(self, start_time):
+        """Takes a wall clock time and makes it the time the game was started, e.g. when a saved game is loaded."""
+
+        self._start_time = start_time
+
+    def moves_played(self):
+        """Returns how many moves have been made, not counting the ones undone."""
+
+        return len(self._journal)
+
+    def get_auto_moves(self):
+        """Returns the list of (source index, depth, destination index) moves made by the last autoplay."""
+
+        return self._auto_moves
 
     def get_card_areas(self):
         """Returns the card areas dictionary."""
@@ -79,61 +160,26 @@ class Game:
             self._previous_cards_area = card_area
 
     def init_card_areas(self):
-        """Fills the card areas dictionary with 4 free cells, 4 suit cells, and 8 column cells."""
-
-        # initialize 4 free cells and set their positions
-        dummy = FreeCell()  # just using a cell-type object to get its width and height; this object is not used otherwise
-        cell_width, cell_height = dummy.get_scaled_width(), dummy.get_scaled_height()
-        x, y = 10, 10
+        """Fills the card areas dictionary with 4 free cells, 4 suit cells, and 8 column cells. Positions
+        on the screen are set by the Display."""
 
         for id in range(1, 5):
-            free_cell = FreeCell()
-            free_cell.set_pos(x, y)
-            self._card_areas["free-cells"][id] = free_cell
-            x += (free_cell.get_scaled_width() + 10)
-
-        # initialize 4 suit cells and set their positions
-        x = self._display.get_width() - (cell_width + 10)
-
-        for id in range(4, 0, -1):
-            suit_cell = SuitCell()
-            suit_cell.set_pos(x, y)
-            self._card_areas["suit-cells"][id] = suit_cell
-            x -= (cell_width + 10)
-
-        # initialize 8 column cells and set their positions
-        x = (self._display.get_width() - (240 + 8 * cell_width)) / 2
-        y = 40 + cell_height
+            self._card_areas["free-cells"][id] = FreeCell()
+            self._card_areas["suit-cells"][id] = SuitCell()
 
         for id in range(1, 9):
-            column_cell = ColumnCell()
-            column_cell.set_pos(x, y)
-            self._card_areas["column-cells"][id] = column_cell
-            x += (cell_width + 30)
+            self._card_areas["column-cells"][id] = ColumnCell()
 
     def fill_columns(self):
-        """Distributes the 52 cards amongst the 8 columns and updates their coordinates."""
+        """Distributes the 52 cards amongst the 8 columns."""
 
         # fill left 4 columns with 7 cards each and right 4 columns with 6 cards each
         for col_idx in range(1, 9):
             cards_amt = 7 if col_idx < 5 else 6
             column = self._card_areas["column-cells"][col_idx]
-            x, y = column.get_pos()
 
-            # add cards to column and update coordinates
             for i in range(cards_amt):
-                card = self._deck.draw_card()
-                column.add_card(card)
-                card.set_pos(x, y)
-                y += 40  # staggers out cards vertically
-
-    def create_reset_button(self):
-        """Initializes the reset button and returns it."""
-
-        reset_button = ResetButton()
-        y = self._display.get_height() - (reset_button.get_scaled_height() + 20)
-        reset_button.set_pos(20, y)  #  set position at bottom left corner
-        return reset_button
+                column.add_card(self._deck.draw_card())
 
     def valid_selection(self, card, card_area):
         """Takes a card object and a card_area object as parameters. If selecting the card from the card area would be 
@@ -151,61 +197,145 @@ class Game:
         # validate selection first
         if not self.valid_selection(card, card_area): return False
         
-        # from bottom to top, continuosly remove cards from the card area until the selected card is reached, then remove that card as well
-        # all removed cards are add to selected cards
-        cards = card_area.get_cards()
-        idx = len(cards) - 1
-
-        while idx >= 0:
-            removed_card = cards.pop()
-            self._selected_cards.append(removed_card)
-
-            if removed_card == card: break
-
-            idx -= 1
-
-        # selected cards must be reversed since cards were added from the 'bottom-up'
-        self._selected_cards.reverse()
+        # the selected card and every card below it are removed from the card area, keeping their order
+        depth = card_area.selection_depth(card) if isinstance(card_area, ColumnCell) else 1
+        self._selected_cards += card_area.pop_cards(depth)
         # set card's previous area data attribute to the passed in card area
         self._previous_cards_area = card_area
 
+        # only the first selected card leaves the card it was resting on, the rest stay stacked on each other
+        self._hash ^= zobrist.card_key(encode_card(card), zobrist.location(card_area))
+
         return True
 
-    def moves_count(self):
-        """Returns the count of all empty free cells and column cells, plus one."""
+    def moves_count(self, to_empty_column=False):
+        """Returns how many cards can be moved at once: (empty free cells + 1) * 2 ^ (empty columns), or half
+        of that when the cards are moved into an empty column (see state.supermove_capacity)."""
+
+        if to_empty_column:
+            return supermove_capacity(self._empty_free_cells, self._empty_columns, True)
 
         return self._moves
     
     def update_moves_count(self):
-        """Updates the amount of cards that can be moved at a given time."""
+        """Updates the amount of cards that can be moved at a given time from the counts of empty areas."""
 
-        moves = 1
-        free_cells = self.get_card_areas()["free-cells"]
-        columns = self.get_card_areas()["column-cells"]
+        self._moves = supermove_capacity(self._empty_free_cells, self._empty_columns)
 
-        for free_cell in free_cells.values():
-            if free_cell.is_empty(): moves += 1
+    def count_empty_areas(self):
+        """Counts the empty free cells and columns from scratch and updates the moves count. The area the
+        selected cards came from is counted as occupied, since it is only emptied once the move is made. The
+        Game's move methods keep the counts up to date, so this is only needed when the areas are replaced or
+        changed directly."""
+
+        self._empty_free_cells = 0
+        self._empty_columns = 0
+
+        for free_cell in self._card_areas["free-cells"].values():
+            if free_cell.is_empty() and free_cell is not self._previous_cards_area: self._empty_free_cells += 1
 
-        for column in columns.values():
-            if column.is_empty(): moves += 1
+        for column in self._card_areas["column-cells"].values():
+            if column.is_empty() and column is not self._previous_cards_area: self._empty_columns += 1
+
+        self.update_moves_count()
 
-        self._moves = moves
+    def count_emptiness_change(self, card_area, change):
+        """Takes a card area that just became empty (change 1) or stopped being empty (change -1) and updates
+        the counts of empty areas. Suit cells are not counted."""
+
+        if isinstance(card_area, FreeCell):
+            self._empty_free_cells += change
+        elif isinstance(card_area, ColumnCell):
+            self._empty_columns += change
 
     def valid_move(self, card_area):
         """Takes a list of cards and a destination card area. If placing the card(s) in the destination
         card area would result in a valid move, returns True, otherwise False. A free cell can only take
         one card while a column may take as many cards as there are moves available."""
 
-        if self.moves_count() < len(self._selected_cards): return False  # cannot move more cards than there are available moves
+        to_empty_column = isinstance(card_area, ColumnCell) and card_area.is_empty()
+        if self.moves_count(to_empty_column) < len(self._selected_cards): return False  # cannot move more cards than there are available moves
 
         return card_area.valid_move(self._selected_cards)
 
     def move_selection_to_area(self, card_area):
         """Moves the selected cards to the destination card area."""
 
+        self.hash_placement(card_area)
+        was_empty = card_area.is_empty()
         card_area.place_cards(self._selected_cards)
+        if isinstance(card_area, SuitCell):
+            self.update_foundation_height(self._selected_cards[0])
+        previous_area = self._previous_cards_area
+        count = len(self._selected_cards)
         self.clear_selection()  # selection and previous area are cleared after card(s) are moved
-        self.update_moves_count()  #  moves count is only updated when cards are placed
+
+        #  moves count is only updated when cards are placed, from the two areas that may have changed
+        if previous_area is not card_area:
+            if previous_area is not None and previous_area.is_empty(): self.count_emptiness_change(previous_area, 1)
+            if was_empty: self.count_emptiness_change(card_area, -1)
+            self.update_moves_count()
+
+        if previous_area is not None:
+            self._move_tracker.refresh(previous_area, card_area)
+
+            if previous_area is not card_area:
+                self._journal.record(self.get_area_index(previous_area), self.get_area_index(card_area), count)
+
+        self._auto_moves = self.auto_play() if self._autoplay else []
+
+    def update_foundation_height(self, card):
+        """Takes the card just placed on a suit cell and records it as the top of its suit's foundation."""
+
+        self.set_foundation_height(card.get_suit(), card.get_value())
+
+    def set_foundation_height(self, suit, value):
+        """Takes a suit and the value now on top of its foundation and updates the heights and the count."""
+
+        self._foundation_count += value - self._foundation_heights[suit - 1]
+        self._foundation_heights[suit - 1] = value
+
+    def count_foundations(self):
+        """Recomputes the foundation heights from the suit cells. Called whenever the card areas are replaced."""
+
+        self._foundation_heights = [0] * 4
+        self._foundation_count = 0
+
+        for suit_cell in self._card_areas["suit-cells"].values():
+            if not suit_cell.is_empty():
+                self.update_foundation_height(suit_cell.get_cards()[-1])
+
+    def auto_play(self):
+        """Moves cards that are safe to put on the suit cells (see state.is_safe_to_found) there, repeating until
+        none is left. Only the cards on top of the free cells and columns are looked at, each checked in O(1)
+        against the foundation heights. The moves are recorded as automatic, so they are undone together with
+        the move that led to them. Returns the list of (source index, depth, destination index) moves made."""
+
+        moves = []
+        if self._selected_cards: return moves
+
+        heights = self._foundation_heights
+        moved = True
+
+        while moved:
+            moved = False
+
+            for src in AUTO_PLAY_SOURCES:
+                src_area = self.get_area(src)
+                if src_area.is_empty(): continue
+
+                card = src_area.get_cards()[-1]
+                code = encode_card(card)
+                if heights[card.get_suit() - 1] != card.get_value() - 1: continue  # cannot go home yet
+                if not is_safe_to_found(code, heights): continue
+
+                dst = next(dst for dst in SUIT_CELLS if self.get_area(dst).valid_move([card]))
+                self.transfer_cards(src_area, self.get_area(dst), 1)
+                self._journal.record(src, dst, 1, automatic=True)
+                moves.append((src, 1, dst))
+                moved = True
+
+        return moves
 
     def move_selection_to_previous_area(self):
         """Moves all selected cards back to their previous area."""
@@ -222,17 +352,208 @@ class Game:
 
         for card_area in areas_to_check:
             if card_area == self._previous_cards_area:
+                self.hash_placement(card_area)
                 card_area.place_cards(self._selected_cards)
                 break
 
         self.clear_selection()  # selection and previous area are cleared after card(s) are moved
 
+    def has_legal_moves(self):
+        """Returns True if any productive move is left (moving a card between free cells or a whole column to
+        an empty column does not count). Answered from the move tracker, so it is cheap to call every frame."""
+
+        return self._move_tracker.has_moves()
+
+    def is_winnable(self, time_budget=0.1):
+        """Searches for a win from the current position for at most time_budget seconds. Returns True if a win
+        was found, False if the position was proven lost, or None if the time ran out first."""
+
+        if self._selected_cards: return None
+
+        return Solver(self.get_state(), time_limit=time_budget).solve().solvable
+
+    def hint(self, time_budget=0.05):
+        """Returns the list of moves (source index, depth, destination index) worth making next, best first,
+        searching for at most time_budget seconds (see Solver.rank_moves). Hints are kept by position hash, so
+        asking again in a position already seen, e.g. after undoing, answers at once. Returns an empty list
+        while cards are selected or when no move can be made."""
+
+        if self._selected_cards: return []
+
+        state = self.get_state()
+        packed = state.pack()
+
+        # positions that only differ in column or free cell order share a hash, but not their moves
+        cached = self._hints.get(self._hash)
+        if cached is not None and cached[0] == packed: return cached[1]
+
+        if len(self._hints) >= HINT_CACHE_SIZE: self._hints.clear()
+
+        moves = Solver(state, time_limit=time_budget).rank_moves()
+        self._hints[self._hash] = (packed, moves)
+        return moves
+
+    def is_won(self):
+        """Returns True if every suit cell holds all 13 cards of its suit. Answered from the foundation count,
+        which the moves keep up to date, so it is cheap to call after every move."""
+
+        return self._foundation_count == 52
+
+    def refresh_moves(self):
+        """Recomputes the available moves from scratch. Only needed after the areas have been changed without
+        going through the Game's move methods."""
+
+        for column in self._card_areas["column-cells"].values():
+            column.count_run()
+
+        self.count_empty_areas()
+        self._move_tracker.refresh_all()
+
+    def position_hash(self):
+        """Returns the Zobrist hash of the position on the table (selected cards are not included). The hash is
+        the same for positions that only differ in the order of the free cells or of the columns."""
+
+        return self._hash
+
+    def rehash(self):
+        """Recomputes the position hash from the card areas. Only needed after the areas have been changed
+        without going through the Game's selection and move methods."""
+
+        self._hash = zobrist.hash_card_areas(self._card_areas)
+
+    def hash_placement(self, card_area):
+        """Updates the position hash for the selected cards being placed on the card area."""
+
+        if self._selected_cards:
+            self._hash ^= zobrist.card_key(encode_card(self._selected_cards[0]), zobrist.location(card_area))
+
     def clear_selection(self):
         """Resets the selected cards data attribute to an empty list and the previous cards area data attribute to None."""
 
         self.set_selected_cards()
         self.set_previous_cards_area()
     
+    def apply_move(self, move):
+        """Takes a move in the form (source index, depth, destination index), using the area indices from the
+        state module, and plays it: selects the bottom 'depth' cards of the source area and moves them to the
+        destination. Returns True if the move was made, else the cards stay where they were and returns False."""
+
+        src, depth, dst = move
+        src_area = self.get_area(src)
+
+        if self._selected_cards or depth < 1 or depth > src_area.cards_count(): return False
+
+        card = src_area.get_cards()[-depth]
+        if not self.select_card(card, src_area): return False
+
+        dst_area = self.get_area(dst)
+        if dst_area is not src_area and self.valid_move(dst_area):
+            self.move_selection_to_area(dst_area)
+            return True
+
+        self.move_selection_to_previous_area()
+        return False
+
+    def legal_moves(self):
+        """Returns the list of every move (source index, depth, destination index) apply_move would accept
+        right now, or an empty list while cards are selected."""
+
+        if self._selected_cards: return []
+
+        return self.get_state().legal_moves()
+
+    def expand_move(self, move):
+        """Takes a move in the form (source index, depth, destination index) and returns it as the list of
+        single card moves that make it up, resting cards only in the free cells and columns that are empty
+        now. Used to replay or animate a supermove one card at a time."""
+
+        src, _, dst = move
+        free_cells = [idx for idx in FREE_CELLS if self.get_area(idx).is_empty()]
+        empty_columns = [idx for idx in COLUMNS if idx not in (src, dst) and self.get_area(idx).is_empty()]
+
+        return expand_supermove(*move, free_cells, empty_columns)
+
+    def get_journal(self):
+        """Returns the MoveJournal holding the moves made in this game."""
+
+        return self._journal
+
+    def undo(self):
+        """Takes back the last move and the moves autoplay made after it, putting the cards back where they came
+        from (even out of a suit cell). Returns True if a move was undone, else False. Nothing can be undone
+        while cards are selected."""
+
+        if self._selected_cards or not self._journal.can_undo(): return False
+
+        for src, count, dst in self._journal.undo_step():
+            self.transfer_cards(self.get_area(dst), self.get_area(src), count)
+        return True
+
+    def redo(self):
+        """Makes the last undone move again, with the moves autoplay made after it. Returns True if a move was
+        redone, else False."""
+
+        if self._selected_cards or not self._journal.can_redo(): return False
+
+        for src, count, dst in self._journal.redo_step():
+            self.transfer_cards(self.get_area(src), self.get_area(dst), count)
+        return True
+
+    def transfer_cards(self, src_area, dst_area, count):
+        """Moves the bottom 'count' cards of one area onto another without checking the rules and without
+        recording the move, keeping the moves count, hash, foundation heights and move tracker up to date. Used by
+        undo, redo and autoplay."""
+
+        moved = src_area.pop_cards(count)
+
+        self._hash ^= zobrist.card_key(encode_card(moved[0]), zobrist.location(src_area))
+        self._hash ^= zobrist.card_key(encode_card(moved[0]), zobrist.location(dst_area))
+        if dst_area.is_empty(): self.count_emptiness_change(dst_area, -1)
+        if src_area.is_empty(): self.count_emptiness_change(src_area, 1)
+        dst_area.place_cards(moved)
+
+        if isinstance(dst_area, SuitCell):
+            self.update_foundation_height(moved[0])
+        elif isinstance(src_area, SuitCell):
+            self.set_foundation_height(moved[0].get_suit(), moved[0].get_value() - 1)
+
+        self.update_moves_count()
+        self._move_tracker.refresh(src_area, dst_area)
+
+    def index_card_areas(self):
+        """Maps every card area to its area index. Called whenever the card areas are replaced."""
+
+        self._area_indices = {id(self.get_area(index)): index for index in range(16)}
+
+    def get_area_index(self, card_area):
+        """Takes a card area of this game and returns its area index in range [0, 15]."""
+
+        return self._area_indices[id(card_area)]
+
+    def get_area(self, index):
+        """Takes an area index in range [0, 15] (see state.AREA_KEYS) and returns that card area."""
+
+        area_type, area_id = area_key(index)
+        return self._card_areas[area_type][area_id]
+
+    def get_state(self):
+        """Returns a compact State snapshot of the card areas. Selected cards are not part of the State, so
+        this should be called when nothing is selected."""
+
+        return State.from_card_areas(self._card_areas)
+
+    def set_state(self, state):
+        """Takes a State and replaces the card areas with new areas matching it. Any selection is cleared."""
+
+        self._card_areas = state.to_card_areas()
+        self.clear_selection()
+        self.count_empty_areas()
+        self.rehash()
+        self.index_card_areas()
+        self.count_foundations()
+        self._move_tracker.refresh_all()
+        self._journal.clear()  # the history no longer leads to this position
+
     def print_table(self):
         """Prints out the cards to the console in a readable format."""
 
@@ -0,0 +1,87 @@
+from suit_cell import SuitCell
+
+
+class HitIndex:
+    """A lookup structure for finding what is under the mouse. The screen is cut into vertical bands of a fixed
+    width and each band lists the card areas that overlap it, which is built once when the areas are laid out.
+    Within an area the cards are staggered by a fixed offset, so the card under a point is found with one
+    division instead of testing every card. Click and drop lookups are O(1) however many cards are out."""
+
+    def __init__(self, band_width=16):
+        self._band_width = band_width
+        self._areas = []         # card areas, in the order they were given to build
+        self._area_indices = {}  # id of a card area -> its position in self._areas
+        self._bands = []         # band number -> list of indices of the card areas overlapping that band
+        self._staggers = []      # position in self._areas -> vertical offset between the area's cards
+
+    def build(self, card_areas, screen_width):
+        """Takes a list of every card area (already positioned) and the screen width and rebuilds the bands. The
+        staggers start at 0 until update_area is called, so nothing is kept from the areas of an earlier deal."""
+
+        self._areas = list(card_areas)
+        self._area_indices = {id(card_area): idx for idx, card_area in enumerate(self._areas)}
+        self._bands = [[] for _ in range(screen_width // self._band_width + 1)]
+        self._staggers = [0] * len(self._areas)
+
+        for idx, card_area in enumerate(self._areas):
+            first = max(0, card_area.get_x() // self._band_width)
+            last = min(len(self._bands) - 1, (card_area.get_x() + card_area.get_scaled_width() - 1) // self._band_width)
+
+            for band in range(first, last + 1):
+                self._bands[band].append(idx)
+
+    def update_area(self, card_area, stagger):
+        """Takes a card area given to build and the vertical offset its cards were just laid out with."""
+
+        self._staggers[self._area_indices[id(card_area)]] = stagger
+
+    def indices_at(self, x):
+        """Returns the list of positions (in the list given to build) of the card areas overlapping the band
+        that contains the x coordinate."""
+
+        band = int(x) // self._band_width
+        if band < 0 or band >= len(self._bands): return []
+
+        return self._bands[band]
+
+    def card_at(self, pos):
+        """Takes a mouse position and returns (card, card area) for the topmost card under it in a free cell or
+        column, or None if there is no such card."""
+
+        x, y = pos
+
+        for idx in self.indices_at(x):
+            card_area = self._areas[idx]
+            if isinstance(card_area, SuitCell) or card_area.is_empty(): continue
+
+            left = card_area.get_x()
+            if not left <= x < left + card_area.get_scaled_width(): continue
+
+            # the card that starts last at or above y is the one drawn on top there
+            cards = card_area.get_cards()
+            top = card_area.get_y()
+            stagger = self._staggers[idx]
+            if y < top: continue
+
+            card_idx = len(cards) - 1 if stagger == 0 else min(len(cards) - 1, int(y - top) // stagger)
+            card = cards[card_idx]
+            if y < card.get_y() + card.get_scaled_height():
+                return card, card_area
+
+        return None
+
+    def drop_target(self, x, y):
+        """Takes the middle point of a dragged card and returns the card area it is being dropped on, or None.
+        Cards are dropped on the last card of an occupied area, or on the area itself when it is empty."""
+
+        for idx in self.indices_at(x):
+            card_area = self._areas[idx]
+            placement_area = card_area if card_area.is_empty() else card_area.get_cards()[-1]
+            left, top = placement_area.get_x(), placement_area.get_y()
+            right = left + placement_area.get_scaled_width()
+            bottom = top + placement_area.get_scaled_height()
+
+            if left < x < right and top < y < bottom:
+                return card_area
+
+        return None
@@ -0,0 +1,129 @@
+AUTOMATIC = 0x80  # flag in a move's count byte marking a move made by autoplay
+
+
+class MoveJournal:
+    """A history of moves stored as tiny deltas: each move is packed into 2 bytes, the source and destination
+    area indices (see state.AREA_KEYS) sharing the first byte and the number of cards moved in the second, whose
+    top bit marks moves made by autoplay. undo_step and redo_step treat a move and the automatic moves after it
+    as one step.
+    Moves after the cursor are the ones that can be redone; recording a new move drops them. Depth is
+    unlimited by default, at 2 bytes per move, or can be capped with max_depth, which forgets the oldest moves.
+    Forgotten moves are only cut off the front of the buffer once there are max_depth of them, so recording stays
+    O(1) (amortized) and the buffer never holds more than twice max_depth moves."""
+
+    def __init__(self, max_depth=None):
+        self._data = bytearray()
+        self._start = 0         # number of forgotten moves still at the front of the buffer
+        self._cursor = 0        # number of moves that can be undone
+        self._max_depth = max_depth
+
+    def __len__(self):
+        return self._cursor
+
+    def record(self, src, dst, count, automatic=False):
+        """Takes a source area index, a destination area index and a number of cards and records the move, as
+        made by autoplay if automatic is set."""
+
+        del self._data[(self._start + self._cursor) * 2:]  # a new move makes the undone moves unreachable
+        self._data += bytes((src << 4 | dst, count | AUTOMATIC if automatic else count))
+        self._cursor += 1
+
+        if self._max_depth is not None and self._cursor > self._max_depth:
+            self._start += 1
+            self._cursor -= 1
+
+            if self._start >= self._max_depth:
+                del self._data[:self._start * 2]
+                self._start = 0
+
+    def entry(self, idx):
+        """Returns the move at position idx as a (source index, count, destination index) tuple."""
+
+        offset = (self._start + idx) * 2
+        areas, count = self._data[offset], self._data[offset + 1] & ~AUTOMATIC
+        return areas >> 4, count, areas & 15
+
+    def is_automatic(self, idx):
+        """Returns True if the move at position idx was made by autoplay."""
+
+        return bool(self._data[(self._start + idx) * 2 + 1] & AUTOMATIC)
+
+    def can_undo(self):
+        """Returns True if there is a move to undo."""
+
+        return self._cursor > 0
+
+    def can_redo(self):
+        """Returns True if there is an undone move to redo."""
+
+        return (self._start + self._cursor) * 2 < len(self._data)
+
+    def undo(self):
+        """Steps back one move and returns it as (source index, count, destination index), or None."""
+
+        if not self.can_undo(): return None
+
+        self._cursor -= 1
+        return self.entry(self._cursor)
+
+    def redo(self):
+        """Steps forward one move and returns it as (source index, count, destination index), or None."""
+
+        if not self.can_redo(): return None
+
+        self._cursor += 1
+        return self.entry(self._cursor - 1)
+
+    def undo_step(self):
+        """Steps back over the last move and the automatic moves made after it. Returns the list of moves undone,
+        in the order to take them back, as (source index, count, destination index) tuples."""
+
+        moves = []
+
+        while self.can_undo():
+            moves.append(self.undo())
+            if not self.is_automatic(self._cursor): break
+
+        return moves
+
+    def redo_step(self):
+        """Steps forward over the next move and the automatic moves made after it. Returns the list of moves
+        redone, in order, as (source index, count, destination index) tuples."""
+
+        moves = []
+
+        while self.can_redo():
+            moves.append(self.redo())
+            if not self.can_redo() or not self.is_automatic(self._cursor): break
+
+        return moves
+
+    def moves(self):
+        """Returns the list of moves up to the cursor as (source index, depth, destination index) tuples, the
+        format Game.apply_move takes, so the history can be replayed from the start of the deal."""
+
+        return [self.entry(idx) for idx in range(self._cursor)]
+
+    def to_bytes(self):
+        """Returns the packed moves up to the cursor."""
+
+        return bytes(self._data[self._start * 2:(self._start + self._cursor) * 2])
+
+    def dump(self):
+        """Returns (every recorded move packed, including the ones that can be redone, and the cursor)."""
+
+        return bytes(self._data[self._start * 2:]), self._cursor
+
+    def load(self, data, cursor):
+        """Takes packed moves and a cursor, as returned by dump, and makes them the history."""
+
+        self._data = bytearray(data)
+        self._start = 0
+        self._cursor = cursor
+
+    def clear(self):
+        """Forgets every move."""
+
+        self._data = bytearray()
+        self._start = 0
+        self._cursor = 0
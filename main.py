@@ -1,31 +1,67 @@
-# Run this file to play a game of Free Cell solitaire
+# Run this file to play a game of Free Cell solitaire, e.g. python main.py, or python main.py --profile frames.json
+# to time the hot paths (see profiler.py)
+import argparse
 from game import *
 from display import *
+from frame_scheduler import FrameScheduler
+from replay import ReplayWriter
+from savegame import Autosaver, load
+from stats import StatsStore
+from profiler import Profiler, instrument_hot_paths
 import pygame as pg
 
+SAVE_PATH = "autosave.fcs"
+STATS_PATH = "stats.db"
+
 
 def main():
     """Main game loop function. Initializes Pygame and the game instance."""
+
+    parser = argparse.ArgumentParser(description="Play Free Cell solitaire.")
+    parser.add_argument("--profile", nargs="?", const="", default=None, metavar="PATH",
+                        help="time the hot paths and show them with F3; with a path, the results are written there "
+                             "on exit (.prof for a cProfile file, anything else for JSON)")
+    args = parser.parse_args()
     
     # pygame starting setup
     pg.init()
-    clock = pg.time.Clock()
+    scheduler = FrameScheduler(target_fps=144)
 
-    # set game and display objects
-    game = Game()
-    display = game.get_display()
+    # carry on with the game saved when the window was last closed, unless it was finished
+    game = load(SAVE_PATH, autoplay=True)
+    if game is None or game.is_won():
+        game = Game(autoplay=True)
+
+    # set display objects
+    replays = ReplayWriter("replays.fcr")
+    autosaver = Autosaver(SAVE_PATH)
+    stats = StatsStore(STATS_PATH)
+    profiler = Profiler() if args.profile is not None else None
+    display = Display(game, replays, autosaver, stats, profiler)
+    if profiler is not None:
+        instrument_hot_paths(profiler, game, display)
     
-    # game loop
+    # game loop: handle every waiting event, then draw at most one frame
     while True:
-        for event in pg.event.get():
+        events = scheduler.get_events()
+        if profiler is not None: profiler.start_frame()
+
+        for event in events:
             if event.type == pg.QUIT:
+                display.autosave()
+                autosaver.close()  # waits for the save to be written
+                stats.close()      # the game in progress is not over: it carries on from the save, so it is
+                replays.close()    # neither in the statistics nor in the replay file yet
+                if args.profile: profiler.dump(args.profile)
                 pg.quit()
+                return
             else:
                 display.check_event(event)
 
-            display.render()
-            clock.tick(144)
+        dirty_rects = display.render()
+        if profiler is not None: profiler.end_frame(bool(dirty_rects))
+        scheduler.end_frame(dirty_rects)
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
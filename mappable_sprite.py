@@ -1,39 +1,42 @@
-import pygame as pg
-
-
-class MappableSprite(pg.sprite.Sprite):
-    """A parent class for any mappable game sprite. Mappable sprites are defined as regular pygame sprites
-    with coordinates attached to them."""
-
-    def __init__(self, image):
-        pg.sprite.Sprite.__init__(self)
+class MappableSprite:
+    """A parent class for any mappable game object. Mappable objects are defined as objects with coordinates
+    attached to them. The image is optional so that game objects can exist without a display; the Display
+    attaches images to them when they need to be drawn."""
 
+    def __init__(self, image=None):
         self._image = image
-        self._rect = self._image.get_rect()
-        self._rect.x = 0
-        self._rect.y = 0
+        self._x = 0
+        self._y = 0
 
     def get_image(self):
         """Returns an image of the surface of the mappable object."""
         return self._image
-    
-    def get_rect(self):
-        """Returns the rectangle attribute."""
-        return self._rect
-    
+
+    def set_image(self, image):
+        """Sets the image used when drawing the mappable object."""
+        self._image = image
+
     def get_x(self):
         """Returns the x coordinate."""
-        return self._rect.x
+        return self._x
 
     def get_y(self):
         """Returns the y coordinate."""
-        return self._rect.y
+        return self._y
     
     def get_pos(self):
         """Returns a tuple in the form (x-coordinate, y-coordinate)."""
-        return self._rect.x, self._rect.y
+        return self._x, self._y
     
     def set_pos(self, x, y):
-        """Sets the mappable sprite's coordinates."""
-        self._rect.x = x
-        self._rect.y = y
+        """Sets the mappable sprite's coordinates. Coordinates are truncated to integers, the same way
+        a pygame Rect stores them."""
+        self._x = int(x)
+        self._y = int(y)
+
+    def collidepoint(self, pos):
+        """Takes a point in the form (x, y). Returns True if the point is inside the object's scaled bounds,
+        otherwise False."""
+        x, y = pos
+        return self._x <= x < self._x + self.get_scaled_width() and \
+               self._y <= y < self._y + self.get_scaled_height()
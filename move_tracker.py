@@ -0,0 +1,105 @@
+from free_cell import FreeCell
+from suit_cell import SuitCell
+from column_cell import ColumnCell
+
+
+class MoveTracker:
+    """Keeps track of which productive moves are available between the card areas of a Game. For every pair
+    of areas (source, destination) it stores the fewest cards that can legally be moved from one to the other,
+    so whether any move remains is a lookup against the current moves count instead of a search over every
+    pair of areas. After a move only the pairs involving the two areas it touched are recomputed, and only
+    once the available moves are asked for, so playing many moves without asking (replays, simulations)
+    costs nothing here.
+
+    Moves that cannot change the game in a useful way are not tracked: a card from a free cell to another free
+    cell, and a whole column into an empty column."""
+
+    def __init__(self, game):
+        self._game = game
+        self._areas = []           # card areas by area index (see state.AREA_KEYS)
+        self._indices = {}         # id of a card area -> its area index
+        self._runs = [0] * 16      # length of the ordered run at the bottom of each area
+        self._candidates = {}      # (source index, destination index) -> fewest cards that can be moved
+        self._stale = set()        # area indices changed since the candidates were last brought up to date
+        self.refresh_all()
+
+    def refresh_all(self):
+        """Marks every pair of areas for recomputing. Called when the Game's card areas are replaced."""
+
+        self._areas = [self._game.get_area(idx) for idx in range(16)]
+        self._indices = {id(card_area): idx for idx, card_area in enumerate(self._areas)}
+        self._candidates = {}
+        self._stale = set(range(16))
+
+    def refresh(self, *card_areas):
+        """Takes the card areas changed by the last move and marks the pairs they are part of for recomputing."""
+
+        for card_area in card_areas:
+            self._stale.add(self._indices[id(card_area)])
+
+    def update(self):
+        """Recomputes the pairs of every area changed since the last update."""
+
+        if not self._stale: return
+
+        touched, self._stale = self._stale, set()
+
+        for idx in touched:
+            self._runs[idx] = self.run_length(self._areas[idx])
+
+        if len(touched) == 16:
+            for src in range(16):
+                for dst in range(16):
+                    self.update_pair(src, dst)
+            return
+
+        for idx in touched:
+            for other in range(16):
+                self.update_pair(idx, other)
+                self.update_pair(other, idx)
+
+    def run_length(self, card_area):
+        """Returns how many cards at the bottom of the area could be selected together."""
+
+        if isinstance(card_area, SuitCell) or card_area.is_empty(): return 0
+        if isinstance(card_area, FreeCell): return 1
+
+        return card_area.run_length()  # kept up to date by the column itself
+
+    def update_pair(self, src, dst):
+        """Recomputes the fewest cards that can be moved from area src to area dst (both area indices)."""
+
+        self._candidates.pop((src, dst), None)
+
+        run = self._runs[src]
+        if src == dst or run == 0: return
+
+        source, destination = self._areas[src], self._areas[dst]
+        if isinstance(source, FreeCell) and isinstance(destination, FreeCell): return
+
+        cards = source.get_cards()
+        if isinstance(destination, ColumnCell) and destination.is_empty() and run == len(cards) == 1: return
+
+        for depth in range(1, run + 1):
+            if isinstance(destination, ColumnCell) and destination.is_empty() and depth == len(cards): break
+
+            if destination.valid_move(cards[-depth:]):
+                self._candidates[(src, dst)] = depth
+                return
+
+    def has_moves(self):
+        """Returns True if at least one productive move can be made with the current moves count."""
+
+        self.update()
+        moves = self._game.moves_count()
+
+        for depth in self._candidates.values():
+            if depth <= moves: return True
+
+        return False
+
+    def get_candidates(self):
+        """Returns the (source index, destination index) -> fewest cards dictionary."""
+
+        self.update()
+        return self._candidates
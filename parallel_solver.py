@@ -0,0 +1,371 @@
+import heapq
+import multiprocessing as mp
+import os
+import queue
+import time
+from multiprocessing import shared_memory
+from solver import SolverStats, SolverResult, auto_play, heuristic, is_solved, play, successors
+from state import State
+import zobrist
+
+# ---------------------------------------------------------------------------------------------------------
+# PARALLEL SEARCH (HDA*): every position belongs to one worker process, picked by its Zobrist hash modulo the
+# number of workers. A worker keeps the open list and the parent links of its own positions; children that
+# belong to another worker are sent to it in batches through its inbox queue. Because each position has a
+# single owner, duplicates are caught without locks: the transposition table is one shared memory block of
+# 64 bit hashes split into a region per worker, and only a region's owner ever writes to it. Other workers
+# only read it, to skip sending children their owner has already seen; a read that races with a write can at
+# worst let a duplicate through, which the owner then drops.
+#
+# Inbox messages are ("positions", [(hash, parent hash, moves, free, suits, columns), ...]), ("lookup", hash)
+# asking for a position's parent link, and ("stop",). Workers answer on the shared results queue with
+# ("solved", worker, hash) and ("parent", hash, parent hash, moves).
+# ---------------------------------------------------------------------------------------------------------
+
+EMPTY_SLOT = 0
+BATCH_NODES = 64  # positions a worker expands between sending its batches and reading its inbox
+
+
+def hash_position(free, suits, columns):
+    """Returns the Zobrist hash (see zobrist.hash_state) of a (free cells, suit cells, columns) position. Never
+    returns EMPTY_SLOT, which marks free slots in the table."""
+
+    return zobrist.hash_state(State(free, suits, columns)) or 1
+
+
+def hash_after(value, free, suits, columns, move):
+    """Takes the hash of a position and a move made from it, and returns the hash after the move. Only the
+    first card moved changes location (see zobrist), so this is O(1)."""
+
+    src, depth, dst = move
+
+    if src < 4:
+        code, below = free[src], zobrist.IN_FREE_CELL
+    else:
+        column = columns[src - 8]
+        code = column[-depth]
+        below = column[-depth - 1] if len(column) > depth else zobrist.COLUMN_BASE
+
+    if dst < 4:
+        above = zobrist.IN_FREE_CELL
+    elif dst < 8:
+        above = zobrist.IN_SUIT_CELL
+    else:
+        target = columns[dst - 8]
+        above = target[-1] if target else zobrist.COLUMN_BASE
+
+    return value ^ zobrist.card_key(code, below) ^ zobrist.card_key(code, above) or 1
+
+
+def play_hashed(value, free, suits, columns, move):
+    """Makes a move and the safe moves to the suit cells after it. Returns the new hash, the new
+    (free cells, suit cells, columns) and the moves made, the given move first."""
+
+    value = hash_after(value, free, suits, columns, move)
+    free, suits, columns = play(free, suits, columns, move)
+    after_free, after_suits, after_columns, auto_moves = auto_play(free, suits, columns)
+
+    # safe moves only take cards off the bottom of the free cells and columns, so the card each one moves, and
+    # the card it rested on, can be read from the position before them
+    taken = [0] * 8
+    for src, _, _ in auto_moves:
+        if src < 4:
+            code, below = free[src], zobrist.IN_FREE_CELL
+        else:
+            column = columns[src - 8]
+            taken[src - 8] += 1
+            code = column[-taken[src - 8]]
+            below = column[-taken[src - 8] - 1] if len(column) > taken[src - 8] else zobrist.COLUMN_BASE
+
+        value ^= zobrist.card_key(code, below) ^ zobrist.card_key(code, zobrist.IN_SUIT_CELL)
+
+    return value or 1, after_free, after_suits, after_columns, (move,) + tuple(auto_moves)
+
+
+class SharedTable:
+    """A set of position hashes in shared memory, split into one open addressing region per worker. Only the
+    owner of a hash (hash modulo workers) may add it; any worker may look hashes up."""
+
+    def __init__(self, name, slots, workers):
+        self._memory = shared_memory.SharedMemory(name=name)
+        self._slots = self._memory.buf.cast("Q")
+        self._workers = workers
+        self._region = slots // workers  # slots per worker
+        self._size = 0                   # hashes this process has added
+
+    @classmethod
+    def create(cls, slots, workers):
+        """Creates the shared memory block for a table of 'slots' hashes and returns its name."""
+
+        memory = shared_memory.SharedMemory(create=True, size=slots * 8)
+        memory.buf[:slots * 8] = bytes(slots * 8)
+        name = memory.name
+        memory.close()
+        return name
+
+    def slot(self, value):
+        """Returns the slot where the hash is, or the empty slot where it would go, or -1 if its region is full."""
+
+        owner = value % self._workers
+        start = owner * self._region
+        idx = (value // self._workers) % self._region
+
+        for _ in range(self._region):
+            stored = self._slots[start + idx]
+            if stored == value or stored == EMPTY_SLOT: return start + idx
+            idx = idx + 1 if idx + 1 < self._region else 0
+
+        return -1
+
+    def __contains__(self, value):
+        idx = self.slot(value)
+        return idx >= 0 and self._slots[idx] == value
+
+    def add(self, value):
+        """Adds a hash owned by this worker. Returns True if it was added, False if it was already there or the
+        region is full (see is_full)."""
+
+        idx = self.slot(value)
+        if idx < 0 or self._slots[idx] == value: return False
+
+        self._slots[idx] = value
+        self._size += 1
+        return True
+
+    def is_full(self, load=0.75):
+        """Returns True once this worker's region is filled past the load factor, when lookups get slow."""
+
+        return self._size >= self._region * load
+
+    def close(self):
+        """Detaches from the shared memory block."""
+
+        self._slots.release()
+        self._memory.close()
+
+
+def run_worker(index, workers, inboxes, results, table_name, table_slots, counters, stop):
+    """The search loop of one worker process. counters holds, per worker, the positions sent and received
+    through the inboxes, the nodes expanded and generated, whether the worker is idle and whether it had to
+    drop positions because its table region was full. Expanding stops once stop is set, but messages are
+    answered until the stop message."""
+
+    sent, received, expanded, generated, idle, dropped = counters
+    table = SharedTable(table_name, table_slots, workers)
+    inbox = inboxes[index]
+    open_list = []
+    parents = {}   # hash -> (parent hash, moves), for the positions this worker owns
+    outboxes = [[] for _ in range(workers)]
+    counter = 0    # heap tie breaker
+
+    def add(value, parent, moves, free, suits, columns):
+        """Adds a position this worker owns, unless it has been seen."""
+
+        nonlocal counter
+        if value in parents: return  # the parent links hold exactly this worker's part of the table
+
+        if table.is_full() or not table.add(value):
+            dropped[index] = 1
+            return
+
+        parents[value] = (parent, moves)
+        heapq.heappush(open_list, (heuristic(free, suits, columns), counter, value, free, suits, columns))
+        counter += 1
+
+    def handle(message):
+        """Handles an inbox message. Returns False for the stop message."""
+
+        if message[0] == "positions":
+            idle[index] = 0  # busy before the positions count as received, so the search never looks finished
+            for entry in message[1]:
+                add(*entry)
+            received[index] += len(message[1])
+        elif message[0] == "lookup":
+            results.put(("parent", message[1]) + parents[message[1]])
+        else:
+            return False
+
+        return True
+
+    try:
+        while True:
+            # read everything waiting; when there is nothing to expand, wait for work
+            while True:
+                try:
+                    message = inbox.get(block=not open_list or stop.is_set(), timeout=0.005)
+                except queue.Empty:
+                    break
+
+                if not handle(message): return
+
+            idle[index] = not open_list or stop.is_set()
+            if idle[index]: continue
+
+            for _ in range(BATCH_NODES):
+                if not open_list: break
+
+                _, _, value, free, suits, columns = heapq.heappop(open_list)
+
+                if is_solved(suits):
+                    results.put(("solved", index, value))
+                    stop.set()
+                    break
+
+                expanded[index] += 1
+
+                for move in successors(free, suits, columns):
+                    generated[index] += 1
+                    child_value, child_free, child_suits, child_columns, moves = \
+                        play_hashed(value, free, suits, columns, move)
+                    owner = child_value % workers
+
+                    if owner == index:
+                        add(child_value, value, moves, child_free, child_suits, child_columns)
+                    elif child_value not in table:
+                        outboxes[owner].append((child_value, value, moves, child_free, child_suits, child_columns))
+
+            for owner, batch in enumerate(outboxes):
+                if batch:
+                    sent[index] += len(batch)
+                    inboxes[owner].put(("positions", batch))
+                    outboxes[owner] = []
+    finally:
+        table.close()
+
+
+class ParallelSolver:
+    """Searches for a win like Solver, but spread over worker processes with hash distributed best-first search
+    (see PARALLEL SEARCH above). Each worker searches best-first among its own positions, so the order of the
+    search, and the solution found, can differ between runs; every solution is a legal winning sequence of
+    (source index, depth, destination index) moves. max_nodes and max_table are totals over all workers."""
+
+    def __init__(self, state, workers=None, max_nodes=200000, max_table=1000000, time_limit=None):
+        self._state = state
+        self._workers = workers or os.cpu_count() or 1
+        self._max_nodes = max_nodes
+        self._max_table = max_table
+        self._time_limit = time_limit
+        self._stats = SolverStats()
+
+    def get_stats(self):
+        """Returns the SolverStats of the last search."""
+
+        return self._stats
+
+    def solve(self):
+        """Searches for a winning sequence of moves and returns a SolverResult."""
+
+        self._stats = stats = SolverStats()
+        start_time = time.perf_counter()
+        workers = self._workers
+
+        free, suits, columns = (tuple(self._state.free_cells), tuple(self._state.suit_cells),
+                                tuple(bytes(column) for column in self._state.columns))
+        free, suits, columns, root_moves = auto_play(free, suits, columns)
+        root = hash_position(free, suits, columns)
+
+        # twice as many slots as positions kept, so probes stay short
+        table_slots = max(2 * self._max_table // workers, 1024) * workers
+        table_name = SharedTable.create(table_slots, workers)
+
+        context = mp.get_context()
+        inboxes = [context.Queue() for _ in range(workers)]
+        results = context.Queue()
+        stop = context.Event()
+        counters = [context.RawArray("q", workers) for _ in range(6)]
+        processes = [context.Process(target=run_worker, daemon=True,
+                                     args=(index, workers, inboxes, results, table_name, table_slots, counters,
+                                           stop))
+                     for index in range(workers)]
+
+        try:
+            for process in processes:
+                process.start()
+
+            inboxes[root % workers].put(("positions", [(root, None, tuple(root_moves), free, suits, columns)]))
+            outcome = self._wait(results, counters, stop, start_time, processes)
+
+            if outcome is True:
+                moves = self._build_path(results, inboxes)
+            else:
+                moves = []
+        finally:
+            stop.set()
+            for inbox in inboxes:
+                inbox.put(("stop",))
+            for process in processes:
+                process.join(timeout=5)
+                if process.is_alive(): process.terminate()
+
+            memory = shared_memory.SharedMemory(name=table_name)
+            memory.close()
+            memory.unlink()
+
+            stats.nodes_expanded = sum(counters[2])
+            stats.nodes_generated = sum(counters[3])
+            stats.elapsed = time.perf_counter() - start_time
+
+        return SolverResult(outcome, moves, stats)
+
+    def _wait(self, results, counters, stop, start_time, processes):
+        """Waits for the workers to finish. Returns True when one found a win, False when every position was
+        searched without one, and None when a limit stopped the search first. Raises RuntimeError if a worker
+        dies."""
+
+        sent, received, expanded, _, idle, dropped = counters
+        quiet = 0  # checks in a row that found every worker idle with nothing in flight
+
+        while True:
+            try:
+                message = results.get(timeout=0.01)
+            except queue.Empty:
+                message = None
+
+            if message is not None and message[0] == "solved":
+                self._goal = message[2]
+                return True
+
+            if any(process.exitcode is not None for process in processes):
+                raise RuntimeError("a solver worker stopped unexpectedly")
+
+            if sum(expanded) >= self._max_nodes or \
+               (self._time_limit is not None and time.perf_counter() - start_time > self._time_limit):
+                stop.set()
+                return None
+
+            # the root was sent by this process, so the workers have received one more position than they sent
+            if all(idle) and sum(sent) + 1 == sum(received):
+                quiet += 1
+                if quiet == 2:
+                    return None if any(dropped) else False
+            else:
+                quiet = 0
+
+    def _build_path(self, results, inboxes):
+        """Asks the owners of the positions on the way to the win for their parent links, from the winning
+        position back to the root, and returns the moves in order."""
+
+        workers = len(inboxes)
+        path = []
+        value = self._goal
+
+        while value is not None:
+            inboxes[value % workers].put(("lookup", value))
+
+            while True:
+                message = results.get()
+                if message[0] == "parent" and message[1] == value: break
+
+            _, _, parent, moves = message
+            path.extend(reversed(moves))
+            value = parent
+
+        path.reverse()
+        return path
+
+
+def solve_parallel(game, workers=None, **limits):
+    """Takes a Game with nothing selected and returns a SolverResult for its current position, searched by a
+    ParallelSolver. Keyword arguments are passed on to the ParallelSolver."""
+
+    return ParallelSolver(game.get_state(), workers, **limits).solve()
@@ -0,0 +1,155 @@
+import bisect
+import json
+import marshal
+import time
+from collections import deque
+
+# methods timed by instrument_hot_paths, by the object they are looked up on
+DISPLAY_HOT_PATHS = ["render", "render_cells", "check_card_click", "check_card_placement", "update_card_positions"]
+GAME_HOT_PATHS = ["select_card", "valid_move", "update_moves_count"]
+
+# upper edges of the frame time histogram buckets, in milliseconds; the last bucket holds everything slower
+FRAME_BUCKETS_MS = [1, 2, 4, 8, 16, 33, 66, 100]
+
+# frames whose times are kept for the percentiles
+RECENT_FRAMES = 1000
+
+
+class Profiler:
+    """Counts calls and time spent in instrumented methods and collects how long frames take. Nothing is timed
+    until methods are wrapped with instrument, so a game run without a Profiler pays nothing for it.
+
+    For every method both the total time (including the instrumented methods it calls) and its own time
+    (without them) are kept, which is what a cProfile file holds as cumulative and total time."""
+
+    def __init__(self):
+        self._counters = {}  # name -> [calls, total seconds, own seconds, code object]
+        self._stack = []     # time spent in instrumented callees of each instrumented call in progress
+        self._histogram = [0] * (len(FRAME_BUCKETS_MS) + 1)
+        self._recent = deque(maxlen=RECENT_FRAMES)  # milliseconds taken by the last frames
+        self._frames = 0
+        self._slowest = 0.0
+        self._frame_start = None
+
+    def instrument(self, obj, *names):
+        """Takes an object and the names of its methods, and replaces each method on that object (not on its
+        class) with one that is timed. Counters are named ClassName.method_name."""
+
+        for name in names:
+            method = getattr(obj, name)
+            setattr(obj, name, self.wrap(method, f"{type(obj).__name__}.{name}"))
+
+    def wrap(self, function, name):
+        """Takes a function and a counter name and returns the function timed into that counter."""
+
+        counter = self._counters.setdefault(name, [0, 0.0, 0.0, getattr(function, "__code__", None)])
+        stack = self._stack
+        clock = time.perf_counter
+
+        def timed(*args, **kwargs):
+            stack.append(0.0)
+            start = clock()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                elapsed = clock() - start
+                counter[0] += 1
+                counter[1] += elapsed
+                counter[2] += elapsed - stack.pop()
+                if stack: stack[-1] += elapsed
+
+        return timed
+
+    def start_frame(self):
+        """Marks the start of a frame's work (after waiting for events, before handling them)."""
+
+        self._frame_start = time.perf_counter()
+
+    def end_frame(self, drew=True):
+        """Marks the end of a frame's work. Frames that drew nothing are not counted, so idle waits do not hide
+        the slow frames."""
+
+        if self._frame_start is None or not drew: return
+
+        ms = (time.perf_counter() - self._frame_start) * 1000
+        self._frame_start = None
+        self._frames += 1
+        self._slowest = max(self._slowest, ms)
+        self._recent.append(ms)
+        self._histogram[bisect.bisect_left(FRAME_BUCKETS_MS, ms)] += 1
+
+    def get_counters(self):
+        """Returns a dictionary of counter name -> (calls, total seconds, own seconds), busiest first."""
+
+        counters = {name: tuple(counter[:3]) for name, counter in self._counters.items()}
+        return dict(sorted(counters.items(), key=lambda item: -item[1][1]))
+
+    def get_histogram(self):
+        """Returns the list of (bucket label, frames) of the frame time histogram."""
+
+        labels = [f"<{edge} ms" for edge in FRAME_BUCKETS_MS] + [f">={FRAME_BUCKETS_MS[-1]} ms"]
+        return list(zip(labels, self._histogram))
+
+    def frames_count(self):
+        """Returns how many frames have been timed."""
+
+        return self._frames
+
+    def slowest_frame(self):
+        """Returns the milliseconds taken by the slowest frame timed."""
+
+        return self._slowest
+
+    def frame_percentile(self, percent):
+        """Takes a percentage and returns the frame time in milliseconds below which that share of the recent
+        frames fall, or 0.0 before any frame."""
+
+        if not self._recent: return 0.0
+
+        times = sorted(self._recent)
+        return times[min(len(times) - 1, int(len(times) * percent / 100))]
+
+    def to_dict(self):
+        """Returns the counters and frame times as a dictionary that can be written as JSON."""
+
+        return {
+            "counters": {name: {"calls": calls, "total_ms": round(total * 1000, 3), "own_ms": round(own * 1000, 3)}
+                         for name, (calls, total, own) in self.get_counters().items()},
+            "frames": {
+                "count": self._frames,
+                "p50_ms": round(self.frame_percentile(50), 3),
+                "p99_ms": round(self.frame_percentile(99), 3),
+                "max_ms": round(self._slowest, 3),
+                "histogram": dict(self.get_histogram())
+            }
+        }
+
+    def pstats_dict(self):
+        """Returns the counters in the form cProfile saves them, keyed by (file name, line number, function name),
+        with (primitive calls, calls, own time, total time, callers) values."""
+
+        stats = {}
+
+        for name, (calls, total, own, code) in self._counters.items():
+            key = (code.co_filename, code.co_firstlineno, name) if code else ("~", 0, name)
+            stats[key] = (calls, calls, own, total, {})
+
+        return stats
+
+    def dump(self, path):
+        """Writes the results to a file: a cProfile file (readable with pstats or snakeviz) if the name ends in
+        .prof or .pstats, otherwise JSON."""
+
+        if path.endswith((".prof", ".pstats")):
+            with open(path, "wb") as file:
+                marshal.dump(self.pstats_dict(), file)
+        else:
+            with open(path, "w") as file:
+                json.dump(self.to_dict(), file, indent=2)
+
+
+def instrument_hot_paths(profiler, game, display):
+    """Takes a Profiler, a Game and a Display and times the methods on their hot paths."""
+
+    profiler.instrument(display, *DISPLAY_HOT_PATHS)
+    profiler.instrument(game, *GAME_HOT_PATHS)
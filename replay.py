@@ -0,0 +1,190 @@
+# Run this file to replay recorded games against the rules, e.g. python replay.py games.fcr --workers 8
+import argparse
+import os
+import struct
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from game import Game
+
+# ---------------------------------------------------------------------------------------------------------
+# REPLAY FILES: an 8 byte magic followed by one record per game, appended as games finish. A record is the
+# deal number (uint32) and the number of moves (uint16), then the packed moves. A move takes one byte, the
+# source and destination area indices (see state.AREA_KEYS) in its two halves, plus a second byte with the
+# number of cards for column to column moves, the only moves that can carry more than one card.
+# ---------------------------------------------------------------------------------------------------------
+
+MAGIC = b"FCREPLY1"
+RECORD_HEADER = struct.Struct("<IH")
+FIRST_COLUMN = 8
+
+
+def encode_moves(moves):
+    """Takes a list of (source index, depth, destination index) moves and returns them packed into bytes."""
+
+    data = bytearray()
+
+    for src, depth, dst in moves:
+        data.append(src << 4 | dst)
+        if src >= FIRST_COLUMN and dst >= FIRST_COLUMN:
+            data.append(depth)
+        elif depth != 1:
+            raise ValueError(f"only column to column moves can carry more than one card: {(src, depth, dst)}")
+
+    return bytes(data)
+
+
+def decode_moves(data, count, offset=0):
+    """Takes packed moves, how many of them to read and where they start. Returns the list of
+    (source index, depth, destination index) moves and the offset just past the last one."""
+
+    moves = []
+
+    for _ in range(count):
+        src, dst = data[offset] >> 4, data[offset] & 15
+        offset += 1
+
+        if src >= FIRST_COLUMN and dst >= FIRST_COLUMN:
+            moves.append((src, data[offset], dst))
+            offset += 1
+        else:
+            moves.append((src, 1, dst))
+
+    return moves, offset
+
+
+class ReplayWriter:
+    """Appends game records to a replay file, starting the file with the magic if it is new. Every record is
+    flushed as it is written, so the games played so far survive the program being stopped."""
+
+    def __init__(self, path):
+        new_file = not os.path.exists(path) or os.path.getsize(path) == 0
+        self._file = open(path, "ab")
+        if new_file:
+            self._file.write(MAGIC)
+            self._file.flush()
+
+    def write_game(self, deal_number, moves):
+        """Takes a deal number and the list of moves played from it and appends the record."""
+
+        self._file.write(RECORD_HEADER.pack(deal_number, len(moves)) + encode_moves(moves))
+        self._file.flush()
+
+    def record(self, game):
+        """Takes a Game and appends its deal number and the moves in its journal. Games without any moves are
+        not recorded. Returns True if a record was written."""
+
+        moves = game.get_journal().moves()
+        if not moves: return False
+
+        self.write_game(game.get_deal_number(), moves)
+        return True
+
+    def close(self):
+        """Closes the replay file."""
+
+        self._file.close()
+
+
+def read_replays(path):
+    """Yields (deal number, moves) for every record in a replay file. A record cut short at the end of the file
+    by an interruption is skipped."""
+
+    with open(path, "rb") as file:
+        data = file.read()
+
+    if data[:len(MAGIC)] != MAGIC:
+        raise ValueError(f"{path} is not a replay file")
+
+    offset = len(MAGIC)
+
+    while offset + RECORD_HEADER.size <= len(data):
+        deal_number, count = RECORD_HEADER.unpack_from(data, offset)
+
+        try:
+            moves, offset = decode_moves(data, count, offset + RECORD_HEADER.size)
+        except IndexError:
+            return
+
+        if offset > len(data): return
+        yield deal_number, moves
+
+
+def replay_game(deal_number, moves, atomic=False):
+    """Takes a deal number and a list of moves and plays them from the start of the deal, checking every move
+    with Game.valid_move. With atomic set, moves of several cards are played one card at a time (see
+    Game.expand_move). Returns (index of the first move that is not legal or None, True if the game ends won)."""
+
+    game = Game(deal_number)
+
+    for idx, move in enumerate(moves):
+        if not atomic or move[1] == 1:
+            if not game.apply_move(move): return idx, False
+            continue
+
+        if not game.get_state().valid_move(move): return idx, False
+        for step in game.expand_move(move):
+            if not game.apply_move(step): return idx, False
+
+    return None, game.is_won()
+
+
+def replay_chunk(records, atomic=False):
+    """Takes a list of (record number, deal number, moves) and returns a list of
+    (record number, deal number, divergence, won) for them."""
+
+    return [(number, deal_number) + replay_game(deal_number, moves, atomic) for number, deal_number, moves in records]
+
+
+def chunked(records, chunk_size):
+    """Yields lists of at most chunk_size numbered records."""
+
+    chunk = []
+    for number, (deal_number, moves) in enumerate(records):
+        chunk.append((number, deal_number, moves))
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+
+    if chunk: yield chunk
+
+
+def run_replays(path, workers=1, chunk_size=256, atomic=False):
+    """Replays every game in a replay file. With one worker everything runs in this process; otherwise chunks
+    of games are spread over a process pool. Returns a list of (record number, deal number, divergence, won)
+    in file order, where divergence is the index of the first illegal move or None."""
+
+    chunks = chunked(read_replays(path), chunk_size)
+
+    if workers == 1:
+        return [result for chunk in chunks for result in replay_chunk(chunk, atomic)]
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return [result for results in executor.map(replay_chunk, chunks, repeat(atomic)) for result in results]
+
+
+def main():
+    """Parses the command line, replays the file and reports the games that diverge."""
+
+    parser = argparse.ArgumentParser(description="Replay recorded games and check every move against the rules.")
+    parser.add_argument("path", help="replay file")
+    parser.add_argument("--workers", type=int, default=1, help="worker processes (default 1)")
+    parser.add_argument("--chunk-size", type=int, default=256, help="games sent to a worker at a time")
+    parser.add_argument("--atomic", action="store_true", help="play moves of several cards one card at a time")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    results = run_replays(args.path, args.workers, args.chunk_size, args.atomic)
+    elapsed = time.perf_counter() - start
+
+    diverged = [result for result in results if result[2] is not None]
+    for number, deal_number, divergence, _ in diverged:
+        print(f"game {number} (deal #{deal_number}) diverges at move {divergence}")
+
+    won = sum(1 for result in results if result[3])
+    print(f"replayed {len(results)} games in {elapsed:.2f}s ({len(results) / elapsed if elapsed else 0:.0f} games/s), "
+          f"{won} won, {len(diverged)} diverged")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,6 @@
 from mappable_sprite import MappableSprite
-from sprite_sheet import SpriteSheet
 from constants import *
+import assets
 
 
 class ResetButton(MappableSprite):
@@ -28,13 +28,9 @@ class ResetButton(MappableSprite):
         return self._height * self._scale
 
     def init_images(self):
-        """Fills the images dictionary with sprites."""
+        """Fills the images dictionary with sprites from the shared asset cache."""
 
-        sprites = SpriteSheet("images/reset_button.png")
-        up_sprite = sprites.get_sprite(48, 0, self._width, self._height, self._scale)
-        down_sprite = sprites.get_sprite(0, 0, self._width, self._height, self._scale)
-        self._images["up"] = up_sprite
-        self._images["down"] = down_sprite        
+        self._images.update(assets.reset_button_images(self._width, self._height, self._scale))
 
     def set_default_image(self):
         """Sets the starting sprite to the unpressed button image."""
@@ -46,6 +42,11 @@ class ResetButton(MappableSprite):
 
         self._image = self._images["up"]
 
+    def is_down(self):
+        """Returns True if the button is showing its pressed image."""
+
+        return self._image is self._images["down"]
+
     def set_image_down(self):
         """Sets the sprite to the pressed image."""
 
@@ -0,0 +1,165 @@
+import os
+import struct
+import threading
+import time
+from game import Game
+from state import State, encode_card
+
+# ---------------------------------------------------------------------------------------------------------
+# SAVE FILES: a game is saved as a header (magic, deal number, seconds played, selection, moves count, undo
+# cursor and the length of the packed State), the packed State (see State.pack) and the packed undo history (see
+# MoveJournal). Cards that are selected when the game is saved are stored back in the area they were taken
+# from, along with the area index and how many cards were taken, so loading selects them again. A whole
+# save is around 100 bytes plus 2 bytes per move.
+# ---------------------------------------------------------------------------------------------------------
+
+SAVE_MAGIC = b"FCSAVE02"
+SAVE_HEADER = struct.Struct("<8sIIBBHIB")
+NO_SELECTION = 255
+
+
+def snapshot(game):
+    """Takes a Game and returns its position, selection, moves count and undo history as bytes."""
+
+    state = game.get_state()
+    selected = game.get_selected_cards()
+    src, count = NO_SELECTION, 0
+
+    if selected:
+        # the selection is saved as if it had been dropped back where it came from
+        src, count = game.get_area_index(game.get_previous_cards_area()), len(selected)
+        if src < 4:
+            state.free_cells[src] = encode_card(selected[0])
+        else:
+            state.columns[src - 8].extend(encode_card(card) for card in selected)
+
+    packed = state.pack()
+    history, cursor = game.get_journal().dump()
+
+    elapsed = max(0, int(time.time() - game.get_start_time()))
+
+    return SAVE_HEADER.pack(SAVE_MAGIC, game.get_deal_number(), elapsed, src, count, game.moves_count(), cursor,
+                            len(packed)) + packed + history
+
+
+def restore(game, data):
+    """Takes a Game and bytes made by snapshot and puts the saved game into it: the position, the undo history,
+    the selection and the time already played. Raises ValueError if the bytes are not a save."""
+
+    if len(data) < SAVE_HEADER.size:
+        raise ValueError("save is too short")
+
+    magic, deal_number, elapsed, src, count, moves, cursor, length = SAVE_HEADER.unpack_from(data)
+    if magic != SAVE_MAGIC:
+        raise ValueError("not a save")
+
+    start = SAVE_HEADER.size
+    state = State.unpack(data[start:start + length])
+
+    game.new_game(deal_number)
+    game.set_state(state)
+    game.get_journal().load(data[start + length:], cursor)
+    game.set_start_time(time.time() - elapsed)
+
+    if game.moves_count() != moves:
+        raise ValueError("save is damaged: its moves count does not match its position")
+
+    if src != NO_SELECTION:
+        card_area = game.get_area(src)
+        game.select_card(card_area.get_cards()[-count], card_area)
+
+
+def save(game, path):
+    """Takes a Game and writes it to a file. The save goes to a temporary file first and then replaces the old
+    one, so a crash part way through never leaves a broken save behind."""
+
+    write_file(path, snapshot(game))
+
+
+def write_file(path, data):
+    """Writes bytes to a file by replacing it with a fully written temporary file."""
+
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as file:
+        file.write(data)
+    os.replace(temp_path, path)
+
+
+def load(path, **options):
+    """Takes the path of a save file and returns the Game saved in it, made with the given Game keyword
+    arguments (e.g. autoplay), or None if there is no usable save."""
+
+    try:
+        with open(path, "rb") as file:
+            data = file.read()
+
+        game = Game(**options)
+        restore(game, data)
+        return game
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class Autosaver:
+    """Saves a game to a file on a background thread. Taking the snapshot only copies the game into a few
+    bytes, which takes microseconds, so it is done straight away on the caller's thread; writing it to disk is
+    left to the thread, so the render loop never waits on the disk. When several saves are asked for before
+    the thread gets to them, only the latest is written."""
+
+    def __init__(self, path):
+        self._path = path
+        self._pending = None          # latest snapshot not written yet
+        self._condition = threading.Condition()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="autosave", daemon=True)
+        self._thread.start()
+
+    def get_path(self):
+        """Returns the path of the save file."""
+
+        return self._path
+
+    def request(self, game):
+        """Takes a Game and queues a snapshot of it to be written."""
+
+        data = snapshot(game)
+
+        with self._condition:
+            self._pending = data
+            self._condition.notify()
+
+    def flush(self):
+        """Waits until every requested save has been written."""
+
+        with self._condition:
+            while self._pending is not None:
+                self._condition.wait()
+
+    def close(self):
+        """Writes any requested save and stops the thread."""
+
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+
+        self._thread.join()
+
+    def _run(self):
+        """Writes snapshots as they are requested until closed."""
+
+        while True:
+            with self._condition:
+                while self._pending is None and not self._closed:
+                    self._condition.wait()
+
+                if self._pending is None: return
+                data = self._pending
+
+            try:
+                write_file(self._path, data)
+            except OSError:
+                pass  # e.g. the disk is full; the next save tries again
+
+            with self._condition:
+                if self._pending is data: self._pending = None
+                self._condition.notify_all()
@@ -0,0 +1,340 @@
+# Run this file to host games over TCP, e.g. python server.py --port 8765 (see benchmarks/server_load.py)
+import argparse
+import asyncio
+import random
+import struct
+import time
+from deal_cache import initial_state
+from state import FREE_CELLS, SUIT_CELLS, COLUMNS, can_stack
+
+# ---------------------------------------------------------------------------------------------------------
+# PROTOCOL: every connection is one game session. A request is a one byte opcode followed by a fixed number
+# of argument bytes, so requests can be pipelined; they are answered in order. The selection and move requests
+# mirror Game's console methods (select_from_column_with_validation, select_from_free_cell_with_validation and
+# move_cards_with_validation) and take the same arguments:
+#
+#   N deal number (uint32, 0 for a random deal)   start a new game
+#   C column id (1-8), card index (0 at the top)  select cards from a column
+#   F free cell id (1-4)                          select the card in a free cell
+#   M area type (0 free cell, 1 suit cell,        move the selected cards to an area; an invalid move puts
+#     2 column), area id                          them back where they came from, an area that does not
+#                                                 exist leaves them selected
+#   S                                             send the position
+#
+# Every request is answered with one status byte: REJECTED, OK, or WON when the move just made won the game.
+# N and S are followed by the packed State (see State.pack), preceded by its length in one byte.
+# ---------------------------------------------------------------------------------------------------------
+
+NEW_GAME = ord("N")
+SELECT_COLUMN = ord("C")
+SELECT_FREE_CELL = ord("F")
+MOVE = ord("M")
+GET_STATE = ord("S")
+
+REQUEST_FORMATS = {
+    NEW_GAME: struct.Struct("<I"),
+    SELECT_COLUMN: struct.Struct("<BB"),
+    SELECT_FREE_CELL: struct.Struct("<B"),
+    MOVE: struct.Struct("<BB"),
+    GET_STATE: struct.Struct("")
+}
+
+REJECTED, OK, WON = 0, 1, 2
+
+# first area index of each area type of a move request, in the order of the area type byte
+AREA_TYPE_STARTS = [FREE_CELLS[0], SUIT_CELLS[0], COLUMNS[0]]
+AREA_TYPE_SIZES = [len(FREE_CELLS), len(SUIT_CELLS), len(COLUMNS)]
+
+
+def encode_request(opcode, *args):
+    """Takes an opcode and its arguments and returns the request bytes."""
+
+    return bytes((opcode,)) + REQUEST_FORMATS[opcode].pack(*args)
+
+
+class Session:
+    """One game played over a connection. A session holds a State rather than a Game: a State is around 1 KB
+    where a Game with its Card objects and card areas is around 17 KB, and its moves are checked with the same
+    rules (see State.valid_move), so thousands of sessions fit in a few megabytes. Selected cards stay in
+    their area until they are moved, as (source area index, depth)."""
+
+    __slots__ = ("deal_number", "state", "selection", "moves", "last_active")
+
+    def __init__(self):
+        self.deal_number = None
+        self.state = None
+        self.selection = None
+        self.moves = 0
+        self.last_active = 0.0  # time.monotonic() of the last request, for closing idle sessions
+
+    def new_game(self, deal_number=None):
+        """Deals the numbered game, or a random one without a deal number."""
+
+        if not deal_number:
+            deal_number = random.randint(1, 1000000)
+
+        self.deal_number = deal_number
+        self.state = initial_state(deal_number)
+        self.selection = None
+        self.moves = 0
+
+    def select_from_column(self, column_id, card_idx):
+        """Takes a column id in range [1, 8] and a card index from the top of the column. Selects that card and
+        every card below it, if they can be moved together. Returns True if the selection was made."""
+
+        if self.state is None or self.selection is not None or column_id not in range(1, 9): return False
+
+        column_idx = column_id - 1
+        depth = len(self.state.columns[column_idx]) - card_idx
+        if card_idx < 0 or depth < 1 or depth > self.state.run_length(column_idx): return False
+
+        self.selection = (COLUMNS[column_idx], depth)
+        return True
+
+    def select_from_free_cell(self, free_cell_id):
+        """Takes a free cell id in range [1, 4] and selects its card. Returns True if the selection was made."""
+
+        if self.state is None or self.selection is not None or free_cell_id not in range(1, 5): return False
+
+        src = FREE_CELLS[free_cell_id - 1]
+        if not self.state.get_cards(src): return False
+
+        self.selection = (src, 1)
+        return True
+
+    def move_cards(self, area_type, area_id):
+        """Takes an area type (0 for a free cell, 1 for a suit cell, 2 for a column) and an area id counted from
+        1. Moves the selected cards there if the rules allow it, else they stay where they were; either way the
+        selection is dropped, unless the area does not exist, which leaves the selection as it was. Returns True
+        if the move was made or the cards were put back where they came from."""
+
+        if self.selection is None: return False
+        if area_type not in range(3) or area_id not in range(1, AREA_TYPE_SIZES[area_type] + 1): return False
+
+        src, depth = self.selection
+        self.selection = None
+
+        dst = AREA_TYPE_STARTS[area_type] + area_id - 1
+        if dst == src: return self.fits_back(src, depth)
+
+        move = (src, depth, dst)
+        if not self.state.valid_move(move): return False
+
+        self.state.apply_move(move)
+        self.moves += 1
+        return True
+
+    def fits_back(self, src, depth):
+        """Takes the selection's source area index and depth. Returns True if the Game would accept the
+        selected cards being put back where they came from, which leaves the position as it was."""
+
+        if src in FREE_CELLS: return True
+
+        column = self.state.columns[src - 8]
+        rest = len(column) - depth
+        if depth > self.state.moves_count(rest == 0): return False
+
+        return rest == 0 or can_stack(column[rest], column[rest - 1])
+
+    def state_bytes(self):
+        """Returns the packed State preceded by its length, or just a zero length before the first game."""
+
+        if self.state is None: return b"\x00"
+
+        packed = self.state.pack()
+        return bytes((len(packed),)) + packed
+
+
+def handle_request(session, opcode, args):
+    """Takes a Session, a request opcode and its unpacked arguments, carries the request out and returns the
+    response bytes. Every request is a constant amount of work, so no request can hold up the others."""
+
+    if opcode == NEW_GAME:
+        session.new_game(args[0])
+        return bytes((OK,)) + session.state_bytes()
+
+    if opcode == GET_STATE:
+        return bytes((OK,)) + session.state_bytes()
+
+    if opcode == SELECT_COLUMN:
+        done = session.select_from_column(*args)
+    elif opcode == SELECT_FREE_CELL:
+        done = session.select_from_free_cell(*args)
+    else:
+        done = session.move_cards(*args)
+        if done and session.state.is_won(): return bytes((WON,))
+
+    return bytes((OK if done else REJECTED,))
+
+
+class SessionProtocol(asyncio.Protocol):
+    """The connection of one session. Requests are answered as soon as their bytes arrive, in the same
+    callback, without a task or stream objects per connection, which keeps each connection's memory and the
+    time from request to response small. When the client stops reading its responses, reading its requests is
+    paused until it catches up, so a slow client cannot make the server buffer without limit."""
+
+    __slots__ = ("_server", "_transport", "_buffer", "session")
+
+    def __init__(self, server):
+        self._server = server
+        self._transport = None
+        self._buffer = b""  # bytes of a request not fully received yet
+        self.session = Session()
+
+    def get_transport(self):
+        """Returns the connection's transport."""
+
+        return self._transport
+
+    def connection_made(self, transport):
+        self._transport = transport
+        if not self._server.add_session(self):
+            transport.close()  # the server is full
+
+    def connection_lost(self, exc):
+        self._server.remove_session(self)
+
+    def pause_writing(self):
+        self._transport.pause_reading()
+
+    def resume_writing(self):
+        self._transport.resume_reading()
+
+    def data_received(self, data):
+        """Answers every complete request received, in one write."""
+
+        buffer = self._buffer + data if self._buffer else data
+        responses = []
+        offset = 0
+
+        while offset < len(buffer):
+            opcode = buffer[offset]
+            request_format = REQUEST_FORMATS.get(opcode)
+            if request_format is None:  # not a request: the connection is out of step
+                self._transport.close()
+                return
+
+            end = offset + 1 + request_format.size
+            if end > len(buffer): break
+
+            args = request_format.unpack_from(buffer, offset + 1)
+            responses.append(handle_request(self.session, opcode, args))
+            offset = end
+
+        self._buffer = buffer[offset:]
+        self.session.last_active = time.monotonic()
+        if responses: self._transport.write(b"".join(responses))
+
+
+class GameServer:
+    """Hosts game sessions on an asyncio TCP server, one session per connection. Connections past
+    max_sessions are closed straight away, and sessions that send nothing for idle_timeout seconds are
+    closed, so the server's memory stays bounded."""
+
+    def __init__(self, max_sessions=20000, idle_timeout=300):
+        self._max_sessions = max_sessions
+        self._idle_timeout = idle_timeout
+        self._connections = set()  # SessionProtocol of every connected session
+        self._server = None
+        self._sweeper = None
+
+    def sessions_count(self):
+        """Returns how many sessions are connected."""
+
+        return len(self._connections)
+
+    def get_port(self):
+        """Returns the port the server listens on."""
+
+        return self._server.sockets[0].getsockname()[1]
+
+    def add_session(self, connection):
+        """Takes a new SessionProtocol and registers it. Returns False if the server is full."""
+
+        if len(self._connections) >= self._max_sessions: return False
+
+        connection.session.last_active = time.monotonic()
+        self._connections.add(connection)
+        return True
+
+    def remove_session(self, connection):
+        """Takes the SessionProtocol of a closed connection and forgets it."""
+
+        self._connections.discard(connection)
+
+    async def start(self, host="127.0.0.1", port=0):
+        """Starts listening on the host and port (a free port when 0)."""
+
+        loop = asyncio.get_running_loop()
+        self._server = await loop.create_server(lambda: SessionProtocol(self), host, port, backlog=4096)
+        self._sweeper = loop.create_task(self.close_idle_sessions())
+
+    async def close(self):
+        """Stops listening and closes every session."""
+
+        self._sweeper.cancel()
+        self._server.close()
+        for connection in list(self._connections):
+            connection.get_transport().close()
+        await self._server.wait_closed()
+
+    async def serve_forever(self):
+        """Serves until cancelled."""
+
+        await self._server.serve_forever()
+
+    async def close_idle_sessions(self):
+        """Closes the connections of sessions that have been idle longer than the idle timeout, checking every
+        few seconds."""
+
+        while True:
+            await asyncio.sleep(min(30, self._idle_timeout))
+            deadline = time.monotonic() - self._idle_timeout
+
+            for connection in list(self._connections):
+                if connection.session.last_active < deadline:
+                    connection.get_transport().close()
+
+
+def raise_open_files_limit():
+    """Raises this process's limit of open files to the most allowed, since every session is a socket."""
+
+    try:
+        import resource
+    except ImportError:  # resource only exists on Unix
+        return
+
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft != hard:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+
+async def run(host, port, max_sessions, idle_timeout):
+    """Starts a GameServer and serves until cancelled."""
+
+    server = GameServer(max_sessions, idle_timeout)
+    await server.start(host, port)
+    print(f"serving on {host}:{server.get_port()}", flush=True)
+    await server.serve_forever()
+
+
+def main():
+    """Parses the command line and runs the server."""
+
+    parser = argparse.ArgumentParser(description="Host Free Cell games over TCP.")
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on")
+    parser.add_argument("--port", type=int, default=8765, help="port to listen on (0 for any free port)")
+    parser.add_argument("--max-sessions", type=int, default=20000, help="most sessions connected at once")
+    parser.add_argument("--idle-timeout", type=float, default=300, help="seconds before an idle session is closed")
+    args = parser.parse_args()
+
+    raise_open_files_limit()
+
+    try:
+        asyncio.run(run(args.host, args.port, args.max_sessions, args.idle_timeout))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
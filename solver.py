@@ -0,0 +1,397 @@
+import heapq
+import time
+import tracemalloc
+from state import *
+
+
+class SolverStats:
+    """Counters collected while the Solver runs, used for tuning it."""
+
+    def __init__(self):
+        self.nodes_expanded = 0     # positions taken off the open list and expanded
+        self.nodes_generated = 0    # child positions created, including ones already in the table
+        self.elapsed = 0.0          # seconds spent searching
+        self.peak_open = 0          # largest size of the open list
+        self.peak_table = 0         # largest size of the transposition table
+        self.peak_memory = None     # peak traced bytes, only set when memory tracking is on
+
+    def nodes_per_second(self):
+        """Returns how many nodes were expanded per second."""
+
+        if self.elapsed == 0: return 0.0
+
+        return self.nodes_expanded / self.elapsed
+
+    def __repr__(self):
+        return f"SolverStats(expanded={self.nodes_expanded}, generated={self.nodes_generated}, " \
+               f"elapsed={self.elapsed:.3f}s, nodes/s={self.nodes_per_second():.0f}, " \
+               f"peak_open={self.peak_open}, peak_table={self.peak_table}, peak_memory={self.peak_memory})"
+
+
+class SolverResult:
+    """The outcome of a search. solvable is True when moves holds a winning sequence, False when the search
+    proved that no win exists, and None when a limit was reached before either could be shown."""
+
+    def __init__(self, solvable, moves, stats):
+        self.solvable = solvable
+        self.moves = moves
+        self.stats = stats
+
+    def __repr__(self):
+        return f"SolverResult(solvable={self.solvable}, moves={len(self.moves)}, {self.stats})"
+
+
+class Solver:
+    """A best-first FreeCell solver. Positions are expanded in order of a heuristic estimate of the work left,
+    and every position reached is stored in a transposition table keyed by a form of the position that does
+    not depend on free cell or column order, so symmetric duplicates are only expanded once. Moves follow the
+    Game's rules (ColumnCell, FreeCell and SuitCell valid_move plus the moves_count limit) and are returned
+    as (source index, depth, destination index) tuples that Game.apply_move can play.
+
+    Cards that are safe to put on the suit cells (no card that could still be stacked on them is left outside
+    the suit cells) are moved there automatically after every move; those moves are part of the solution."""
+
+    def __init__(self, state, max_nodes=200000, max_table=1000000, time_limit=None, track_memory=False):
+        self._state = state
+        self._max_nodes = max_nodes
+        self._max_table = max_table
+        self._time_limit = time_limit
+        self._track_memory = track_memory
+        self._stats = SolverStats()
+
+    def get_stats(self):
+        """Returns the SolverStats of the last search."""
+
+        return self._stats
+
+    def solve(self):
+        """Searches for a winning sequence of moves and returns a SolverResult."""
+
+        self._stats = stats = SolverStats()
+        tracing = self._track_memory and not tracemalloc.is_tracing()
+        if tracing: tracemalloc.start()
+
+        start_time = time.perf_counter()
+        deadline = start_time + self._time_limit if self._time_limit is not None else None
+
+        try:
+            result = self._search(stats, deadline)
+        finally:
+            stats.elapsed = time.perf_counter() - start_time
+            if tracing:
+                stats.peak_memory = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+
+        return result
+
+    def _search(self, stats, deadline):
+        """Runs the best-first search loop."""
+
+        free, suits, columns = (tuple(self._state.free_cells), tuple(self._state.suit_cells),
+                                tuple(bytes(column) for column in self._state.columns))
+        free, suits, columns, auto_moves = auto_play(free, suits, columns)
+
+        root_key = position_key(free, suits, columns)
+        parents = {root_key: (None, tuple(auto_moves))}  # transposition table: key -> (parent key, moves to get here)
+        open_list = [(heuristic(free, suits, columns), 0, 0, free, suits, columns, root_key)]
+        counter = 1  # tie breaker so heap entries never compare positions
+        complete = True
+
+        while open_list:
+            if stats.nodes_expanded >= self._max_nodes or \
+               (deadline is not None and stats.nodes_expanded & 255 == 0 and time.perf_counter() > deadline):
+                complete = False
+                break
+
+            _, depth, _, free, suits, columns, key = heapq.heappop(open_list)
+
+            if is_solved(suits):
+                return SolverResult(True, self._build_path(parents, key), stats)
+
+            stats.nodes_expanded += 1
+
+            for move in successors(free, suits, columns):
+                stats.nodes_generated += 1
+                child_free, child_suits, child_columns = play(free, suits, columns, move)
+                child_free, child_suits, child_columns, auto_moves = auto_play(child_free, child_suits, child_columns)
+                child_key = position_key(child_free, child_suits, child_columns)
+
+                if child_key in parents: continue
+
+                if len(parents) >= self._max_table:
+                    complete = False  # positions are being dropped, so an empty open list would prove nothing
+                    continue
+
+                parents[child_key] = (key, (move,) + tuple(auto_moves))
+                heapq.heappush(open_list, (heuristic(child_free, child_suits, child_columns), depth + 1, counter,
+                                           child_free, child_suits, child_columns, child_key))
+                counter += 1
+
+            stats.peak_open = max(stats.peak_open, len(open_list))
+            stats.peak_table = max(stats.peak_table, len(parents))
+
+        stats.peak_table = max(stats.peak_table, len(parents))
+
+        # the whole reachable space was searched without finding a win
+        return SolverResult(False if complete else None, [], stats)
+
+    def rank_moves(self):
+        """Ranks the moves that can be made from the position, best first, for as long as the limits allow. The
+        search is the same best-first search as solve, but every position remembers which first move it was
+        reached through, and each first move is scored by the lowest heuristic estimate found after it. The
+        search can stop at any time and still give a ranking: a first move leading to a win comes first, then
+        the others by their score. If a card can safely go to the suit cells, that move alone is returned."""
+
+        self._stats = stats = SolverStats()
+        start_time = time.perf_counter()
+        deadline = start_time + self._time_limit if self._time_limit is not None else None
+
+        free, suits, columns = (tuple(self._state.free_cells), tuple(self._state.suit_cells),
+                                tuple(bytes(column) for column in self._state.columns))
+        free, suits, columns, auto_moves = auto_play(free, suits, columns)
+        if auto_moves: return auto_moves[:1]
+
+        first_moves = []   # first move of every branch, in the order they were generated
+        scores = []        # lowest estimate found in each branch
+        winner = None      # branch in which a win was found
+        seen = {position_key(free, suits, columns)}
+        open_list = []
+
+        for move in successors(free, suits, columns):
+            child = auto_play(*play(free, suits, columns, move))[:3]
+            key = position_key(*child)
+            if key in seen: continue
+
+            seen.add(key)
+            first_moves.append(move)
+            scores.append(heuristic(*child))
+            heapq.heappush(open_list, (scores[-1], len(first_moves), len(first_moves) - 1) + child)
+
+        counter = len(first_moves)
+
+        while open_list and winner is None:
+            if stats.nodes_expanded >= self._max_nodes or \
+               (deadline is not None and stats.nodes_expanded & 15 == 0 and time.perf_counter() > deadline):
+                break
+
+            _, _, branch, free, suits, columns = heapq.heappop(open_list)
+
+            if is_solved(suits):
+                winner = branch
+                break
+
+            stats.nodes_expanded += 1
+
+            for move in successors(free, suits, columns):
+                stats.nodes_generated += 1
+                child = auto_play(*play(free, suits, columns, move))[:3]
+                key = position_key(*child)
+
+                if key in seen or len(seen) >= self._max_table: continue
+
+                seen.add(key)
+                estimate = heuristic(*child)
+                scores[branch] = min(scores[branch], estimate)
+                heapq.heappush(open_list, (estimate, counter, branch) + child)
+                counter += 1
+
+        stats.elapsed = time.perf_counter() - start_time
+        stats.peak_table = len(seen)
+
+        order = sorted(range(len(first_moves)), key=lambda idx: (idx != winner, scores[idx], idx))
+        return [first_moves[idx] for idx in order]
+
+    def _build_path(self, parents, key):
+        """Follows the parent links from the given key back to the root and returns the moves in order."""
+
+        path = []
+
+        while key is not None:
+            parent, moves = parents[key]
+            path.extend(reversed(moves))
+            key = parent
+
+        path.reverse()
+        return path
+
+
+def solve(game, **limits):
+    """Takes a Game with nothing selected and returns a SolverResult for its current position. Keyword
+    arguments are passed on to the Solver."""
+
+    return Solver(game.get_state(), **limits).solve()
+
+
+# ---------------------------------------------------------------------------------------------------------
+# SEARCH HELPERS: positions inside the search are plain tuples, (free cells, suit cells, columns), where
+# free cells and suit cells are 4 card codes and columns is 8 bytes objects. Tuples are cheap to build and
+# hash, which matters more here than the mutability of State.
+# ---------------------------------------------------------------------------------------------------------
+
+def position_key(free, suits, columns):
+    """Returns a transposition table key for a position that is the same for any order of free cells,
+    suit cells and columns."""
+
+    return bytes(sorted(free)) + bytes(sorted(suits)) + b"|".join(sorted(columns))
+
+
+def is_solved(suits):
+    """Returns True if every suit cell holds a King."""
+
+    return all(top >> 2 == 13 for top in suits)
+
+
+def heuristic(free, suits, columns):
+    """Returns an estimate of the work left in a position: the cards not yet on the suit cells, plus every
+    card that sits on top of a lower card of its column (it has to move before that card can go home), plus
+    one for every occupied free cell."""
+
+    home = sum(top >> 2 for top in suits)
+    blocked = 0
+
+    for column in columns:
+        lowest = 14
+        for code in column:
+            value = code >> 2
+            if value > lowest:
+                blocked += 1
+            else:
+                lowest = value
+
+    return (52 - home) + blocked + (4 - free.count(NO_CARD))
+
+
+def suit_cell_for(suits, code):
+    """Returns the suit cell index (0-3) that the card code can be placed on, or -1 if none."""
+
+    for idx, top in enumerate(suits):
+        if top == NO_CARD:
+            if code >> 2 == 1: return idx
+        elif code - top == 4:
+            return idx
+
+    return -1
+
+
+def successors(free, suits, columns):
+    """Yields the moves worth trying from a position. Moves between symmetric areas are only generated once
+    (the first empty free cell and the first empty column), and moves that cannot change the position in a
+    useful way (free cell to free cell, a whole column to an empty column) are skipped."""
+
+    empty_free = free.index(NO_CARD) if NO_CARD in free else -1
+    empty_columns = [idx for idx, column in enumerate(columns) if not column]
+    empty_column = empty_columns[0] if empty_columns else -1
+    capacity = supermove_capacity(free.count(NO_CARD), len(empty_columns))
+    capacity_to_empty = supermove_capacity(free.count(NO_CARD), len(empty_columns), True)
+
+    # free cell cards to the suit cells or onto columns
+    for src, code in enumerate(free):
+        if code == NO_CARD: continue
+
+        cell = suit_cell_for(suits, code)
+        if cell >= 0:
+            yield (src, 1, 4 + cell)
+
+        for dst, column in enumerate(columns):
+            if column and can_stack(code, column[-1]):
+                yield (src, 1, 8 + dst)
+
+        if empty_column >= 0:
+            yield (src, 1, 8 + empty_column)
+
+    for src, column in enumerate(columns):
+        if not column: continue
+
+        code = column[-1]
+        cell = suit_cell_for(suits, code)
+        if cell >= 0:
+            yield (8 + src, 1, 4 + cell)
+
+        # the ordered run at the bottom of the column, limited by how many cards can be moved at once
+        run = 1
+        while run < len(column) and can_stack(column[-run], column[-run - 1]):
+            run += 1
+
+        for dst, target in enumerate(columns):
+            if dst == src or not target: continue
+
+            # only one depth can fit: the card one value lower than the target's bottom card
+            depth = (target[-1] >> 2) - (code >> 2)
+            if 1 <= depth <= min(run, capacity) and can_stack(column[-depth], target[-1]):
+                yield (8 + src, depth, 8 + dst)
+
+        if empty_column >= 0:
+            for depth in range(1, min(run, capacity_to_empty) + 1):
+                if depth == len(column): break  # moving a whole column to an empty column changes nothing
+                yield (8 + src, depth, 8 + empty_column)
+
+        if empty_free >= 0:
+            yield (8 + src, 1, empty_free)
+
+
+def play(free, suits, columns, move):
+    """Returns the (free cells, suit cells, columns) position after the move."""
+
+    src, depth, dst = move
+    free = list(free)
+    columns = list(columns)
+
+    if src < 4:
+        cards = bytes((free[src],))
+        free[src] = NO_CARD
+    else:
+        column = columns[src - 8]
+        cards = column[-depth:]
+        columns[src - 8] = column[:-depth]
+
+    if dst < 4:
+        free[dst] = cards[0]
+    elif dst < 8:
+        suits = list(suits)
+        suits[dst - 4] = cards[0]
+        suits = tuple(suits)
+    else:
+        columns[dst - 8] += cards
+
+    return tuple(free), suits, tuple(columns)
+
+
+def is_safe(code, suits):
+    """Returns True if the card code can be put on the suit cells (given as their top card codes) without
+    losing anything. See state.is_safe_to_found."""
+
+    return is_safe_to_found(code, foundation_heights(suits))
+
+
+def auto_play(free, suits, columns):
+    """Repeatedly moves safe cards from the free cells and the bottom of the columns to the suit cells.
+    Returns the new (free cells, suit cells, columns) and the list of moves made. The foundation heights are
+    worked out once and kept up to date as cards go home, so each exposed card is checked in O(1)."""
+
+    moves = []
+    heights = foundation_heights(suits)
+    moved = True
+
+    while moved:
+        moved = False
+
+        for src, code in enumerate(free):
+            if code == NO_CARD or heights[code & 3] != (code >> 2) - 1 or not is_safe_to_found(code, heights):
+                continue
+            move = (src, 1, 4 + suit_cell_for(suits, code))
+            free, suits, columns = play(free, suits, columns, move)
+            heights[code & 3] += 1
+            moves.append(move)
+            moved = True
+
+        for src, column in enumerate(columns):
+            if not column: continue
+            code = column[-1]
+            if heights[code & 3] != (code >> 2) - 1 or not is_safe_to_found(code, heights): continue
+            move = (8 + src, 1, 4 + suit_cell_for(suits, code))
+            free, suits, columns = play(free, suits, columns, move)
+            heights[code & 3] += 1
+            moves.append(move)
+            moved = True
+
+    return free, suits, columns, moves
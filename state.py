@@ -0,0 +1,414 @@
+from array import array
+from card import Card
+from free_cell import FreeCell
+from column_cell import ColumnCell
+from suit_cell import SuitCell
+
+# ---------------------------------------------------------------------------------------------------------
+# CARD CODES: a card is stored as a small int, value << 2 | (suit - 1). The suit sits in the two low bits
+# (clubs 0, spades 1, diamonds 2, hearts 3) so bit 1 is the color bit (set for red) and the value is the
+# rest. Codes are in range [4, 55], which leaves 0 free to mean "no card".
+# ---------------------------------------------------------------------------------------------------------
+
+NO_CARD = 0
+RED_BIT = 2
+
+# areas are numbered 0-15 when a single index is more convenient than an (area type, id) pair:
+# free cells 1-4 are 0-3, suit cells 1-4 are 4-7, columns 1-8 are 8-15
+FREE_CELLS = range(0, 4)
+SUIT_CELLS = range(4, 8)
+COLUMNS = range(8, 16)
+AREA_KEYS = [("free-cells", id) for id in range(1, 5)] + \
+            [("suit-cells", id) for id in range(1, 5)] + \
+            [("column-cells", id) for id in range(1, 9)]
+
+
+def encode_card(card):
+    """Takes a Card and returns its card code."""
+
+    return card.get_value() << 2 | (card.get_suit() - 1)
+
+
+def decode_card(code):
+    """Takes a card code and returns a new Card for it."""
+
+    return Card((code & 3) + 1, code >> 2)
+
+
+def card_value(code):
+    """Returns the value of a card code, which is an integer in range [1, 13]."""
+
+    return code >> 2
+
+
+def card_suit(code):
+    """Returns the suit of a card code, which is an integer in range [1, 4]."""
+
+    return (code & 3) + 1
+
+
+def is_red(code):
+    """Returns True if the card code is a diamond or a heart."""
+
+    return code & RED_BIT != 0
+
+
+def can_stack(code, onto):
+    """Returns True if the card code can be placed on the card code 'onto' in a column, which means it is
+    one value lower and the opposite color. Mirrors ColumnCell.valid_move for a single card."""
+
+    return (onto >> 2) - (code >> 2) == 1 and (onto ^ code) & RED_BIT != 0
+
+
+def can_found(code, top):
+    """Returns True if the card code can be placed on a suit cell whose top card code is 'top' (NO_CARD for
+    an empty cell). Mirrors SuitCell.valid_move."""
+
+    if top == NO_CARD:
+        return code >> 2 == 1
+
+    return code - top == 4  # same suit bits, value one higher
+
+
+def foundation_heights(suit_tops):
+    """Takes the top card codes of the suit cells (NO_CARD for an empty cell) and returns a list with the value
+    on top of each suit's foundation, indexed by card_suit - 1 (0 when the suit has no card home yet)."""
+
+    heights = [0] * 4
+
+    for top in suit_tops:
+        if top != NO_CARD: heights[top & 3] = top >> 2
+
+    return heights
+
+
+def is_safe_to_found(code, heights):
+    """Takes a card code and the foundation heights (see foundation_heights) and returns True if putting the card
+    on its foundation cannot lose anything: it is an Ace or a Two, or both cards of the opposite color that are
+    one value lower are already home, so no card could still need it to stack on."""
+
+    value = code >> 2
+    if value <= 2: return True
+
+    opposite = (code & RED_BIT) ^ RED_BIT  # the first suit of the other color, the second follows it
+    return heights[opposite] >= value - 1 and heights[opposite | 1] >= value - 1
+
+
+def supermove_capacity(empty_free_cells, empty_columns, to_empty_column=False):
+    """Takes the number of empty free cells and empty columns and returns how many cards can be moved as one
+    sequence: (free cells + 1) * 2 ^ columns, since every empty column can hold a part of the sequence that is
+    itself moved through the free cells. An empty destination column cannot hold a part, which halves it."""
+
+    if to_empty_column: empty_columns -= 1
+
+    return (empty_free_cells + 1) << max(empty_columns, 0)
+
+
+def expand_supermove(src, depth, dst, free_cells, empty_columns):
+    """Takes a move (source index, depth, destination index), the indices of the empty free cells and the indices
+    of the empty columns other than the source and destination. Returns the move as a list of single card moves
+    (source index, 1, destination index) that only rest cards in those areas. Raises ValueError if the sequence
+    is too long to be moved with them."""
+
+    if depth <= len(free_cells) + 1:
+        cells = free_cells[:depth - 1]
+        return [(src, 1, cell) for cell in cells] + [(src, 1, dst)] + [(cell, 1, dst) for cell in reversed(cells)]
+
+    if not empty_columns:
+        raise ValueError(f"{depth} cards cannot be moved with {len(free_cells)} free cells and no empty column")
+
+    # park the bottom part of the sequence in a spare column, move the rest, then bring the part back on top
+    spare, others = empty_columns[0], empty_columns[1:]
+    part = min(supermove_capacity(len(free_cells), len(others)), depth - 1)
+
+    return expand_supermove(src, part, spare, free_cells, others) + \
+           expand_supermove(src, depth - part, dst, free_cells, others) + \
+           expand_supermove(spare, part, dst, free_cells, others)
+
+
+def column_run(column):
+    """Takes the card codes of a column and returns how many cards at its bottom alternate in color and
+    decrement by one (0 for an empty column)."""
+
+    length = 1 if column else 0
+
+    while length < len(column) and can_stack(column[-length], column[-length - 1]):
+        length += 1
+
+    return length
+
+
+def area_index(area_type, area_id):
+    """Takes an area type string ('free-cells', 'suit-cells' or 'column-cells') and an area id and returns
+    the area's index in range [0, 15]."""
+
+    return AREA_KEYS.index((area_type, area_id))
+
+
+def area_key(index):
+    """Takes an area index in range [0, 15] and returns its (area type, area id) pair."""
+
+    return AREA_KEYS[index]
+
+
+class State:
+    """A compact, pygame-free snapshot of a game position. Free cells and suit cells are each held in a
+    4 byte bytearray (one card code per cell, NO_CARD when empty, suit cells only store their top card)
+    and each column is an array('B') of card codes from top to bottom. A State can be built from and
+    turned back into a Game's card areas dictionary, and packs into a bytes key of at most 68 bytes.
+
+    The length of the ordered run at the bottom of every column is kept in runs and updated by apply_move as
+    cards are pushed and popped. Code that changes the columns directly must call count_runs afterwards."""
+
+    __slots__ = ("free_cells", "suit_cells", "columns", "runs")
+
+    def __init__(self, free_cells=None, suit_cells=None, columns=None):
+        self.free_cells = bytearray(free_cells) if free_cells else bytearray(4)
+        self.suit_cells = bytearray(suit_cells) if suit_cells else bytearray(4)
+        self.columns = [array("B", column) for column in columns] if columns else \
+                       [array("B") for _ in range(8)]
+        self.count_runs()
+
+    @classmethod
+    def from_card_areas(cls, card_areas):
+        """Takes a card areas dictionary (the format returned by Game.get_card_areas) and returns a State."""
+
+        state = cls()
+
+        for id in range(1, 5):
+            free_cell = card_areas["free-cells"][id]
+            if not free_cell.is_empty():
+                state.free_cells[id - 1] = encode_card(free_cell.get_cards()[0])
+
+            suit_cell = card_areas["suit-cells"][id]
+            if not suit_cell.is_empty():
+                state.suit_cells[id - 1] = encode_card(suit_cell.get_cards()[-1])
+
+        for id in range(1, 9):
+            column = card_areas["column-cells"][id]
+            state.columns[id - 1] = array("B", [encode_card(card) for card in column.get_cards()])
+            state.runs[id - 1] = column.run_length()  # kept up to date by the column itself
+
+        return state
+
+    def to_card_areas(self):
+        """Returns a new card areas dictionary, filled with new Card objects, that matches this State."""
+
+        card_areas = {
+            "free-cells": {},
+            "column-cells": {},
+            "suit-cells": {}
+        }
+
+        for id in range(1, 5):
+            free_cell = FreeCell()
+            if self.free_cells[id - 1] != NO_CARD:
+                free_cell.add_card(decode_card(self.free_cells[id - 1]))
+            card_areas["free-cells"][id] = free_cell
+
+            # a suit cell holds every card of its suit from the Ace up to the stored top card
+            suit_cell = SuitCell()
+            top = self.suit_cells[id - 1]
+            if top != NO_CARD:
+                for value in range(1, card_value(top) + 1):
+                    suit_cell.add_card(Card(card_suit(top), value))
+            card_areas["suit-cells"][id] = suit_cell
+
+        for id in range(1, 9):
+            column_cell = ColumnCell()
+            for code in self.columns[id - 1]:
+                column_cell.add_card(decode_card(code))
+            card_areas["column-cells"][id] = column_cell
+
+        return card_areas
+
+    def copy(self):
+        """Returns a copy of the State that shares no buffers with it."""
+
+        state = State.__new__(State)
+        state.free_cells = self.free_cells[:]
+        state.suit_cells = self.suit_cells[:]
+        state.columns = [column[:] for column in self.columns]
+        state.runs = self.runs[:]
+        return state
+
+    def pack(self):
+        """Returns the State as bytes: 4 free cell codes, 4 suit cell codes, then for each column its
+        length followed by its card codes."""
+
+        packed = bytearray(self.free_cells)
+        packed += self.suit_cells
+
+        for column in self.columns:
+            packed.append(len(column))
+            packed += column
+
+        return bytes(packed)
+
+    @classmethod
+    def unpack(cls, packed):
+        """Takes bytes produced by pack and returns the matching State."""
+
+        state = cls(packed[0:4], packed[4:8])
+        idx = 8
+
+        for column_idx in range(8):
+            length = packed[idx]
+            state.columns[column_idx] = array("B", packed[idx + 1:idx + 1 + length])
+            idx += length + 1
+
+        state.count_runs()
+        return state
+
+    def moves_count(self, to_empty_column=False):
+        """Returns how many cards can be moved at once (see supermove_capacity). Mirrors Game.moves_count."""
+
+        empty_columns = sum(1 for column in self.columns if not column)
+        return supermove_capacity(self.free_cells.count(NO_CARD), empty_columns, to_empty_column)
+
+    def count_runs(self):
+        """Recomputes the ordered run length of every column from scratch."""
+
+        self.runs = bytearray(column_run(column) for column in self.columns)
+
+    def run_length(self, column_idx):
+        """Takes a column index in range [0, 7] and returns how many cards at the bottom of the column
+        alternate in color and decrement by one, which is how deep a selection from it can go."""
+
+        return self.runs[column_idx]
+
+    def get_cards(self, index):
+        """Takes an area index and returns the card codes in that area (a suit cell only returns its top card)."""
+
+        if index in COLUMNS:
+            return self.columns[index - 8]
+
+        cells = self.free_cells if index in FREE_CELLS else self.suit_cells
+        code = cells[index % 4]
+        return array("B", [code]) if code != NO_CARD else array("B")
+
+    def valid_move(self, move):
+        """Takes a move in the form (source index, depth, destination index), where depth is how many cards
+        are taken from the bottom of the source. Returns True if the Game would allow it."""
+
+        src, depth, dst = move
+
+        if src == dst or src in SUIT_CELLS: return False  # cards never leave a suit cell
+
+        if src in FREE_CELLS:
+            if depth != 1 or self.free_cells[src] == NO_CARD: return False
+        elif depth < 1 or depth > self.run_length(src - 8):
+            return False
+
+        to_empty_column = dst in COLUMNS and not self.columns[dst - 8]
+        if depth > self.moves_count(to_empty_column): return False  # cannot move more cards than there are available moves
+
+        code = self.get_cards(src)[-depth]
+
+        if dst in FREE_CELLS:
+            return depth == 1 and self.free_cells[dst] == NO_CARD
+        if dst in SUIT_CELLS:
+            return depth == 1 and can_found(code, self.suit_cells[dst - 4])
+
+        column = self.columns[dst - 8]
+        return not column or can_stack(code, column[-1])
+
+    def moves(self):
+        """Yields every move (source index, depth, destination index) the Game would allow. Each source is
+        paired with each destination in constant time: only one depth of an ordered run can go on a non-empty
+        column (the card one value lower than the column's bottom card), so only moves into an empty column
+        try several depths."""
+
+        free_cells, suit_cells, columns, runs = self.free_cells, self.suit_cells, self.columns, self.runs
+        empty_free_cells = free_cells.count(NO_CARD)
+        empty_columns = runs.count(0)
+        capacity = supermove_capacity(empty_free_cells, empty_columns)
+        capacity_to_empty = supermove_capacity(empty_free_cells, empty_columns, True)
+
+        for src in range(12):
+            if src < 4:
+                code, run = free_cells[src], 1
+                if code == NO_CARD: continue
+            else:
+                column, run = columns[src - 4], runs[src - 4]
+                if not run: continue
+                code = column[-1]
+                src += 4  # columns are area indices 8-15
+
+            for dst in FREE_CELLS:
+                if dst != src and free_cells[dst] == NO_CARD: yield (src, 1, dst)
+
+            for dst in SUIT_CELLS:
+                if can_found(code, suit_cells[dst - 4]): yield (src, 1, dst)
+
+            for dst in COLUMNS:
+                if dst == src: continue
+                target = columns[dst - 8]
+
+                if not target:
+                    for depth in range(1, min(run, capacity_to_empty) + 1):
+                        yield (src, depth, dst)
+                    continue
+
+                depth = (target[-1] >> 2) - (code >> 2)
+                if 1 <= depth <= run and depth <= capacity and \
+                   can_stack(code if depth == 1 else column[-depth], target[-1]):
+                    yield (src, depth, dst)
+
+    def legal_moves(self):
+        """Returns a list of every move (source index, depth, destination index) the Game would allow."""
+
+        return list(self.moves())
+
+    def apply_move(self, move):
+        """Takes a move in the form (source index, depth, destination index) and performs it without checking
+        that it is valid."""
+
+        src, depth, dst = move
+
+        if src in FREE_CELLS:
+            cards = array("B", [self.free_cells[src]])
+            self.free_cells[src] = NO_CARD
+        else:
+            column = self.columns[src - 8]
+            cards = column[-depth:]
+            del column[-depth:]
+
+            # the rest of the run is still ordered; only a run taken whole needs counting again
+            run = self.runs[src - 8]
+            self.runs[src - 8] = run - depth if depth < run else column_run(column)
+
+        if dst in FREE_CELLS:
+            self.free_cells[dst] = cards[0]
+        elif dst in SUIT_CELLS:
+            self.suit_cells[dst - 4] = cards[0]
+        else:
+            column = self.columns[dst - 8]
+            run = column_run(cards)
+            if run == len(cards) and column and can_stack(cards[0], column[-1]):
+                run += self.runs[dst - 8]
+            column.extend(cards)
+            self.runs[dst - 8] = run
+
+    def foundation_height(self, suit):
+        """Takes a suit integer in range [1, 4] and returns how many cards of that suit are in the suit cells."""
+
+        for top in self.suit_cells:
+            if top != NO_CARD and card_suit(top) == suit:
+                return card_value(top)
+
+        return 0
+
+    def is_won(self):
+        """Returns True if all four suit cells hold a King."""
+
+        return all(card_value(top) == 13 for top in self.suit_cells)
+
+    def __eq__(self, other):
+        return isinstance(other, State) and self.pack() == other.pack()
+
+    def __hash__(self):
+        return hash(self.pack())
+
+    def __repr__(self):
+        return f"State({self.pack().hex()})"
@@ -0,0 +1,234 @@
+import sqlite3
+import threading
+import time
+
+# ---------------------------------------------------------------------------------------------------------
+# STATISTICS DATABASE: one row per finished game in the games table (deal number, start time, duration in
+# seconds, moves played and whether it was won), in a SQLite database kept in WAL mode so the overlay can read
+# while games are being written. The totals table holds a single row with the games played and won and the
+# current and best winning streaks, kept up to date by a trigger as games are inserted, so the overlay's
+# numbers never need a scan however many games there are. Per-deal history is read through the games_deal
+# index, newest first.
+# ---------------------------------------------------------------------------------------------------------
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    id INTEGER PRIMARY KEY,
+    deal_number INTEGER NOT NULL,
+    started REAL NOT NULL,
+    duration REAL NOT NULL,
+    moves INTEGER NOT NULL,
+    won INTEGER NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS games_deal ON games (deal_number, id);
+
+CREATE TABLE IF NOT EXISTS totals (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    played INTEGER NOT NULL,
+    wins INTEGER NOT NULL,
+    streak INTEGER NOT NULL,
+    streak_won INTEGER NOT NULL,
+    best_streak INTEGER NOT NULL
+);
+
+INSERT OR IGNORE INTO totals VALUES (1, 0, 0, 0, -1, 0);
+
+CREATE TRIGGER IF NOT EXISTS games_totals AFTER INSERT ON games BEGIN
+    UPDATE totals SET
+        played = played + 1,
+        wins = wins + NEW.won,
+        streak = CASE WHEN streak_won = NEW.won THEN streak + 1 ELSE 1 END,
+        streak_won = NEW.won,
+        best_streak = CASE WHEN NEW.won = 0 THEN best_streak
+                           WHEN streak_won = 1 THEN MAX(best_streak, streak + 1)
+                           ELSE MAX(best_streak, 1) END
+    WHERE id = 1;
+END;
+"""
+
+INSERT_GAME = "INSERT INTO games (deal_number, started, duration, moves, won) VALUES (?, ?, ?, ?, ?)"
+
+
+def connect(path):
+    """Takes the path of a statistics database and returns a connection to it in WAL mode, creating the tables
+    if they are missing."""
+
+    connection = sqlite3.connect(path)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")  # WAL stays consistent; at worst the last batch is lost
+    connection.executescript(SCHEMA)
+    return connection
+
+
+def game_row(game):
+    """Takes a Game and returns its row for the games table."""
+
+    return (game.get_deal_number(), game.get_start_time(), time.time() - game.get_start_time(),
+            game.moves_played(), int(game.is_won()))
+
+
+class Totals:
+    """Games played and won over every recorded game, and the winning streaks."""
+
+    def __init__(self, played, wins, streak, streak_won, best_streak):
+        self.played = played
+        self.wins = wins
+        self.streak = streak            # games in a row with the same outcome as the last one
+        self.streak_won = streak_won    # 1 if that outcome is a win, 0 if a loss, -1 before any game
+        self.best_streak = best_streak  # most games won in a row
+
+    def win_rate(self):
+        """Returns the share of games won, in range [0, 1]."""
+
+        if self.played == 0: return 0.0
+
+        return self.wins / self.played
+
+    def winning_streak(self):
+        """Returns how many of the last games in a row were won."""
+
+        return self.streak if self.streak_won == 1 else 0
+
+    def __repr__(self):
+        return f"Totals(played={self.played}, wins={self.wins}, streak={self.streak}, " \
+               f"streak_won={self.streak_won}, best_streak={self.best_streak})"
+
+
+class DealStats:
+    """Games played and won of one deal, with the best win."""
+
+    def __init__(self, deal_number, played, wins, fewest_moves, fastest):
+        self.deal_number = deal_number
+        self.played = played
+        self.wins = wins
+        self.fewest_moves = fewest_moves  # moves played in the shortest win, or None without a win
+        self.fastest = fastest            # seconds taken by the fastest win, or None without a win
+
+    def __repr__(self):
+        return f"DealStats(deal={self.deal_number}, played={self.played}, wins={self.wins}, " \
+               f"fewest_moves={self.fewest_moves}, fastest={self.fastest})"
+
+
+class StatsStore:
+    """Records finished games in a statistics database and answers the queries behind the stats overlay.
+
+    Recording only builds the row and queues it; a background thread writes queued rows in one transaction
+    when batch_size of them are waiting or interval seconds after the first one was queued, so the render loop
+    never waits on the disk. Queries run on the caller's thread with a connection of their own, which WAL mode
+    lets read while the thread writes. Call flush to make every recorded game visible to the queries."""
+
+    def __init__(self, path, batch_size=64, interval=1.0):
+        self._path = path
+        self._batch_size = batch_size
+        self._interval = interval
+        self._connection = connect(path)  # for queries, on the thread that made the store
+        self._pending = []                # rows waiting to be written
+        self._recorded = 0                # rows ever queued
+        self._written = 0                 # rows taken off the queue and written (or dropped on a write error)
+        self._flush_target = 0            # rows that must be written before the thread waits for a batch again
+        self._condition = threading.Condition()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="stats", daemon=True)
+        self._thread.start()
+
+    def get_path(self):
+        """Returns the path of the statistics database."""
+
+        return self._path
+
+    def record(self, game):
+        """Takes a Game that has ended, won or given up, and queues its row to be written."""
+
+        self.record_row(game_row(game))
+
+    def record_row(self, row):
+        """Takes a (deal number, start time, duration, moves, won) row and queues it to be written."""
+
+        with self._condition:
+            self._pending.append(row)
+            self._recorded += 1
+            self._condition.notify_all()
+
+    def flush(self):
+        """Waits until every recorded game has been written."""
+
+        with self._condition:
+            self._flush_target = self._recorded
+            self._condition.notify_all()
+
+            while self._written < self._flush_target:
+                self._condition.wait()
+
+    def close(self):
+        """Writes any recorded game, stops the thread and closes the database."""
+
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+        self._thread.join()
+        self._connection.close()
+
+    def totals(self):
+        """Returns the Totals over every written game."""
+
+        return Totals(*self._connection.execute(
+            "SELECT played, wins, streak, streak_won, best_streak FROM totals WHERE id = 1").fetchone())
+
+    def recent_win_rate(self, count=100):
+        """Returns the share of the last 'count' written games that were won, or None before any game."""
+
+        return self._connection.execute(
+            "SELECT AVG(won) FROM (SELECT won FROM games ORDER BY id DESC LIMIT ?)", (count,)).fetchone()[0]
+
+    def deal_stats(self, deal_number):
+        """Takes a deal number and returns the DealStats of its written games."""
+
+        played, wins, fewest_moves, fastest = self._connection.execute(
+            "SELECT COUNT(*), COALESCE(SUM(won), 0), MIN(CASE WHEN won THEN moves END), "
+            "MIN(CASE WHEN won THEN duration END) FROM games WHERE deal_number = ?", (deal_number,)).fetchone()
+
+        return DealStats(deal_number, played, wins, fewest_moves, fastest)
+
+    def deal_history(self, deal_number, limit=10):
+        """Takes a deal number and returns its last 'limit' written games, newest first, as
+        (start time, duration, moves, won) tuples."""
+
+        return self._connection.execute(
+            "SELECT started, duration, moves, won FROM games WHERE deal_number = ? ORDER BY id DESC LIMIT ?",
+            (deal_number, limit)).fetchall()
+
+    def _run(self):
+        """Writes queued rows in batches until closed."""
+
+        connection = connect(self._path)
+
+        while True:
+            with self._condition:
+                while not self._pending and not self._closed:
+                    self._condition.wait()
+
+                # give more games the chance to join the batch, unless someone is waiting for them
+                deadline = time.monotonic() + self._interval
+                while len(self._pending) < self._batch_size and not self._closed and \
+                        self._written + len(self._pending) > self._flush_target:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0: break
+                    self._condition.wait(remaining)
+
+                rows, self._pending = self._pending, []
+
+            if not rows:  # closed with nothing left to write
+                connection.close()
+                return
+
+            try:
+                with connection:  # one transaction per batch
+                    connection.executemany(INSERT_GAME, rows)
+            except sqlite3.Error:
+                pass  # e.g. the disk is full; these games are lost but the next batch tries again
+
+            with self._condition:
+                self._written += len(rows)
+                self._condition.notify_all()
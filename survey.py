@@ -0,0 +1,174 @@
+# Run this file to survey which numbered deals can be won, e.g. python survey.py 1 10000 --out survey.csv
+import argparse
+import csv
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from deal_cache import get_initial_state
+from solver import Solver
+
+FIELDS = ["seed", "solvable", "solution_length", "nodes_expanded", "ms"]
+
+
+def solve_seed(seed, limits, cache_path=None):
+    """Takes a deal number, a dictionary of Solver keyword arguments and an optional deal cache file. Deals the
+    game straight into a State, solves it and returns a result row dictionary."""
+
+    start = time.perf_counter()
+    result = Solver(get_initial_state(seed, cache_path), **limits).solve()
+    ms = (time.perf_counter() - start) * 1000
+
+    return {
+        "seed": seed,
+        "solvable": result.solvable,
+        "solution_length": len(result.moves) if result.solvable else None,
+        "nodes_expanded": result.stats.nodes_expanded,
+        "ms": round(ms, 2)
+    }
+
+
+def solve_chunk(seeds, limits, cache_path=None):
+    """Takes a list of seeds and returns the list of their result rows. Work is sent to the worker processes
+    in chunks so the cost of passing it between processes stays small next to the solving itself."""
+
+    return [solve_seed(seed, limits, cache_path) for seed in seeds]
+
+
+def completed_seeds(out_path):
+    """Returns the set of seeds that already have a result in the output file, so an interrupted survey can
+    carry on where it stopped."""
+
+    if not os.path.exists(out_path): return set()
+
+    with open(out_path, newline="") as file:
+        if out_path.endswith(".jsonl"):
+            seeds = set()
+            for line in file:
+                try:
+                    seeds.add(json.loads(line)["seed"])
+                except ValueError:
+                    continue  # a line cut short by an interruption; its seed is solved again
+            return seeds
+
+        return {int(row["seed"]) for row in csv.DictReader(file) if row.get("ms")}
+
+
+class ResultWriter:
+    """Appends result rows to a CSV or JSONL file (picked by the file extension) and flushes after every
+    batch, so results survive the survey being stopped."""
+
+    def __init__(self, out_path):
+        self._jsonl = out_path.endswith(".jsonl")
+        new_file = not os.path.exists(out_path) or os.path.getsize(out_path) == 0
+        self._file = open(out_path, "a", newline="")
+
+        # finish a line cut short by an interruption so new rows start on a line of their own
+        if not new_file:
+            with open(out_path, "rb") as existing:
+                existing.seek(-1, os.SEEK_END)
+                if existing.read(1) != b"\n": self._file.write("\n")
+
+        if not self._jsonl:
+            self._csv = csv.DictWriter(self._file, fieldnames=FIELDS)
+            if new_file: self._csv.writeheader()
+
+    def write_rows(self, rows):
+        """Writes a list of result rows."""
+
+        for row in rows:
+            if self._jsonl:
+                self._file.write(json.dumps(row) + "\n")
+            else:
+                self._csv.writerow({key: "" if value is None else int(value) if isinstance(value, bool) else value
+                                    for key, value in row.items()})
+        self._file.flush()
+
+    def close(self):
+        """Closes the output file."""
+
+        self._file.close()
+
+
+def chunked(seeds, chunk_size):
+    """Yields lists of at most chunk_size seeds."""
+
+    chunk = []
+    for seed in seeds:
+        chunk.append(seed)
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+
+    if chunk: yield chunk
+
+
+def run_survey(seeds, out_path, workers=None, chunk_size=32, limits=None, cache_path=None):
+    """Solves every seed that is not already in the output file and appends the results to it. With one worker
+    everything runs in this process; otherwise chunks are spread over a process pool with a bounded number of
+    chunks in flight, so memory stays flat for any range of seeds. Returns the number of seeds solved."""
+
+    limits = limits or {}
+    done = completed_seeds(out_path)
+    todo = (seed for seed in seeds if seed not in done)
+    writer = ResultWriter(out_path)
+    workers = workers or os.cpu_count() or 1
+    solved = 0
+
+    try:
+        if workers == 1:
+            for chunk in chunked(todo, chunk_size):
+                writer.write_rows(solve_chunk(chunk, limits, cache_path))
+                solved += len(chunk)
+            return solved
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            chunks = chunked(todo, chunk_size)
+            pending = set()
+
+            while True:
+                # keep every worker busy with a couple of chunks queued behind it
+                while len(pending) < workers * 2:
+                    chunk = next(chunks, None)
+                    if chunk is None: break
+                    pending.add(executor.submit(solve_chunk, chunk, limits, cache_path))
+
+                if not pending: break
+
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    rows = future.result()
+                    writer.write_rows(rows)
+                    solved += len(rows)
+    finally:
+        writer.close()
+
+    return solved
+
+
+def main():
+    """Parses the command line and runs the survey."""
+
+    parser = argparse.ArgumentParser(description="Solve a range of deals and record how hard they are.")
+    parser.add_argument("start", type=int, help="first deal number")
+    parser.add_argument("end", type=int, help="last deal number (inclusive)")
+    parser.add_argument("--out", default="survey.csv", help="output file, .csv or .jsonl (default survey.csv)")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--chunk-size", type=int, default=32, help="seeds sent to a worker at a time")
+    parser.add_argument("--max-nodes", type=int, default=200000, help="solver node limit per deal")
+    parser.add_argument("--time-limit", type=float, default=None, help="solver time limit per deal in seconds")
+    parser.add_argument("--deal-cache", default=None, help="deal cache file made by deal_cache.py (optional)")
+    args = parser.parse_args()
+
+    limits = {"max_nodes": args.max_nodes, "time_limit": args.time_limit}
+    start = time.perf_counter()
+    solved = run_survey(range(args.start, args.end + 1), args.out, args.workers, args.chunk_size, limits,
+                        args.deal_cache)
+    elapsed = time.perf_counter() - start
+
+    print(f"solved {solved} deals in {elapsed:.1f}s ({solved / elapsed if elapsed else 0:.1f} deals/s), "
+          f"results in {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+import unittest
+import os
+import sys
+sys.path.append("../freecell")
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+try:
+    import pygame as pg
+except ImportError:
+    pg = None
+
+
+@unittest.skipIf(pg is None, "pygame is not installed")
+class AssetsTest(unittest.TestCase):
+    """Tests for the shared asset cache."""
+
+    @classmethod
+    def setUpClass(cls):
+        pg.init()
+        pg.display.set_mode((1, 1))
+
+    def test_sprites_are_shared(self):
+        """Asking for the same sprite twice returns the same Surface and decodes the sheet once."""
+
+        import assets
+
+        self.assertIs(assets.card_face(2, 12), assets.card_face(2, 12))
+        self.assertIs(assets.get_sheet(assets.CARDS_SHEET), assets.get_sheet(assets.CARDS_SHEET))
+        self.assertIsNot(assets.card_face(2, 12), assets.card_face(2, 11))
+
+    def test_cards_keep_faces_across_new_games(self):
+        """After a new game every card is given one of the Surfaces that already existed."""
+
+        import assets
+        from game import Game
+        from display import Display
+
+        game = Game(1)
+        display = Display(game)
+        faces = {id(assets.card_face(suit, value)) for suit in range(1, 5) for value in range(1, 14)}
+
+        game.new_game(2)
+        display.init_board()
+
+        for column in game.get_card_areas()["column-cells"].values():
+            for card in column.get_cards():
+                self.assertIn(id(card.get_image()), faces)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -134,6 +134,41 @@ class ColumnCellTests(unittest.TestCase):
         cc.set_cards([Card(4, 10)])  # last card in column is 10 of hearts
         self.assertFalse(cc.valid_move(cards))  # 10 of hearts <- 7 of spades is not valid since 10 - 7 != 1
 
+    def test_run_length_follows_changes(self):
+        """The ordered run at the bottom of the column is kept up to date as cards are added and removed."""
+
+        cc = ColumnCell()
+        cc.set_cards([Card(2, 2), Card(4, 10)])
+        self.assertEqual(1, cc.run_length())
+
+        cc.add_card(Card(1, 9))
+        self.assertEqual(2, cc.run_length())
+
+        cc.place_cards([Card(3, 8), Card(2, 7)])  # ordered and stacks on the 9 of clubs
+        self.assertEqual(4, cc.run_length())
+
+        cc.place_cards([Card(4, 3)])  # does not stack
+        self.assertEqual(1, cc.run_length())
+
+        cc.pop_cards(1)
+        self.assertEqual(4, cc.run_length())  # the run under it is counted again
+
+        cc.pop_cards(2)
+        self.assertEqual(2, cc.run_length())
+        self.assertFalse(cc.is_ordered())
+
+    def test_selection_depth(self):
+        """A card's selection depth is its place in the ordered run, and 0 outside of it."""
+
+        cc = ColumnCell()
+        queen_hearts = Card(4, 12)
+        cards = [Card(1, 2), queen_hearts, Card(2, 11), Card(3, 10)]
+        cc.set_cards(cards)
+
+        self.assertEqual(3, cc.selection_depth(queen_hearts))
+        self.assertEqual(0, cc.selection_depth(cards[0]))
+        self.assertEqual(0, cc.selection_depth(Card(4, 12)))  # same value and suit, but not this card
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,46 @@
+import unittest
+import os
+import sys
+import tempfile
+sys.path.append("../freecell")
+from game import Game
+from deal_cache import *
+
+
+class DealCacheTest(unittest.TestCase):
+    """Tests for dealing straight into States and the deal cache."""
+
+    def test_initial_state_matches_game(self):
+        """Dealing into a State gives the same position as starting a Game with that deal number."""
+
+        for deal_number in (1, 617, 31465, 1000000):
+            self.assertEqual(Game(deal_number).get_state(), initial_state(deal_number))
+
+    @unittest.skipIf(np is None, "NumPy is not installed")
+    def test_deal_codes_match_single_deals(self):
+        """Each row of a batch deal matches dealing that number on its own."""
+
+        deal_numbers = [1, 2, 617, 999999, 2 ** 31 - 1]
+        codes = deal_codes(deal_numbers)
+
+        self.assertEqual((5, 52), codes.shape)
+        for row, deal_number in zip(codes, deal_numbers):
+            self.assertEqual(initial_state(deal_number), state_from_codes(row.tobytes()))
+
+    @unittest.skipIf(np is None, "NumPy is not installed")
+    def test_cache_file(self):
+        """A built cache file serves the deals in its range and deals any other number directly."""
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "deals.bin")
+            cache = DealCache.build(path, 100, 50, batch_size=16)
+
+            self.assertEqual(50, len(cache))
+            self.assertIn(149, cache)
+            self.assertNotIn(150, cache)
+            self.assertEqual(initial_state(120), DealCache(path).get_state(120))
+            self.assertEqual(initial_state(5), cache.get_state(5))
+
+
+if __name__ == "__main__":
+    unittest.main()
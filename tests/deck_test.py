@@ -0,0 +1,58 @@
+import unittest
+import sys
+sys.path.append("../freecell")
+from deck import *
+from game import Game
+
+
+def short_name(card):
+    """Returns a card as a two character string such as 'JD' (Jack of Diamonds) or 'TC' (10 of Clubs)."""
+
+    values = {1: "A", 10: "T", 11: "J", 12: "Q", 13: "K"}
+    suits = {1: "C", 2: "S", 3: "D", 4: "H"}
+    return values.get(card.get_value(), str(card.get_value())) + suits[card.get_suit()]
+
+
+class DeckTest(unittest.TestCase):
+    """Tests for the Deck class and numbered deals."""
+
+    def test_ms_deal_uses_every_card_once(self):
+        """A numbered deal contains all 52 cards."""
+
+        self.assertEqual(52, len(set(ms_deal(11982))))
+
+    def test_deal_1(self):
+        """Deal #1 matches the classic Microsoft FreeCell layout."""
+
+        expected = [
+            "JD KD 2S 4C 3S 6D 6S",
+            "2D KC KS 5C TD 8S 9C",
+            "9H 9S 9D TS 4S 8D 2H",
+            "JC 5S QD QH TH QS 6H",
+            "5D AD JS 4H 8H 6C",
+            "7H QC AS AC 2C 3D",
+            "7C KH AH 4D JH 8C",
+            "5H 3H 3C 7S 7D TC"
+        ]
+        columns = Game(1).get_card_areas()["column-cells"]
+
+        for idx in range(1, 9):
+            self.assertEqual(expected[idx - 1], " ".join(short_name(card) for card in columns[idx].get_cards()))
+
+    def test_deal_617_first_row(self):
+        """The top row of deal #617 matches the classic Microsoft FreeCell layout."""
+
+        columns = Game(617).get_card_areas()["column-cells"]
+        top_row = [short_name(columns[idx].get_cards()[0]) for idx in range(1, 9)]
+
+        self.assertEqual("7D AD 5C 3S 5S 8C 2D AH".split(), top_row)
+
+    def test_same_deal_number_same_game(self):
+        """Two games with the same deal number start from the same position."""
+
+        self.assertEqual(Game(42).get_state(), Game(42).get_state())
+        self.assertEqual(42, Game(42).get_deal_number())
+
+
+if __name__ == "__main__":
+    unittest.main()
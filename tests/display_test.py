@@ -0,0 +1,214 @@
+import unittest
+import os
+import sys
+sys.path.append("../freecell")
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+try:
+    import pygame as pg
+except ImportError:
+    pg = None
+
+
+class MouseEvent:
+    """A stand-in for a pygame mouse event."""
+
+    def __init__(self, type, pos):
+        self.type = type
+        self.pos = pos
+
+
+class KeyEvent:
+    """A stand-in for a pygame key press event."""
+
+    def __init__(self, key, mod=0):
+        self.type = pg.KEYDOWN
+        self.key = key
+        self.mod = mod
+
+
+@unittest.skipIf(pg is None, "pygame is not installed")
+class DisplayTest(unittest.TestCase):
+    """Tests for the Display class, run against SDL's dummy video driver."""
+
+    @classmethod
+    def setUpClass(cls):
+        pg.init()
+
+    def setUp(self):
+        from game import Game
+        from display import Display
+
+        self.game = Game(1)
+        self.display = Display(self.game)
+
+    def grab_bottom_card(self, column_id):
+        """Presses the mouse on the bottom card of a column and returns the mouse position used."""
+
+        card = self.game.get_card_areas()["column-cells"][column_id].get_cards()[-1]
+        pos = (card.get_x() + 5, card.get_y() + 5)
+        self.display.check_event(MouseEvent(pg.MOUSEBUTTONDOWN, pos))
+        return pos
+
+    def test_first_render_updates_whole_screen(self):
+        """The first frame redraws everything and an unchanged frame after it redraws nothing."""
+
+        self.assertEqual([pg.Rect(0, 0, 1280, 720)], self.display.render())
+        self.assertEqual([], self.display.render())
+
+    def test_drag_only_updates_dragged_area(self):
+        """Dragging a card updates the rectangle it left and the one it moved into, nothing else."""
+
+        x, y = self.grab_bottom_card(1)
+        self.display.render()
+        self.display.check_event(MouseEvent(pg.MOUSEMOTION, (x + 30, y + 10)))
+        dirty_rects = self.display.render()
+
+        self.assertEqual(2, len(dirty_rects))
+        for rect in dirty_rects:
+            self.assertEqual((96, 128), rect.size)
+
+    def test_drop_redraws_board(self):
+        """Letting go of a card changes the board, so the next frame is a full redraw."""
+
+        pos = self.grab_bottom_card(1)
+        self.display.render()
+        self.display.check_event(MouseEvent(pg.MOUSEBUTTONUP, pos))
+
+        self.assertEqual([pg.Rect(0, 0, 1280, 720)], self.display.render())
+
+    def test_hint_highlight(self):
+        """Pressing H highlights a hint until the next key press or click."""
+
+        self.display.render()
+        self.display.check_event(KeyEvent(pg.K_h))
+        self.assertIsNotNone(self.display.get_hint())
+        self.assertEqual([pg.Rect(0, 0, 1280, 720)], self.display.render())
+
+        self.display.check_event(MouseEvent(pg.MOUSEBUTTONDOWN, (5, 5)))
+        self.assertIsNone(self.display.get_hint())
+
+    def test_stats_overlay(self):
+        """Resetting records the game given up as lost, and S shows the statistics over the board."""
+
+        import tempfile
+        from stats import StatsStore
+        from display import Display
+
+        with tempfile.TemporaryDirectory() as directory:
+            stats = StatsStore(os.path.join(directory, "stats.db"))
+            display = Display(self.game, stats=stats)
+
+            self.game.apply_move(self.game.legal_moves()[0])
+            button = display.get_reset_button()
+            display.check_reset_button_release((button.get_x() + 5, button.get_y() + 5))
+            display.check_event(KeyEvent(pg.K_s))
+
+            self.assertIn("Played 1   Won 0 (0%)", display.get_stats_lines())
+            self.assertEqual([pg.Rect(0, 0, 1280, 720)], display.render())
+
+            display.check_event(KeyEvent(pg.K_s))
+            self.assertIsNone(display.get_stats_lines())
+            stats.close()
+
+    def test_reset_without_moves_not_recorded(self):
+        """Starting a new deal before making a move records nothing in the statistics."""
+
+        import tempfile
+        from stats import StatsStore
+        from display import Display
+
+        with tempfile.TemporaryDirectory() as directory:
+            stats = StatsStore(os.path.join(directory, "stats.db"))
+            display = Display(self.game, stats=stats)
+
+            button = display.get_reset_button()
+            for _ in range(2):
+                display.check_reset_button_release((button.get_x() + 5, button.get_y() + 5))
+
+            stats.flush()
+            self.assertEqual(0, stats.totals().played)
+            stats.close()
+
+    def test_load_save_taken_during_drag(self):
+        """A game saved while cards were being dragged opens with the cards back where they came from."""
+
+        import tempfile
+        from display import Display
+        from savegame import save, load
+
+        column = self.game.get_card_areas()["column-cells"][1]
+        count = column.cards_count()
+        self.grab_bottom_card(1)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "autosave.fcs")
+            save(self.game, path)
+            game = load(path, autoplay=True)
+
+        display = Display(game)
+        self.assertEqual([pg.Rect(0, 0, 1280, 720)], display.render())
+        self.assertEqual([], game.get_selected_cards())
+        self.assertEqual(count, game.get_card_areas()["column-cells"][1].cards_count())
+
+    def test_replay_recorded_once(self):
+        """A game saved on quitting and resumed is only appended to the replay file when it is reset."""
+
+        import tempfile
+        from display import Display
+        from replay import ReplayWriter, read_replays
+        from savegame import Autosaver, load
+        from solver import solve
+
+        with tempfile.TemporaryDirectory() as directory:
+            replay_path = os.path.join(directory, "replays.fcr")
+            save_path = os.path.join(directory, "autosave.fcs")
+
+            # play a few moves, then quit the way main does
+            for move in solve(self.game).moves[:5]:
+                self.game.apply_move(move)
+            moves = list(self.game.get_journal().moves())
+            replays, autosaver = ReplayWriter(replay_path), Autosaver(save_path)
+            display = Display(self.game, replays, autosaver)
+            display.autosave()
+            autosaver.close()
+            replays.close()
+
+            # resume the game and give it up
+            game = load(save_path, autoplay=True)
+            replays = ReplayWriter(replay_path)
+            display = Display(game, replays)
+            button = display.get_reset_button()
+            display.check_reset_button_release((button.get_x() + 5, button.get_y() + 5))
+            replays.close()
+
+            records = list(read_replays(replay_path))
+            self.assertEqual([(1, moves)], records)
+
+    def test_debug_overlay(self):
+        """F3 shows the profiler's numbers over the board, redrawn with the dragged cards."""
+
+        from profiler import Profiler, instrument_hot_paths
+        from display import Display
+
+        profiler = Profiler()
+        display = Display(self.game, profiler=profiler)
+        instrument_hot_paths(profiler, self.game, display)
+        self.display = display
+
+        display.check_event(KeyEvent(pg.K_F3))
+        self.assertIsNotNone(display.get_debug_panel())
+        display.render()
+
+        x, y = self.grab_bottom_card(1)
+        display.render()
+        display.check_event(MouseEvent(pg.MOUSEMOTION, (x + 30, y + 10)))
+        self.assertIn(display.get_debug_rect(), display.render())
+        self.assertEqual(1, profiler.get_counters()["Game.select_card"][0])
+
+        display.check_event(KeyEvent(pg.K_F3))
+        self.assertIsNone(display.get_debug_panel())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+import unittest
+import sys
+sys.path.append("../freecell")
+
+try:
+    import pygame as pg
+except ImportError:
+    pg = None
+
+
+class Event:
+    """A stand-in for a pygame event."""
+
+    def __init__(self, type, pos=None):
+        self.type = type
+        self.pos = pos
+
+
+@unittest.skipIf(pg is None, "pygame is not installed")
+class FrameSchedulerTest(unittest.TestCase):
+    """Tests for event coalescing and frame pacing."""
+
+    def test_coalesce_keeps_last_motion_of_each_run(self):
+        """Back-to-back mouse motions collapse to the last one, but not across a button event."""
+
+        from frame_scheduler import coalesce_events
+
+        events = [Event(pg.MOUSEMOTION, (1, 1)), Event(pg.MOUSEMOTION, (2, 2)), Event(pg.MOUSEBUTTONUP, (2, 2)),
+                  Event(pg.MOUSEMOTION, (3, 3)), Event(pg.MOUSEMOTION, (4, 4))]
+        coalesced = coalesce_events(events)
+
+        self.assertEqual([pg.MOUSEMOTION, pg.MOUSEBUTTONUP, pg.MOUSEMOTION], [event.type for event in coalesced])
+        self.assertEqual((2, 2), coalesced[0].pos)
+        self.assertEqual((4, 4), coalesced[2].pos)
+
+    def test_adjust_lowers_and_recovers_frame_rate(self):
+        """Overrunning frames lower the frame rate down to the minimum and quick frames bring it back up."""
+
+        from frame_scheduler import FrameScheduler
+
+        scheduler = FrameScheduler(target_fps=144, min_fps=30)
+        for _ in range(50):
+            scheduler.adjust(100)
+        self.assertEqual(30, scheduler.get_fps())
+
+        for _ in range(50):
+            scheduler.adjust(0)
+        self.assertEqual(144, scheduler.get_fps())
+
+    def test_idle_after_empty_frame(self):
+        """A frame that updated nothing puts the scheduler into idle mode."""
+
+        from frame_scheduler import FrameScheduler
+
+        scheduler = FrameScheduler(target_fps=None)
+        scheduler.end_frame([])
+        self.assertTrue(scheduler.is_idle())
+        scheduler.end_frame([pg.Rect(0, 0, 1, 1)])
+        self.assertFalse(scheduler.is_idle())
+
+
+if __name__ == "__main__":
+    unittest.main()
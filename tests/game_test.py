@@ -94,18 +94,58 @@ class GameTest(unittest.TestCase):
             card = cards.pop()
             free_cell = g.get_card_areas()["free-cells"][cell_id]
             free_cell.add_card(card)
+        g.refresh_moves()  # the areas were changed directly
 
         self.assertEqual(1, g.moves_count())
 
     def test_moves_count_two_empty_columns(self):
-        """Returns 7 when there are 4 empty free cells and 2 empty columns."""
+        """Returns 20 when there are 4 empty free cells and 2 empty columns, and 10 when moving into one of them."""
 
         g = Game()
         columns = g.get_card_areas()["column-cells"]
         columns[1].set_cards([])
         columns[2].set_cards([])
+        g.refresh_moves()  # the areas were changed directly
 
-        self.assertEqual(7, g.moves_count())
+        self.assertEqual(20, g.moves_count())
+        self.assertEqual(10, g.moves_count(to_empty_column=True))
+
+    def test_moves_count_updated_by_moves(self):
+        """The moves count follows areas becoming empty and filled by moves and undo."""
+
+        g = Game()
+        columns = g.get_card_areas()["column-cells"]
+        columns[1].set_cards([Card(1, 2)])
+        g.refresh_moves()
+
+        self.assertTrue(g.apply_move((8, 1, 0)))  # column 1 empties, free cell 1 fills
+        self.assertEqual(8, g.moves_count())       # (3 + 1) * 2
+        g.undo()
+        self.assertEqual(5, g.moves_count())
+
+    def test_expand_move(self):
+        """A supermove is played one card at a time through the free cells and a spare empty column."""
+
+        g = Game()
+        columns = g.get_card_areas()["column-cells"]
+        run = [Card(1, 13), Card(4, 12), Card(2, 11), Card(3, 10), Card(1, 9), Card(4, 8)]
+        columns[1].set_cards(list(run))
+        columns[2].set_cards([])
+        columns[3].set_cards([])
+        for free_id in (1, 2, 3):
+            g.get_card_areas()["free-cells"][free_id].add_card(Card(2, 1 + free_id))
+        g.refresh_moves()
+
+        # 1 free cell and 2 empty columns: 4 cards into an empty column, (1 + 1) * 2 ^ 1
+        self.assertEqual(4, g.moves_count(to_empty_column=True))
+        steps = g.expand_move((8, 4, 9))
+        self.assertTrue(all(depth == 1 for _, depth, _ in steps))
+
+        for step in steps:
+            self.assertTrue(g.apply_move(step))
+        self.assertEqual(run[2:], columns[2].get_cards())
+        self.assertEqual(run[:2], columns[1].get_cards())
+        self.assertTrue(columns[3].is_empty())
 
     def test_move_selection_to_previous_free_cell(self):
         """Moves a card to the previous area, which is an empty free cell."""
@@ -189,7 +229,7 @@ class GameTest(unittest.TestCase):
         column_cell.add_card(Card(2, 6))
         column_cell.add_card(Card(2, 12))
         column_cell.add_card(Card(1, 10))  # cards in column == [6 of Spades, Queen of Spades, 10 of Clubs]
-        cards = [Card(2, 7), (3, 6), (2, 5)]  # selection == [7 of Spades, 6 of Diamonds, 5 of Spades]
+        cards = [Card(2, 7), Card(3, 6), Card(2, 5)]  # selection == [7 of Spades, 6 of Diamonds, 5 of Spades]
         expected = column_cell.get_cards() + cards
         g.set_selected_cards(cards)
         g.set_previous_cards_area(column_cell)
@@ -201,6 +241,95 @@ class GameTest(unittest.TestCase):
 
         # cards have been moved
         self.assertEqual(expected, column_cell.get_cards())
+
+    def test_moves_count_counts_selection_source_as_occupied(self):
+        """Selecting a whole column does not make it count as an empty column until the cards are moved."""
+
+        g = Game()
+        column = g.get_card_areas()["column-cells"][1]
+        column.set_cards([Card(1, 2)])
+        g.select_card(column.get_cards()[0], column)
+
+        self.assertEqual(5, g.moves_count())
+
+    def test_apply_move(self):
+        """Plays a move given as (source index, depth, destination index) and refuses an invalid one."""
+
+        g = Game()
+        column = g.get_card_areas()["column-cells"][1]
+        free_cell = g.get_card_areas()["free-cells"][1]
+        card = column.get_cards()[-1]
+
+        self.assertTrue(g.apply_move((8, 1, 0)))  # bottom card of column 1 to free cell 1
+        self.assertEqual([card], free_cell.get_cards())
+        self.assertFalse(g.apply_move((8, 1, 0)))  # free cell 1 is now occupied
+        self.assertEqual(6, column.cards_count())
+        self.assertEqual([], g.get_selected_cards())
+
+    def test_autoplay_moves_safe_cards(self):
+        """After a move, safe cards on top of the columns go home one after another, and can be undone."""
+
+        g = Game(autoplay=True)
+        columns = g.get_card_areas()["column-cells"]
+        for column in columns.values():
+            column.set_cards([Card(1, 9)])
+        columns[1].set_cards([Card(1, 13), Card(4, 1)])
+        columns[2].set_cards([Card(1, 13), Card(1, 2), Card(4, 2)])
+        columns[3].set_cards([Card(1, 13), Card(1, 1), Card(1, 3)])
+        g.set_state(g.get_state())
+        columns = g.get_card_areas()["column-cells"]
+
+        self.assertTrue(g.apply_move((10, 1, 0)))  # 3 of clubs to a free cell frees the Ace of clubs
+
+        # Aces and Twos of hearts and clubs go home; the 3 of clubs stays while no diamond is home
+        self.assertEqual([2, 0, 0, 2], g.get_foundation_heights())
+        self.assertEqual(4, len(g.get_auto_moves()))
+        self.assertEqual(1, columns[1].cards_count())
+        self.assertEqual(1, g.get_card_areas()["free-cells"][1].cards_count())
+
+        for _ in range(4): g.undo()
+        self.assertEqual([0, 0, 0, 0], g.get_foundation_heights())
+        self.assertEqual(2, columns[1].cards_count())
+
+    def test_hint_is_cached(self):
+        """A hint is a legal move, and asking again in the same position gives the same list without searching."""
+
+        g = Game(1)
+        moves = g.hint(0.01)
+
+        self.assertTrue(g.get_state().valid_move(moves[0]))
+        self.assertIs(moves, g.hint(0.01))
+
+        g.apply_move(moves[0])
+        g.undo()
+        self.assertIs(moves, g.hint(0.01))  # back in a position already seen
+
+    def test_autoplay_off_by_default(self):
+        """Without autoplay, moves only move the cards asked for."""
+
+        g = Game(1)
+        g.apply_move((8, 1, 0))
+        self.assertEqual([], g.get_auto_moves())
+
+    def test_foundation_count(self):
+        """The foundation count follows cards onto and off the suit cells, and the game is won at 52."""
+
+        from solver import solve
+
+        g = Game(1)
+        for move in solve(g).moves:
+            self.assertFalse(g.is_won())
+            g.apply_move(move)
+
+        self.assertEqual(52, g.get_foundation_count())
+        self.assertTrue(g.is_won())
+
+        g.undo()
+        self.assertEqual(51, g.get_foundation_count())
+        self.assertFalse(g.is_won())
+
+        g.set_state(g.get_state())  # recounted from the suit cells
+        self.assertEqual(51, g.get_foundation_count())
         
 
 if __name__ == "__main__":
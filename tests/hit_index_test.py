@@ -0,0 +1,87 @@
+import unittest
+import sys
+sys.path.append("../freecell")
+from card import Card
+from column_cell import ColumnCell
+from free_cell import FreeCell
+from suit_cell import SuitCell
+from hit_index import HitIndex
+
+
+def lay_out(card_area, x, y, stagger):
+    """Positions a card area and staggers its cards the way the Display does."""
+
+    card_area.set_pos(x, y)
+    for card in card_area.get_cards():
+        card.set_pos(x, y)
+        y += stagger
+
+
+class HitIndexTest(unittest.TestCase):
+    """Tests for the HitIndex class."""
+
+    def setUp(self):
+        self.column = ColumnCell()
+        self.long_column = ColumnCell()
+        self.free_cell = FreeCell()
+        self.suit_cell = SuitCell()
+
+        for value in range(13, 0, -1):
+            self.column.add_card(Card(1 + value % 2, value))
+        for idx in range(300):  # stress layout, far more cards than a real game
+            self.long_column.add_card(Card(1 + idx % 4, 1 + idx % 13))
+        self.free_cell.add_card(Card(3, 7))
+        self.suit_cell.add_card(Card(4, 1))
+
+        lay_out(self.column, 100, 200, 30)
+        lay_out(self.long_column, 300, 200, 2)
+        lay_out(self.free_cell, 10, 10, 0)
+        lay_out(self.suit_cell, 500, 10, 0)
+
+        self.index = HitIndex()
+        self.index.build([self.column, self.long_column, self.free_cell, self.suit_cell], 1280)
+        self.index.update_area(self.column, 30)
+        self.index.update_area(self.long_column, 2)
+
+    def brute_force(self, pos):
+        """Finds the clicked card by testing every card from the bottom up, the way the Display used to."""
+
+        for card_area in (self.free_cell, self.column, self.long_column):
+            for card in reversed(card_area.get_cards()):
+                if card.collidepoint(pos):
+                    return card, card_area
+        return None
+
+    def test_card_at_matches_brute_force(self):
+        """The index finds the same card as testing every card, at every point of a grid over the layout."""
+
+        for x in range(0, 420, 7):
+            for y in range(0, 1000, 5):
+                self.assertEqual(self.brute_force((x, y)), self.index.card_at((x, y)), (x, y))
+
+    def test_suit_cells_are_not_clickable(self):
+        """Cards in suit cells cannot be picked up."""
+
+        self.assertIsNone(self.index.card_at((510, 20)))
+
+    def test_drop_target(self):
+        """A drop lands on the last card of a column, on the suit cell, or on nothing."""
+
+        last = self.column.get_cards()[-1]
+        self.assertIs(self.column, self.index.drop_target(last.get_x() + 48, last.get_y() + 64))
+        self.assertIsNone(self.index.drop_target(148, 264))  # over the first card, not the last
+        self.assertIs(self.suit_cell, self.index.drop_target(548, 74))
+        self.assertIsNone(self.index.drop_target(1000, 600))
+
+    def test_rebuild_forgets_staggers(self):
+        """Rebuilding starts every stagger again, so an area laid out anew (or a new area that happens to get an
+        old one's id) does not keep the stagger it had before."""
+
+        lay_out(self.column, 100, 200, 0)
+        self.index.build([self.column], 1280)
+
+        self.assertEqual((self.column.get_cards()[-1], self.column), self.index.card_at((110, 210)))
+
+
+if __name__ == "__main__":
+    unittest.main()
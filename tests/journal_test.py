@@ -0,0 +1,109 @@
+import unittest
+import sys
+sys.path.append("../freecell")
+from game import Game
+from journal import MoveJournal
+from solver import solve
+from zobrist import hash_state
+
+
+class MoveJournalTest(unittest.TestCase):
+    """Tests for the MoveJournal class and undo/redo in the Game."""
+
+    def test_record_undo_redo(self):
+        """Moves come back out of the journal in the order they are undone and redone."""
+
+        journal = MoveJournal()
+        journal.record(8, 0, 1)
+        journal.record(15, 9, 3)
+
+        self.assertEqual((15, 3, 9), journal.undo())
+        self.assertEqual((8, 1, 0), journal.undo())
+        self.assertIsNone(journal.undo())
+        self.assertEqual((8, 1, 0), journal.redo())
+        self.assertEqual(2, len(journal.to_bytes()))  # one move before the cursor, 2 bytes
+
+    def test_new_move_drops_redo(self):
+        """Recording after an undo makes the undone move unreachable."""
+
+        journal = MoveJournal()
+        journal.record(8, 0, 1)
+        journal.undo()
+        journal.record(9, 1, 1)
+
+        self.assertFalse(journal.can_redo())
+        self.assertEqual([(9, 1, 1)], journal.moves())
+
+    def test_max_depth_forgets_oldest(self):
+        """With a depth cap only the newest moves are kept."""
+
+        journal = MoveJournal(max_depth=2)
+        for dst in range(3):
+            journal.record(8, dst, 1)
+
+        self.assertEqual([(8, 1, 1), (8, 1, 2)], journal.moves())
+
+    def test_max_depth_keeps_memory_bounded(self):
+        """Long games with a depth cap keep the newest moves, undoable and redoable, in a bounded buffer."""
+
+        journal = MoveJournal(max_depth=100)
+        for idx in range(10000):
+            journal.record(8 + idx % 8, idx % 4, 1 + idx % 3)
+            self.assertLessEqual(len(journal._data), 2 * 2 * 100)
+
+        self.assertEqual(100, len(journal))
+        self.assertEqual((15, 1, 3), journal.undo())
+        self.assertEqual((15, 1, 3), journal.redo())
+        self.assertEqual([(8 + idx % 8, 1 + idx % 3, idx % 4) for idx in range(9900, 10000)], journal.moves())
+
+    def test_undo_takes_back_autoplay(self):
+        """One undo takes back a move and the safe moves autoplay made after it, and one redo makes them again."""
+
+        g = Game(1, autoplay=True)
+        for move in solve(Game(1)).moves:
+            before = g.get_state()
+            if g.apply_move(move) and g.get_auto_moves(): break
+
+        after = g.get_state()
+        self.assertEqual(3, len(g.get_auto_moves()))
+
+        self.assertTrue(g.undo())
+        self.assertEqual(before, g.get_state())
+        self.assertEqual(hash_state(before), g.position_hash())
+
+        self.assertTrue(g.redo())
+        self.assertEqual(after, g.get_state())
+        self.assertFalse(g.redo())
+
+    def test_undo_whole_solution(self):
+        """Undoing every move of a won game gets back to the deal, and redoing them wins it again."""
+
+        g = Game(3)
+        start = g.get_state()
+        for move in solve(g).moves:
+            g.apply_move(move)
+        self.assertTrue(g.is_won())
+
+        while g.undo(): pass
+        self.assertEqual(start, g.get_state())
+        self.assertEqual(hash_state(start), g.position_hash())
+        self.assertTrue(g.has_legal_moves())
+
+        while g.redo(): pass
+        self.assertTrue(g.is_won())
+
+    def test_journal_replays_game(self):
+        """The moves in a game's journal replay the game on a fresh Game with the same deal."""
+
+        g = Game(5)
+        for move in solve(g).moves[:20]:
+            g.apply_move(move)
+
+        replay = Game(5)
+        for move in g.get_journal().moves():
+            self.assertTrue(replay.apply_move(move))
+        self.assertEqual(g.get_state(), replay.get_state())
+
+
+if __name__ == "__main__":
+    unittest.main()
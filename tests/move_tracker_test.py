@@ -0,0 +1,66 @@
+import unittest
+import random
+import sys
+sys.path.append("../freecell")
+from card import Card
+from game import Game
+from state import *
+
+
+def productive_moves(state):
+    """Returns the legal moves of a State without free cell to free cell and whole column to empty column moves."""
+
+    moves = []
+    for src, depth, dst in state.legal_moves():
+        if src in FREE_CELLS and dst in FREE_CELLS: continue
+        if src in COLUMNS and dst in COLUMNS and not state.columns[dst - 8] and \
+           depth == len(state.columns[src - 8]): continue
+        moves.append((src, depth, dst))
+    return moves
+
+
+class MoveTrackerTest(unittest.TestCase):
+    """Tests for the MoveTracker class."""
+
+    def test_matches_full_move_generation(self):
+        """After every move of random games the tracker agrees with generating all moves from scratch."""
+
+        rng = random.Random(5)
+
+        for deal_number in range(1, 6):
+            g = Game(deal_number)
+
+            for _ in range(60):
+                moves = productive_moves(g.get_state())
+                self.assertEqual(bool(moves), g.has_legal_moves())
+                if not moves: break
+                g.apply_move(rng.choice(moves))
+
+    def test_no_moves_left(self):
+        """A position with full free cells and nothing that stacks has no moves left and is not winnable."""
+
+        g = Game()
+        kings = [encode_card(Card(suit, 13)) for suit in range(1, 5)]
+        columns = [[encode_card(Card(suit, 1)), encode_card(Card(suit, 3))] for suit in range(1, 5)] + \
+                  [[encode_card(Card(suit, 5))] for suit in range(1, 5)]
+        g.set_state(State(kings, None, columns))
+
+        self.assertFalse(g.has_legal_moves())
+        self.assertFalse(g.is_winnable())
+
+    def test_free_cell_shuffle_is_not_a_move(self):
+        """A card that could only move to another free cell does not count as a move left."""
+
+        g = Game()
+        kings = [encode_card(Card(suit, 13)) for suit in range(1, 4)] + [NO_CARD]
+        columns = [[encode_card(Card(suit, value)) for value in (1, 3, 7)] for suit in range(1, 5)] + \
+                  [[encode_card(Card(suit, 5))] for suit in range(1, 5)]
+        g.set_state(State(kings, None, columns))
+        self.assertTrue(g.has_legal_moves())  # a column card can still go to the empty free cell
+
+        g.apply_move((8, 1, 3))
+        self.assertFalse(g.has_legal_moves())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import unittest
+import random
+import sys
+sys.path.append("../freecell")
+from parallel_solver import *
+from game import Game
+from solver import auto_play, successors
+
+
+class ParallelSolverTest(unittest.TestCase):
+    """Tests for the hash distributed parallel solver."""
+
+    def test_incremental_hash(self):
+        """Hashes updated move by move match hashes computed from scratch."""
+
+        rng = random.Random(3)
+        state = Game(5).get_state()
+        free, suits, columns, _ = auto_play(tuple(state.free_cells), tuple(state.suit_cells),
+                                            tuple(bytes(column) for column in state.columns))
+        value = hash_position(free, suits, columns)
+
+        for _ in range(100):
+            moves = list(successors(free, suits, columns))
+            if not moves: break
+            value, free, suits, columns, _ = play_hashed(value, free, suits, columns, rng.choice(moves))
+            self.assertEqual(hash_position(free, suits, columns), value)
+
+    def test_hash_matches_game(self):
+        """The solver's position hash is the Game's Zobrist hash."""
+
+        game = Game(7)
+        state = game.get_state()
+        self.assertEqual(game.position_hash(), hash_position(tuple(state.free_cells), tuple(state.suit_cells),
+                                                             tuple(bytes(column) for column in state.columns)))
+
+    def test_shared_table(self):
+        """Hashes are added once to their owner's region and can be looked up."""
+
+        name = SharedTable.create(64, 2)
+        table = SharedTable(name, 64, 2)
+
+        self.assertTrue(table.add(6))
+        self.assertFalse(table.add(6))
+        self.assertIn(6, table)
+        self.assertNotIn(8, table)
+
+        table.close()
+        memory = shared_memory.SharedMemory(name=name)
+        memory.close()
+        memory.unlink()
+
+    def test_solution_wins(self):
+        """With several workers the solution found plays to a win in the Game."""
+
+        game = Game(2)
+        result = solve_parallel(game, workers=2)
+
+        self.assertTrue(result.solvable)
+        for move in result.moves:
+            self.assertTrue(game.apply_move(move), move)
+        self.assertTrue(game.is_won())
+
+    def test_node_limit(self):
+        """A search stopped by the node limit is inconclusive."""
+
+        result = ParallelSolver(Game(2).get_state(), workers=2, max_nodes=50).solve()
+
+        self.assertIsNone(result.solvable)
+        self.assertEqual([], result.moves)
+
+
+if __name__ == "__main__":
+    unittest.main()
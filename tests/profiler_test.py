@@ -0,0 +1,93 @@
+import unittest
+import json
+import os
+import pstats
+import sys
+import tempfile
+import time
+sys.path.append("../freecell")
+from profiler import *
+from game import Game
+
+
+class Worker:
+    """An object with one method calling another, to instrument."""
+
+    def outer(self):
+        time.sleep(0.002)
+        return self.inner() + 1
+
+    def inner(self):
+        time.sleep(0.002)
+        return 1
+
+
+class ProfilerTest(unittest.TestCase):
+    """Tests for the instrumentation layer."""
+
+    def test_counts_total_and_own_time(self):
+        """Calls are counted, and a method's own time leaves out the instrumented methods it calls."""
+
+        profiler = Profiler()
+        worker = Worker()
+        profiler.instrument(worker, "outer", "inner")
+
+        self.assertEqual(2, worker.outer())
+
+        counters = profiler.get_counters()
+        calls, total, own = counters["Worker.outer"]
+        self.assertEqual(1, calls)
+        self.assertEqual(1, counters["Worker.inner"][0])
+        self.assertAlmostEqual(own, total - counters["Worker.inner"][1], delta=0.0005)
+        self.assertGreaterEqual(own, 0.002)
+
+        self.assertNotIn("outer", vars(Worker()))  # only the instrumented object is changed
+
+    def test_frame_histogram(self):
+        """Frames that drew something are timed into the histogram and the percentiles."""
+
+        profiler = Profiler()
+
+        for drew in (True, True, False):
+            profiler.start_frame()
+            profiler.end_frame(drew)
+
+        self.assertEqual(2, profiler.frames_count())
+        self.assertEqual(("<1 ms", 2), profiler.get_histogram()[0])
+        self.assertLess(profiler.frame_percentile(99), 1)
+
+    def test_hot_paths_on_game(self):
+        """The Game's hot paths are counted when moves are played."""
+
+        profiler = Profiler()
+        game = Game(1)
+        profiler.instrument(game, *GAME_HOT_PATHS)
+        game.apply_move((8, 1, 0))
+
+        counters = profiler.get_counters()
+        self.assertEqual(1, counters["Game.select_card"][0])
+        self.assertEqual(1, counters["Game.update_moves_count"][0])
+
+    def test_dump(self):
+        """Results are written as JSON, or as a cProfile file that pstats can read."""
+
+        profiler = Profiler()
+        worker = Worker()
+        profiler.instrument(worker, "inner")
+        worker.inner()
+
+        with tempfile.TemporaryDirectory() as directory:
+            json_path = os.path.join(directory, "profile.json")
+            profiler.dump(json_path)
+            with open(json_path) as file:
+                self.assertEqual(1, json.load(file)["counters"]["Worker.inner"]["calls"])
+
+            prof_path = os.path.join(directory, "profile.prof")
+            profiler.dump(prof_path)
+            stats = pstats.Stats(prof_path)
+            self.assertEqual(1, stats.total_calls)
+            self.assertEqual(["Worker.inner"], [key[2] for key in stats.stats])
+
+
+if __name__ == "__main__":
+    unittest.main()
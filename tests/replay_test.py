@@ -0,0 +1,84 @@
+import unittest
+import os
+import sys
+import tempfile
+sys.path.append("../freecell")
+from replay import *
+from game import Game
+from solver import solve
+
+
+class ReplayTest(unittest.TestCase):
+    """Tests for the replay file format and runner."""
+
+    def setUp(self):
+        self._dir = tempfile.TemporaryDirectory()
+        self._path = os.path.join(self._dir.name, "games.fcr")
+
+    def tearDown(self):
+        self._dir.cleanup()
+
+    def test_encode_sizes(self):
+        """Moves take one byte, or two when a column moves onto a column."""
+
+        moves = [(8, 1, 0), (0, 1, 9), (9, 3, 10), (10, 1, 4)]
+        data = encode_moves(moves)
+
+        self.assertEqual(5, len(data))
+        self.assertEqual((moves, 5), decode_moves(data, 4))
+
+    def test_encode_rejects_multi_card_to_cell(self):
+        """Only column to column moves can carry more than one card."""
+
+        self.assertRaises(ValueError, encode_moves, [(8, 2, 0)])
+
+    def test_round_trip_and_replay(self):
+        """A solved game written to a file replays without diverging and ends won."""
+
+        moves = solve(Game(1)).moves
+        writer = ReplayWriter(self._path)
+        writer.write_game(1, moves)
+        writer.close()
+
+        self.assertEqual([(1, moves)], list(read_replays(self._path)))
+        self.assertEqual([(0, 1, None, True)], run_replays(self._path))
+        self.assertEqual([(0, 1, None, True)], run_replays(self._path, atomic=True))
+
+    def test_record_game_journal(self):
+        """Recording a Game writes its deal number and the moves in its journal."""
+
+        game = Game(5)
+        move = next(move for move in game.get_state().legal_moves() if game.apply_move(move))
+
+        writer = ReplayWriter(self._path)
+        self.assertTrue(writer.record(game))
+        self.assertFalse(writer.record(Game(6)))  # nothing played
+        writer.close()
+
+        self.assertEqual([(5, [move])], list(read_replays(self._path)))
+
+    def test_divergence(self):
+        """The first move that is not legal is reported."""
+
+        moves = solve(Game(2)).moves[:3] + [(4, 1, 8)]  # a move out of an empty suit cell
+        writer = ReplayWriter(self._path)
+        writer.write_game(2, moves)
+        writer.close()
+
+        self.assertEqual([(0, 2, 3, False)], run_replays(self._path))
+
+    def test_truncated_record_skipped(self):
+        """A record cut short at the end of the file is ignored."""
+
+        writer = ReplayWriter(self._path)
+        writer.write_game(1, [(8, 1, 0)])
+        writer.close()
+
+        with open(self._path, "ab") as file:
+            file.write(RECORD_HEADER.pack(2, 5) + b"\x80")
+
+        self.assertEqual([(1, [(8, 1, 0)])], list(read_replays(self._path)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+import unittest
+import os
+import sys
+import tempfile
+sys.path.append("../freecell")
+from savegame import *
+from game import Game
+from solver import solve
+
+
+class SavegameTest(unittest.TestCase):
+    """Tests for saving and loading games."""
+
+    def setUp(self):
+        self._dir = tempfile.TemporaryDirectory()
+        self._path = os.path.join(self._dir.name, "save.fcs")
+
+    def tearDown(self):
+        self._dir.cleanup()
+
+    def play(self, deal_number, count):
+        """Returns a Game of the deal with the first count moves of its solution played."""
+
+        game = Game(deal_number)
+        for move in solve(game).moves[:count]:
+            game.apply_move(move)
+        return game
+
+    def test_round_trip(self):
+        """A loaded game has the same position, moves count, hash and undo history as the saved one."""
+
+        game = self.play(4, 20)
+        game.undo()
+        save(game, self._path)
+        loaded = load(self._path)
+
+        self.assertEqual(4, loaded.get_deal_number())
+        self.assertEqual(game.get_state(), loaded.get_state())
+        self.assertEqual(game.moves_count(), loaded.moves_count())
+        self.assertEqual(game.position_hash(), loaded.position_hash())
+        self.assertEqual(game.get_journal().dump(), loaded.get_journal().dump())
+        self.assertAlmostEqual(game.get_start_time(), loaded.get_start_time(), delta=1)
+
+        self.assertTrue(loaded.redo())  # the undone move can still be redone
+        while loaded.undo(): pass
+        self.assertEqual(Game(4).get_state(), loaded.get_state())
+
+    def test_selection_is_saved(self):
+        """Cards being dragged when the game is saved are selected again after loading."""
+
+        game = Game(2)
+        column = game.get_card_areas()["column-cells"][3]
+        card = column.get_cards()[-1]
+        game.select_card(card, column)
+
+        loaded = Game()
+        restore(loaded, snapshot(game))
+
+        self.assertEqual(1, len(loaded.get_selected_cards()))
+        self.assertEqual(str(card), str(loaded.get_selected_cards()[0]))
+        self.assertIs(loaded.get_area(10), loaded.get_previous_cards_area())
+
+    def test_bad_save(self):
+        """A missing or damaged save file loads as None."""
+
+        self.assertIsNone(load(self._path))
+
+        with open(self._path, "wb") as file:
+            file.write(snapshot(Game(1))[:20])
+        self.assertIsNone(load(self._path))
+
+    def test_autosaver_writes_latest(self):
+        """The autosaver writes the last game it was given."""
+
+        game = Game(7)
+        autosaver = Autosaver(self._path)
+        autosaver.request(game)
+        game.apply_move(game.legal_moves()[0])
+        autosaver.request(game)
+        autosaver.close()
+
+        self.assertEqual(game.get_state(), load(self._path).get_state())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+import unittest
+import asyncio
+import sys
+import tracemalloc
+sys.path.append("../freecell")
+from server import *
+from game import Game
+from state import State, NO_CARD
+
+
+class ServerTest(unittest.TestCase):
+    """Tests for the game server's sessions and protocol."""
+
+    def test_session_mirrors_game(self):
+        """Selections and moves are accepted and rejected the same way as Game's console methods."""
+
+        game, session = Game(3), Session()
+        session.new_game(3)
+
+        calls = [("column", 1, 6), ("move", "free-cell", 1), ("column", 2, 0), ("free", 1), ("move", "free-cell", 1),
+                 ("free", 1), ("move", "column-cell", 9), ("free", 2), ("column", 3, 5), ("move", "suit-cell", 1), ("column", 4, 6), ("move", "column-cell", 4),
+                 ("column", 5, 5), ("move", "column-cell", 5), ("column", 8, 4), ("move", "column-cell", 8)]
+        area_types = {"free-cell": 0, "suit-cell": 1, "column-cell": 2}
+
+        for call in calls:
+            if call[0] == "column":
+                expected = game.select_from_column_with_validation(*call[1:])
+                actual = session.select_from_column(*call[1:])
+            elif call[0] == "free":
+                expected = game.select_from_free_cell_with_validation(call[1])
+                actual = session.select_from_free_cell(call[1])
+            else:
+                expected = game.move_cards_with_validation(*call[1:])
+                actual = session.move_cards(area_types[call[1]], call[2])
+
+            self.assertEqual(expected, actual, call)
+            self.assertEqual(bool(game.get_selected_cards()), session.selection is not None, call)
+
+        self.assertEqual(game.get_state(), session.state)
+
+    def test_session_mirrors_game_on_random_requests(self):
+        """A long stream of random requests, many of them out of range, leaves the Session and the Game with the
+        same answers, positions and selections."""
+
+        import random
+        rng = random.Random(7)
+        area_types = ["free-cell", "suit-cell", "column-cell"]
+
+        for deal_number in range(1, 6):
+            game, session = Game(deal_number), Session()
+            session.new_game(deal_number)
+
+            for _ in range(2000):
+                kind = rng.randrange(3)
+                if kind == 0:
+                    column_id, card_idx = rng.randint(0, 9), rng.randint(0, 12)
+                    expected = game.select_from_column_with_validation(column_id, card_idx)
+                    actual = session.select_from_column(column_id, card_idx)
+                elif kind == 1:
+                    free_cell_id = rng.randint(0, 5)
+                    expected = game.select_from_free_cell_with_validation(free_cell_id)
+                    actual = session.select_from_free_cell(free_cell_id)
+                else:
+                    area_type, area_id = rng.randrange(3), rng.randint(0, 9)
+                    expected = game.move_cards_with_validation(area_types[area_type], area_id)
+                    actual = session.move_cards(area_type, area_id)
+
+                self.assertEqual(expected, actual)
+                self.assertEqual(bool(game.get_selected_cards()), session.selection is not None)
+                if session.selection is None:
+                    self.assertEqual(game.get_state(), session.state)
+
+    def test_session_memory(self):
+        """A session in play takes a couple of kilobytes at most."""
+
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        sessions = [Session() for _ in range(100)]
+        for idx, session in enumerate(sessions):
+            session.new_game(idx + 1)
+        used = (tracemalloc.get_traced_memory()[0] - before) / len(sessions)
+        tracemalloc.stop()
+
+        self.assertLess(used, 2048)
+
+    def test_requests_over_tcp(self):
+        """Pipelined requests are answered in order, and connections past the limit are closed."""
+
+        async def exchange():
+            server = GameServer(max_sessions=1)
+            await server.start()
+            reader, writer = await asyncio.open_connection("127.0.0.1", server.get_port())
+
+            writer.write(encode_request(NEW_GAME, 1) + encode_request(SELECT_COLUMN, 1, 6) +
+                         encode_request(MOVE, 0, 1) + encode_request(MOVE, 0, 2) + encode_request(GET_STATE))
+
+            self.assertEqual(OK, (await reader.readexactly(1))[0])
+            await reader.readexactly((await reader.readexactly(1))[0])
+            self.assertEqual(bytes((OK, OK, REJECTED, OK)), await reader.readexactly(4))
+            state = State.unpack(await reader.readexactly((await reader.readexactly(1))[0]))
+            self.assertNotEqual(NO_CARD, state.free_cells[0])
+
+            extra_reader, extra_writer = await asyncio.open_connection("127.0.0.1", server.get_port())
+            self.assertEqual(b"", await extra_reader.read(1))  # closed by the server
+            self.assertEqual(1, server.sessions_count())
+
+            writer.close()
+            extra_writer.close()
+            await server.close()
+
+        asyncio.run(exchange())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+import unittest
+import sys
+sys.path.append("../freecell")
+from card import Card
+from game import Game
+from state import *
+from solver import *
+
+
+class SolverTest(unittest.TestCase):
+    """Tests for the Solver class."""
+
+    def test_solution_plays_out_in_game(self):
+        """Every move of a found solution is accepted by the Game and the game ends won."""
+
+        g = Game(1)
+        result = solve(g)
+
+        self.assertTrue(result.solvable)
+        for move in result.moves:
+            self.assertTrue(g.apply_move(move))
+        self.assertTrue(g.get_state().is_won())
+
+    def test_rank_moves_puts_winning_move_first(self):
+        """With time to find a win, the first ranked move is on a winning line and every ranked move is legal."""
+
+        g = Game(1)
+        state = g.get_state()
+        moves = Solver(state).rank_moves()
+
+        self.assertTrue(all(state.valid_move(move) for move in moves))
+        g.apply_move(moves[0])
+        self.assertTrue(solve(g).solvable)
+
+    def test_dead_position_is_unsolvable(self):
+        """A position with full free cells and no possible moves is proven unsolvable."""
+
+        kings = [encode_card(Card(suit, 13)) for suit in range(1, 5)]
+        columns = [[encode_card(Card(suit, 1)), encode_card(Card(suit, 3))] for suit in range(1, 5)] + \
+                  [[encode_card(Card(suit, 5))] for suit in range(1, 5)]
+        result = Solver(State(kings, None, columns)).solve()
+
+        self.assertFalse(result.solvable)
+        self.assertEqual([], result.moves)
+
+    def test_node_limit_gives_unknown(self):
+        """Running out of nodes before finding a solution returns None instead of a proof."""
+
+        result = Solver(Game(4).get_state(), max_nodes=1).solve()
+
+        self.assertIsNone(result.solvable)
+
+    def test_stats_are_counted(self):
+        """Expanded nodes, table size and memory are reported."""
+
+        result = Solver(Game(1).get_state(), track_memory=True).solve()
+        stats = result.stats
+
+        self.assertGreater(stats.nodes_expanded, 0)
+        self.assertGreater(stats.peak_table, 0)
+        self.assertGreater(stats.peak_memory, 0)
+        self.assertGreater(stats.nodes_per_second(), 0)
+
+    def test_auto_play_moves_safe_cards(self):
+        """Aces and Twos go to the suit cells while a Three whose opposite color Twos are not home stays."""
+
+        ace_hearts, two_hearts = encode_card(Card(4, 1)), encode_card(Card(4, 2))
+        three_hearts = encode_card(Card(4, 3))
+        free = (three_hearts, NO_CARD, NO_CARD, NO_CARD)
+        columns = (bytes([two_hearts, ace_hearts]),) + (b"",) * 7
+
+        free, suits, columns, moves = auto_play(free, (NO_CARD,) * 4, columns)
+
+        self.assertEqual([(8, 1, 4), (8, 1, 4)], moves)
+        self.assertEqual(two_hearts, suits[0])
+        self.assertEqual(three_hearts, free[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
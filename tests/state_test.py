@@ -0,0 +1,121 @@
+import unittest
+import random
+import sys
+sys.path.append("../freecell")
+from card import Card
+from game import Game
+from state import *
+
+
+class StateTest(unittest.TestCase):
+    """Tests for the State class and the card code helpers."""
+
+    def test_encode_decode_card(self):
+        """Every card survives being encoded to a card code and decoded back."""
+
+        for suit in range(1, 5):
+            for value in range(1, 14):
+                card = decode_card(encode_card(Card(suit, value)))
+                self.assertEqual((suit, value), (card.get_suit(), card.get_value()))
+
+    def test_is_red(self):
+        """Diamonds and hearts are red, clubs and spades are not."""
+
+        self.assertFalse(is_red(encode_card(Card(1, 5))))
+        self.assertFalse(is_red(encode_card(Card(2, 5))))
+        self.assertTrue(is_red(encode_card(Card(3, 5))))
+        self.assertTrue(is_red(encode_card(Card(4, 5))))
+
+    def test_can_stack(self):
+        """A card stacks on a card of the opposite color that is one value higher."""
+
+        ten_clubs = encode_card(Card(1, 10))
+        self.assertTrue(can_stack(encode_card(Card(3, 9)), ten_clubs))  # 9 of diamonds on 10 of clubs
+        self.assertFalse(can_stack(encode_card(Card(2, 9)), ten_clubs))  # 9 of spades, same color
+        self.assertFalse(can_stack(encode_card(Card(4, 8)), ten_clubs))  # 8 of hearts, value too low
+
+    def test_is_safe_to_found(self):
+        """A card is safe to put home once both lower cards of the opposite color are home."""
+
+        heights = foundation_heights((encode_card(Card(3, 4)), NO_CARD, encode_card(Card(4, 5)), NO_CARD))
+        self.assertEqual([0, 0, 4, 5], heights)
+        self.assertTrue(is_safe_to_found(encode_card(Card(1, 2)), heights))   # a Two is always safe
+        self.assertTrue(is_safe_to_found(encode_card(Card(2, 5)), heights))   # 4 of diamonds and hearts are home
+        self.assertFalse(is_safe_to_found(encode_card(Card(2, 6)), heights))  # 5 of diamonds is not
+        self.assertFalse(is_safe_to_found(encode_card(Card(3, 3)), heights))  # no black cards are home
+
+    def test_can_found(self):
+        """Only an Ace goes on an empty suit cell and only the next card of the suit goes on an occupied one."""
+
+        self.assertTrue(can_found(encode_card(Card(4, 1)), NO_CARD))
+        self.assertFalse(can_found(encode_card(Card(4, 2)), NO_CARD))
+        self.assertTrue(can_found(encode_card(Card(4, 2)), encode_card(Card(4, 1))))
+        self.assertFalse(can_found(encode_card(Card(3, 2)), encode_card(Card(4, 1))))
+
+    def test_round_trip_card_areas(self):
+        """A State built from a game's card areas converts back into areas holding the same cards."""
+
+        g = Game()
+        areas = g.get_card_areas()
+        areas["free-cells"][2].add_card(areas["column-cells"][1].get_cards().pop())
+        areas["suit-cells"][3].place_cards([Card(4, 1), Card(4, 2)])
+
+        state = g.get_state()
+        rebuilt = state.to_card_areas()
+
+        for area_type in areas:
+            for id, card_area in areas[area_type].items():
+                expected = [(c.get_suit(), c.get_value()) for c in card_area.get_cards()]
+                actual = [(c.get_suit(), c.get_value()) for c in rebuilt[area_type][id].get_cards()]
+                self.assertEqual(expected, actual)
+
+    def test_pack_unpack(self):
+        """Unpacking a packed State gives an equal State."""
+
+        state = Game().get_state()
+        packed = state.pack()
+
+        self.assertEqual(8 + 8 + 52, len(packed))
+        self.assertEqual(state, State.unpack(packed))
+
+    def test_copy_is_independent(self):
+        """Changing a copy does not change the original."""
+
+        state = Game().get_state()
+        copy = state.copy()
+        copy.free_cells[0] = copy.columns[0].pop()
+
+        self.assertNotEqual(state, copy)
+
+    def test_moves_match_valid_move(self):
+        """The move generator yields exactly the moves valid_move accepts, and the run lengths kept by
+        apply_move match counting them again, over random games."""
+
+        rng = random.Random(3)
+
+        for deal_number in range(1, 6):
+            state = Game(deal_number).get_state()
+
+            for _ in range(80):
+                expected = {(src, depth, dst) for src in range(16) for depth in range(1, 14) for dst in range(16)
+                            if state.valid_move((src, depth, dst))}
+                moves = state.legal_moves()
+                self.assertEqual(expected, set(moves))
+                self.assertEqual(len(expected), len(moves))
+
+                if not moves: break
+                state.apply_move(rng.choice(moves))
+                self.assertEqual(bytearray(column_run(column) for column in state.columns), state.runs)
+
+    def test_set_state(self):
+        """Setting a game's State rebuilds its card areas from it."""
+
+        g = Game()
+        state = Game().get_state()
+        g.set_state(state)
+
+        self.assertEqual(state, g.get_state())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+import unittest
+import os
+import sys
+import tempfile
+sys.path.append("../freecell")
+from stats import *
+from game import Game
+from solver import solve
+
+
+class StatsTest(unittest.TestCase):
+    """Tests for the statistics database."""
+
+    def setUp(self):
+        self._dir = tempfile.TemporaryDirectory()
+        self._path = os.path.join(self._dir.name, "stats.db")
+        self.store = StatsStore(self._path, interval=60)
+
+    def tearDown(self):
+        self.store.close()
+        self._dir.cleanup()
+
+    def record_outcomes(self, outcomes, deal_number=1):
+        """Records a game of the deal for every outcome (1 for a win, 0 for a loss) and writes them."""
+
+        for idx, won in enumerate(outcomes):
+            self.store.record_row((deal_number, 1000.0 + idx, 60.0 + idx, 80 + idx, won))
+        self.store.flush()
+
+    def test_totals_and_streaks(self):
+        """The totals count the games and wins and follow the current and best winning streaks."""
+
+        self.assertEqual(0, self.store.totals().played)
+
+        self.record_outcomes([1, 1, 0, 1, 1, 1])
+        totals = self.store.totals()
+        self.assertEqual((6, 5, 3, 3), (totals.played, totals.wins, totals.winning_streak(), totals.best_streak))
+        self.assertAlmostEqual(5 / 6, totals.win_rate())
+
+        self.record_outcomes([0, 0])
+        totals = self.store.totals()
+        self.assertEqual((0, 2, 3), (totals.winning_streak(), totals.streak, totals.best_streak))
+
+    def test_recent_win_rate(self):
+        """The recent win rate only looks at the last games."""
+
+        self.assertIsNone(self.store.recent_win_rate())
+
+        self.record_outcomes([0] * 10 + [1] * 4)
+        self.assertEqual(1.0, self.store.recent_win_rate(4))
+        self.assertEqual(0.5, self.store.recent_win_rate(8))
+
+    def test_deal_stats_and_history(self):
+        """A deal's stats and history only include its own games, newest first, through the deal index."""
+
+        self.record_outcomes([0, 1, 1], deal_number=7)
+        self.record_outcomes([1], deal_number=8)
+
+        deal = self.store.deal_stats(7)
+        self.assertEqual((3, 2, 81, 61.0), (deal.played, deal.wins, deal.fewest_moves, deal.fastest))
+        self.assertEqual([82, 81, 80], [moves for _, _, moves, _ in self.store.deal_history(7)])
+        self.assertIsNone(self.store.deal_stats(9).fewest_moves)
+
+        connection = connect(self._path)
+        plan = connection.execute("EXPLAIN QUERY PLAN SELECT * FROM games WHERE deal_number = 7 "
+                                  "ORDER BY id DESC").fetchall()
+        connection.close()
+        self.assertIn("games_deal", str(plan))
+
+    def test_record_game(self):
+        """A won Game is recorded with its deal number, moves played and outcome."""
+
+        game = Game(1)
+        for move in solve(game).moves:
+            game.apply_move(move)
+
+        self.store.record(game)
+        self.store.flush()
+
+        _, duration, moves, won = self.store.deal_history(1)[0]
+        self.assertEqual((game.moves_played(), 1), (moves, won))
+        self.assertGreaterEqual(duration, 0)
+
+    def test_close_writes_pending(self):
+        """Games waiting for a batch are written when the store is closed, and the database is in WAL mode."""
+
+        self.store.record_row((3, 0.0, 1.0, 10, 1))
+        self.store.close()
+
+        self.store = StatsStore(self._path)
+        self.assertEqual(1, self.store.totals().wins)
+        self.assertEqual("wal", self.store._connection.execute("PRAGMA journal_mode").fetchone()[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
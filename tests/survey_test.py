@@ -0,0 +1,52 @@
+import unittest
+import csv
+import json
+import os
+import sys
+import tempfile
+sys.path.append("../freecell")
+from survey import *
+
+
+class SurveyTest(unittest.TestCase):
+    """Tests for the deal survey."""
+
+    def setUp(self):
+        self._dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self._dir.cleanup()
+
+    def test_csv_rows(self):
+        """Writes one CSV row per seed with every field filled in for a solved deal."""
+
+        out_path = os.path.join(self._dir.name, "survey.csv")
+        self.assertEqual(3, run_survey(range(1, 4), out_path, workers=1))
+
+        with open(out_path, newline="") as file:
+            rows = list(csv.DictReader(file))
+
+        self.assertEqual(["1", "2", "3"], sorted(row["seed"] for row in rows))
+        self.assertEqual("1", rows[0]["solvable"])
+        self.assertGreater(int(rows[0]["solution_length"]), 0)
+
+    def test_resume_skips_finished_seeds(self):
+        """Running again over a larger range only solves the seeds without a result."""
+
+        out_path = os.path.join(self._dir.name, "survey.jsonl")
+        run_survey(range(1, 3), out_path, workers=1)
+
+        with open(out_path, "a") as file:
+            file.write('{"seed": 3, "solv')  # a row cut short by an interruption
+
+        self.assertEqual(2, run_survey(range(1, 5), out_path, workers=1))
+
+        with open(out_path) as file:
+            lines = file.read().splitlines()
+        seeds = sorted(json.loads(line)["seed"] for line in lines if line.endswith("}"))
+
+        self.assertEqual([1, 2, 3, 4], seeds)
+
+
+if __name__ == "__main__":
+    unittest.main()
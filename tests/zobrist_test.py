@@ -0,0 +1,70 @@
+import unittest
+import random
+import sys
+sys.path.append("../freecell")
+from card import Card
+from game import Game
+from state import *
+from zobrist import *
+
+
+class ZobristTest(unittest.TestCase):
+    """Tests for Zobrist hashing and canonical positions."""
+
+    def test_incremental_hash_matches_full_hash(self):
+        """The hash kept by the Game while moves are played matches a hash computed from scratch."""
+
+        g = Game(3)
+        rng = random.Random(3)
+
+        for _ in range(40):
+            moves = g.get_state().legal_moves()
+            if not moves: break
+            g.apply_move(rng.choice(moves))
+            self.assertEqual(hash_state(g.get_state()), g.position_hash())
+
+    def test_moving_back_restores_hash(self):
+        """Selecting cards and putting them back leaves the hash unchanged."""
+
+        g = Game()
+        before = g.position_hash()
+        column = g.get_card_areas()["column-cells"][2]
+        g.select_card(column.get_cards()[-1], column)
+        g.move_selection_to_previous_area()
+
+        self.assertEqual(before, g.position_hash())
+
+    def test_hash_ignores_column_and_free_cell_order(self):
+        """Swapping two columns or two free cells gives the same hash and the same canonical key."""
+
+        state = Game().get_state()
+        state.free_cells[0] = state.columns[0].pop()
+        swapped = state.copy()
+        swapped.columns[0], swapped.columns[5] = swapped.columns[5], swapped.columns[0]
+        swapped.free_cells[0], swapped.free_cells[3] = swapped.free_cells[3], swapped.free_cells[0]
+
+        self.assertNotEqual(state, swapped)
+        self.assertEqual(hash_state(state), hash_state(swapped))
+        self.assertEqual(canonical_key(state), canonical_key(swapped))
+
+    def test_hash_tells_stacks_apart(self):
+        """Two positions with the same cards at the same depths but on different cards hash differently."""
+
+        a, b, c, d = (encode_card(Card(suit, 5)) for suit in range(1, 5))
+        first = State(None, None, [[a, b], [c, d]] + [[]] * 6)
+        second = State(None, None, [[a, d], [c, b]] + [[]] * 6)
+
+        self.assertNotEqual(hash_state(first), hash_state(second))
+
+    def test_canonical_orders_suit_cells_by_suit(self):
+        """Suit cells in the canonical form are in suit order regardless of which cell holds which suit."""
+
+        state = State(None, [encode_card(Card(4, 2)), NO_CARD, encode_card(Card(1, 1)), NO_CARD])
+        suit_cells = canonical(state).suit_cells
+
+        self.assertEqual(encode_card(Card(1, 1)), suit_cells[0])
+        self.assertEqual(encode_card(Card(4, 2)), suit_cells[3])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+import random
+from state import *
+from free_cell import FreeCell
+from suit_cell import SuitCell
+
+# ---------------------------------------------------------------------------------------------------------
+# ZOBRIST HASHING: a position is hashed as the XOR of one random 64 bit key per card, chosen by the card's
+# location. A card in a column is located by the card it rests on (COLUMN_BASE when it is the first card
+# of the column), so the hash describes which card is on which without saying which column it is in. That
+# makes the hash the same for any order of the columns and of the free cells, and it means moving a run of
+# cards only changes the location of the first card of the run: the hash is updated in O(1) per move.
+# ---------------------------------------------------------------------------------------------------------
+
+COLUMN_BASE = NO_CARD   # location of the first card of a column
+IN_FREE_CELL = 56       # location of a card in any free cell
+IN_SUIT_CELL = 57       # location of a card in any suit cell
+
+_rng = random.Random(0x5EED_F2EE_CE11)  # fixed seed so hashes are stable between runs and processes
+KEYS = [[_rng.getrandbits(64) for location in range(58)] for code in range(56)]
+
+
+def card_key(code, location):
+    """Takes a card code and a location (a card code it rests on, COLUMN_BASE, IN_FREE_CELL or IN_SUIT_CELL)
+    and returns the card's Zobrist key there."""
+
+    return KEYS[code][location]
+
+
+def location(card_area):
+    """Takes a CardArea and returns the location a card placed on top of it right now would have."""
+
+    if isinstance(card_area, FreeCell): return IN_FREE_CELL
+    if isinstance(card_area, SuitCell): return IN_SUIT_CELL
+    if card_area.is_empty(): return COLUMN_BASE
+
+    return encode_card(card_area.get_cards()[-1])
+
+
+def hash_state(state):
+    """Takes a State and returns its Zobrist hash, computed from scratch."""
+
+    value = 0
+
+    for code in state.free_cells:
+        if code != NO_CARD:
+            value ^= KEYS[code][IN_FREE_CELL]
+
+    # a suit cell holds every card of its suit up to the stored top card
+    for top in state.suit_cells:
+        for code in range(top & 3 | 4, top + 1, 4):
+            value ^= KEYS[code][IN_SUIT_CELL]
+
+    for column in state.columns:
+        below = COLUMN_BASE
+        for code in column:
+            value ^= KEYS[code][below]
+            below = code
+
+    return value
+
+
+def hash_card_areas(card_areas):
+    """Takes a card areas dictionary (the format returned by Game.get_card_areas) and returns its Zobrist hash."""
+
+    return hash_state(State.from_card_areas(card_areas))
+
+
+def canonical(state):
+    """Takes a State and returns a new State for the same position with the free cells, suit cells and columns
+    sorted, so positions that only differ in the order of interchangeable areas become equal. Empty free
+    cells and empty columns are sorted last and suit cells are ordered by suit."""
+
+    free_cells = sorted(state.free_cells, key=lambda code: code or 256)
+    suit_cells = [NO_CARD] * 4
+
+    for top in state.suit_cells:
+        if top != NO_CARD:
+            suit_cells[top & 3] = top
+
+    columns = sorted(state.columns, key=lambda column: column.tobytes() if column else b"\xff")
+
+    return State(free_cells, suit_cells, columns)
+
+
+def canonical_key(state):
+    """Takes a State and returns the packed bytes of its canonical form."""
+
+    return canonical(state).pack()